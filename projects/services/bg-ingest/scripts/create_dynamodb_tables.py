@@ -18,7 +18,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 
-from src.data.dynamodb import get_dynamodb_client
+from src.data.dynamodb import bootstrap_tables
 from src.utils.config import get_settings
 from src.utils.logger import get_logger
 
@@ -35,10 +35,9 @@ def main():
         logger.info(f"Using endpoint: {settings.dynamodb_endpoint}")
     
     try:
-        client = get_dynamodb_client()
         logger.info("Creating DynamoDB tables...")
         
-        result = client.create_all_tables()
+        result = bootstrap_tables()
         
         for table_name, response in result.items():
             table_info = None
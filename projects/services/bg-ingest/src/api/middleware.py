@@ -1,14 +1,15 @@
 """Middleware for API rate limiting and other functionality."""
 
 import time
-from typing import Dict, Tuple, Callable, Awaitable, Optional, Any
+from typing import Dict, Tuple, Optional, Any
 
 from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import Message, Receive, Scope, Send
 import fnmatch
 
 
-class RateLimiter(BaseHTTPMiddleware):
+class RateLimiter:
     """
     Middleware for implementing rate limiting on API endpoints.
     Supports per-endpoint, user-based, and IP-based rate limiting.
@@ -37,7 +38,7 @@ class RateLimiter(BaseHTTPMiddleware):
             include_paths: List of paths to include for rate limiting
             exclude_paths: List of paths to exclude from rate limiting
         """
-        super().__init__(app)
+        self.app = app
         self.default_rate_limit_per_minute = default_rate_limit_per_minute
         self.default_rate_limit_burst = default_rate_limit_burst
         self.endpoint_limits = endpoint_limits or {}
@@ -47,22 +48,20 @@ class RateLimiter(BaseHTTPMiddleware):
         # For each (key, path_pattern), store (tokens, last_updated_time)
         self.client_buckets: Dict[Tuple[str, str], Tuple[float, float]] = {}
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Check if the path is subject to rate limiting
-        path = request.url.path
-        if not self._should_rate_limit(path):
-            return await call_next(request)
+        if scope["type"] != "http" or not self._should_rate_limit(scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
         # Determine which config applies
-        pattern, config = self._get_limit_config(path)
+        pattern, config = self._get_limit_config(scope["path"])
         rate_limit_per_minute = config.get('rate_limit_per_minute', self.default_rate_limit_per_minute)
         rate_limit_burst = config.get('rate_limit_burst', self.default_rate_limit_burst)
         rate_per_second = rate_limit_per_minute / 60.0
 
-        # Get client identifier (user or IP)
-        client_id = self._get_client_id(request)
+        # Get client identifier (user or IP); Request only wraps the scope here
+        client_id = self._get_client_id(Request(scope))
         bucket_key = (client_id, pattern)
 
         # Check if the client is allowed to proceed
@@ -79,16 +78,21 @@ class RateLimiter(BaseHTTPMiddleware):
             response.headers["X-RateLimit-Limit"] = str(rate_limit_per_minute)
             response.headers["X-RateLimit-Remaining"] = "0"
             response.headers["X-RateLimit-Reset"] = str(int(time.time() + retry_after))
-            return response
+            await response(scope, receive, send)
+            return
 
-        # Process the request normally
-        response = await call_next(request)
+        limit = str(rate_limit_per_minute)
+        remaining = str(int(tokens_remaining))
 
-        # Add rate limit headers to the response
-        response.headers["X-RateLimit-Limit"] = str(rate_limit_per_minute)
-        response.headers["X-RateLimit-Remaining"] = str(int(tokens_remaining))
+        async def send_with_rate_limit_headers(message: Message) -> None:
+            # Add the rate limit headers to the response as it starts
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = limit
+                headers["X-RateLimit-Remaining"] = remaining
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_rate_limit_headers)
 
     def _should_rate_limit(self, path: str) -> bool:
         for exclude in self.exclude_paths:
@@ -134,7 +138,7 @@ class RateLimiter(BaseHTTPMiddleware):
         return True, new_tokens - 1, 0
 
 
-class CacheControl(BaseHTTPMiddleware):
+class CacheControl:
     """Middleware for adding cache control headers to responses."""
     
     def __init__(
@@ -149,48 +153,43 @@ class CacheControl(BaseHTTPMiddleware):
             app: The FastAPI application
             cache_paths: Dict mapping path prefixes to cache max-age in seconds
         """
-        super().__init__(app)
+        self.app = app
         self.cache_paths = cache_paths or {
             "/api/bg/": 60,  # Cache BG readings for 60 seconds by default
             "/health": 300,  # Cache health endpoint for 5 minutes
             "/metrics": 120,  # Cache metrics for 2 minutes
         }
     
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process a request to add cache headers.
         
         Args:
-            request: The incoming request
-            call_next: The next middleware or route handler
-            
-        Returns:
-            Response: The response with cache headers added
+            scope: The ASGI connection scope
+            receive: The ASGI receive channel
+            send: The ASGI send channel
         """
-        # Process the request normally
-        response = await call_next(request)
-        
         # Check if the path should have cache headers
-        path = request.url.path
-        max_age = self._get_cache_max_age(path)
+        max_age = self._get_cache_max_age(scope["path"]) if scope["type"] == "http" else None
+        if max_age is None:
+            await self.app(scope, receive, send)
+            return
+        cache_control = f"public, max-age={max_age}"
         
-        # Only add cache headers if:
-        # 1. We have a max age for this path
-        # 2. The response doesn't already have Cache-Control
-        # 3. The response is successful (2xx)
-        if (
-            max_age is not None and 
-            "Cache-Control" not in response.headers and
-            200 <= response.status_code < 300
-        ):
-            response.headers["Cache-Control"] = f"public, max-age={max_age}"
-            
-            # Add Vary header to ensure correct caching
-            response.headers["Vary"] = "Accept, Authorization"
+        async def send_with_cache_headers(message: Message) -> None:
+            # Only add cache headers if:
+            # 1. The response doesn't already have Cache-Control
+            # 2. The response is successful (2xx)
+            if message["type"] == "http.response.start" and 200 <= message["status"] < 300:
+                headers = MutableHeaders(scope=message)
+                if "Cache-Control" not in headers:
+                    headers["Cache-Control"] = cache_control
+                    
+                    # Add Vary header to ensure correct caching
+                    headers["Vary"] = "Accept, Authorization"
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_with_cache_headers)
     
     def _get_cache_max_age(self, path: str) -> Optional[int]:
         """
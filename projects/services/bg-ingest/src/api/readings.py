@@ -1,12 +1,13 @@
 """API endpoints for retrieving blood glucose readings."""
 
+import asyncio
 from datetime import datetime, timedelta
 import hashlib
-import json
 from typing import Optional, Dict, Any
 
 from fastapi import APIRouter, Query, Request, Response, HTTPException, Depends
 from starlette.status import HTTP_304_NOT_MODIFIED
+import orjson
 
 from src.data.glucose_repository import GlucoseReadingRepository, get_glucose_repository
 from src.models.glucose import GlucoseReading
@@ -56,7 +57,7 @@ async def get_latest_reading(
         Dict[str, Any]: Latest reading
     """
     # Get latest reading from database
-    reading = db_client.get_latest_reading_for_user(user_id)
+    reading = await asyncio.to_thread(db_client.get_latest_reading_for_user, user_id)
     if not reading:
         raise HTTPException(status_code=404, detail="No readings found")
     
@@ -64,8 +65,8 @@ async def get_latest_reading(
     reading_dict = reading.model_dump()
     
     # Generate ETag based on the content
-    reading_json = json.dumps(reading_dict, sort_keys=True)
-    etag = f'"{hashlib.md5(reading_json.encode()).hexdigest()}"'
+    reading_json = orjson.dumps(reading_dict, option=orjson.OPT_SORT_KEYS)
+    etag = f'"{hashlib.md5(reading_json).hexdigest()}"'
     
     # Check If-None-Match header for client-side caching
     if request.headers.get("if-none-match") == etag:
@@ -91,7 +92,7 @@ async def get_readings(
     sort: str = Query("desc", pattern="^(asc|desc)$"),
     format: Optional[str] = Query(None, pattern="^(default|simple|csv)$"),
     db_client: GlucoseReadingRepository = Depends(get_glucose_repository)
-) -> Dict[str, Any]:
+) -> Response:
     """
     Get blood glucose readings for a user with filtering, pagination, and formatting options.
     
@@ -106,7 +107,7 @@ async def get_readings(
         db_client: DynamoDB client
         
     Returns:
-        Dict[str, Any]: Readings with pagination info
+        Response: Readings with pagination info, as JSON
     """
     # Parse date parameters
     start = parse_iso_datetime(start_date) if start_date else datetime.utcnow() - timedelta(days=1)
@@ -129,7 +130,8 @@ async def get_readings(
     # Query database with pagination
     # Note: Current repository doesn't support pagination with cursors directly
     # For this implementation, we'll just get readings in the time range and handle cursors manually
-    readings = db_client.get_readings_by_user_in_time_range(
+    readings = await asyncio.to_thread(
+        db_client.get_readings_by_user_in_time_range,
         user_id=user_id,
         start_time=start,
         end_time=end,
@@ -176,7 +178,9 @@ async def get_readings(
             f"&sort={'asc' if sort == 'desc' else 'desc'}"
         )
     
-    return response
+    # orjson serializes the readings' datetimes and enums natively, so skip
+    # FastAPI's jsonable_encoder pass over every field
+    return Response(orjson.dumps(response), media_type="application/json")
 
 
 def format_readings(readings: list[GlucoseReading], format_type: Optional[str]) -> list:
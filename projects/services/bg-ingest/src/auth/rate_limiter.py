@@ -1,10 +1,13 @@
 import asyncio
 import time
 import logging
+from collections import deque
 
 class AsyncRateLimiter:
     """
     Async token bucket rate limiter with a background refill task.
+    The refill task is started lazily on the first acquire(), so the limiter
+    can be constructed outside a running event loop.
     Usage:
         async with rate_limiter:
             ... # make API call
@@ -13,14 +16,17 @@ class AsyncRateLimiter:
     def __init__(self, max_calls: int, period: float, refill_interval: float = 0.1):
         self.max_calls = max_calls
         self.period = period
-        self._tokens = max_calls
+        # Tokens are tracked in fixed point: one token == period_ns units, and
+        # each elapsed nanosecond adds max_calls units, so refill is integer-only
+        self._period_ns = int(period * 1_000_000_000)
+        self._capacity_scaled = max_calls * self._period_ns
+        self._tokens_scaled = self._capacity_scaled
         self._lock = asyncio.Lock()
-        self._waiters = []
-        self._refill_rate = max_calls / period  # tokens per second
+        self._waiters = deque()
         self._refill_interval = refill_interval
         self._closed = False
-        self._last_refill = time.monotonic()
-        self._refill_task = asyncio.create_task(self._refill_loop())
+        self._last_refill_ns = time.monotonic_ns()
+        self._refill_task = None
         self.logger = logging.getLogger("src.auth.rate_limiter")
 
     async def __aenter__(self):
@@ -31,10 +37,12 @@ class AsyncRateLimiter:
         pass  # nothing to clean up
 
     async def acquire(self):
+        if self._refill_task is None:
+            self._refill_task = asyncio.create_task(self._refill_loop())
         while True:
             async with self._lock:
-                if self._tokens >= 1:
-                    self._tokens -= 1
+                if self._tokens_scaled >= self._period_ns:
+                    self._tokens_scaled -= self._period_ns
                     return
                 waiter = asyncio.get_event_loop().create_future()
                 self._waiters.append(waiter)
@@ -43,41 +51,49 @@ class AsyncRateLimiter:
                     "Rate limiter: request queued due to no available tokens",
                     extra={
                         "log_type": "rate_limit_queue",
-                        "tokens": self._tokens,
+                        "tokens": self._tokens_scaled // self._period_ns,
                         "queue_length": len(self._waiters),
                         "max_calls": self.max_calls,
                         "period": self.period
                     }
                 )
-            try:
-                await waiter
-            except Exception:
-                async with self._lock:
-                    if waiter in self._waiters:
-                        self._waiters.remove(waiter)
-                raise
+            # A cancelled waiter is left in the queue as a tombstone; the refill
+            # loop discards done futures when it pops them
+            await waiter
 
     async def _refill_loop(self):
         try:
             while not self._closed:
                 await asyncio.sleep(self._refill_interval)
                 async with self._lock:
-                    now = time.monotonic()
-                    elapsed = now - self._last_refill
-                    refill = elapsed * self._refill_rate
-                    if refill >= 1:
-                        new_tokens = min(self.max_calls, self._tokens + int(refill))
-                        added = new_tokens - self._tokens
-                        self._tokens = new_tokens
-                        self._last_refill = now
-                        # Wake up waiters if tokens were added
-                        for _ in range(min(added, len(self._waiters))):
-                            waiter = self._waiters.pop(0)
+                    now_ns = time.monotonic_ns()
+                    elapsed_ns = now_ns - self._last_refill_ns
+                    self._last_refill_ns = now_ns
+                    old_tokens = self._tokens_scaled // self._period_ns
+                    self._tokens_scaled = min(
+                        self._capacity_scaled,
+                        self._tokens_scaled + elapsed_ns * self.max_calls,
+                    )
+                    added = self._tokens_scaled // self._period_ns - old_tokens
+                    if added > 0:
+                        # Wake up waiters if tokens were added; resolution is
+                        # scheduled so it runs after the lock is released
+                        loop = asyncio.get_running_loop()
+                        woken = 0
+                        while woken < added and self._waiters:
+                            waiter = self._waiters.popleft()
                             if not waiter.done():
-                                waiter.set_result(None)
+                                loop.call_soon(self._wake, waiter)
+                                woken += 1
         except asyncio.CancelledError:
             pass
 
+    @staticmethod
+    def _wake(waiter):
+        # The waiter may have been cancelled between scheduling and running
+        if not waiter.done():
+            waiter.set_result(None)
+
     def close(self):
         self._closed = True
         if self._refill_task and not self._refill_task.done():
@@ -4,21 +4,31 @@ OAuth2 token management and storage service.
 This module provides functionality for securely storing, retrieving,
 and refreshing OAuth tokens using the token repository.
 """
+import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 
 from pydantic import SecretStr
 
 from src.auth.oauth import TokenResponse, exchange_code_for_tokens, refresh_access_token, TokenError
+from src.data.dynamodb import ItemAlreadyExistsError
 from src.data.token_repository import get_token_repository
-from src.models.tokens import UserToken, TokenProvider
+from src.models.tokens import UserToken, TokenProvider, token_fingerprint
 from src.utils.config import get_settings
 
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# A stored token whose expiry is within this of a new response's expiry is not
+# rewritten when the credentials are unchanged; the computed expiry drifts by the
+# time between the provider issuing the token and us receiving it
+TOKEN_EXPIRY_TOLERANCE = timedelta(seconds=60)
+
+# Refreshes currently in progress, keyed by (user_id, provider)
+_inflight_refreshes: Dict[Tuple[str, TokenProvider], asyncio.Task] = {}
+
 
 async def store_token(
     user_id: str,
@@ -36,28 +46,47 @@ async def store_token(
     Returns:
         UserToken: The stored token model
     """
+    # Get the repository and store the token
+    repo = get_token_repository()
+    
+    # Check if a token already exists for this user and provider; bypass the
+    # cache so the no-op check compares against what is actually stored
+    existing_token = await asyncio.to_thread(
+        repo.get_by_user_and_provider, user_id, provider, consistent_read=True
+    )
+    expires_at = token_response.expires_at
+    
+    # Skip the write entirely when the provider handed back the same credentials
+    # with the same lifetime; a re-issued token with a later expiry must be stored
+    if existing_token and existing_token.fingerprint() == token_fingerprint(
+        token_response.access_token,
+        token_response.refresh_token,
+        token_response.scope,
+    ) and abs(existing_token.expires_at - expires_at) <= TOKEN_EXPIRY_TOLERANCE:
+        logger.debug(f"Token for user {user_id} and provider {provider} unchanged, skipping write")
+        return existing_token
+    
     # Create a UserToken object from the TokenResponse
     token = UserToken(
         user_id=user_id,
         provider=provider,
         access_token=SecretStr(token_response.access_token),
         refresh_token=SecretStr(token_response.refresh_token) if token_response.refresh_token else None,
-        expires_at=token_response.expires_at,
+        expires_at=expires_at,
         scope=token_response.scope,
     )
     
-    # Get the repository and store the token
-    repo = get_token_repository()
-    
-    # Check if a token already exists for this user and provider
-    existing_token = repo.get_by_user_and_provider(user_id, provider)
     if existing_token:
         # Update existing token
         token.created_at = existing_token.created_at  # Preserve original creation date
-        return repo.update(token)
-    else:
+        return await asyncio.to_thread(repo.update, token)
+    
+    try:
         # Create new token
-        return repo.create(token)
+        return await asyncio.to_thread(repo.create, token)
+    except ItemAlreadyExistsError:
+        # A concurrent request stored a token after our lookup; overwrite it
+        return await asyncio.to_thread(repo.update, token)
 
 
 async def get_token(
@@ -77,7 +106,7 @@ async def get_token(
         Optional[UserToken]: The token, or None if not found
     """
     repo = get_token_repository()
-    token = repo.get_by_user_and_provider(user_id, provider)
+    token = await asyncio.to_thread(repo.get_by_user_and_provider, user_id, provider)
     
     if not token:
         return None
@@ -104,6 +133,10 @@ async def refresh_token(
     """
     Refresh an OAuth token and update it in the repository.
     
+    Concurrent refreshes for the same user and provider are coalesced into one
+    background task that contacts the provider; every caller awaits its result,
+    and a caller being cancelled does not cancel the refresh.
+    
     Args:
         user_id: The user's ID
         provider: The token provider (defaults to Dexcom)
@@ -114,8 +147,39 @@ async def refresh_token(
     Raises:
         TokenError: If the token refresh fails
     """
+    key = (user_id, provider)
+    task = _inflight_refreshes.get(key)
+    if task is None:
+        # The refresh runs detached from the caller that started it, so
+        # cancelling that caller's request neither abandons the refresh
+        # halfway nor cancels the other callers waiting on it. No await
+        # between the lookup and the insert, so this is race-free on the event loop
+        task = asyncio.create_task(_refresh_token(user_id, provider))
+        _inflight_refreshes[key] = task
+        task.add_done_callback(lambda done: _finish_refresh(key, done))
+    return await asyncio.shield(task)
+
+
+def _finish_refresh(key: Tuple[str, TokenProvider], task: asyncio.Task) -> None:
+    """Forget a completed refresh so the next caller starts a new one."""
+    if _inflight_refreshes.get(key) is task:
+        del _inflight_refreshes[key]
+    # Mark the exception as retrieved in case every caller was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+async def _refresh_token(
+    user_id: str,
+    provider: TokenProvider,
+) -> Optional[UserToken]:
+    """Perform a single token refresh against the provider."""
     repo = get_token_repository()
-    token = repo.get_by_user_and_provider(user_id, provider)
+    # Another worker may have rotated the refresh token within the cache TTL;
+    # spending a stale one fails with invalid_grant, so read it consistently
+    token = await asyncio.to_thread(
+        repo.get_by_user_and_provider, user_id, provider, consistent_read=True
+    )
     
     if not token:
         logger.warning(f"No token found for user {user_id} and provider {provider}")
@@ -163,7 +227,7 @@ async def delete_token(
     """
     repo = get_token_repository()
     try:
-        result = repo.delete(user_id, provider)
+        result = await asyncio.to_thread(repo.delete, user_id, provider)
         logger.info(f"Deleted token for user {user_id} and provider {provider}")
         return result
     except Exception as e:
@@ -183,14 +247,14 @@ async def get_tokens_needing_refresh(threshold_minutes: int = 10) -> Dict[str, D
     """
     repo = get_token_repository()
     
-    # Get all tokens from the repository
-    all_tokens = repo.get_expired_tokens()
-    
     # Group tokens by user_id and provider
     result: Dict[str, Dict[str, UserToken]] = {}
     now = datetime.utcnow()
     threshold = now + timedelta(minutes=threshold_minutes)
     
+    # Get the tokens expiring before the threshold from the repository
+    all_tokens = await asyncio.to_thread(repo.get_expired_tokens, expires_before=threshold)
+    
     for token in all_tokens:
         # Skip tokens without refresh tokens
         if token.refresh_token is None:
@@ -1,13 +1,21 @@
 """DynamoDB utilities and table definitions."""
 
 import logging
+import random
+import threading
 import time
-from typing import Any, Dict, List, Optional, Type, TypeVar, Union, cast
+from concurrent.futures import Future, ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Type, TypeVar, Union, cast
 
 import boto3
-from botocore.exceptions import ClientError
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 from pydantic import BaseModel
 
+from src.models.tokens import TOKEN_TTL_ATTRIBUTE
 from src.utils.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -15,6 +23,164 @@ settings = get_settings()
 
 # Type variable for models
 T = TypeVar("T", bound=BaseModel)
+R = TypeVar("R")
+
+# Polling used to wait for tables created on a custom (local) endpoint
+TABLE_POLL_DELAY = 0.1
+TABLE_POLL_MAX_ATTEMPTS = 300
+
+# DynamoDB accepts at most 100 keys per BatchGetItem call
+BATCH_GET_MAX_KEYS = 100
+
+# Backoff bounds (seconds) when resubmitting unprocessed items or keys from a batch call
+BATCH_RETRY_BASE_DELAY = 0.05
+BATCH_RETRY_MAX_DELAY = 2.0
+
+
+class ItemAlreadyExistsError(Exception):
+    """Exception raised when a create finds an item with the same key already stored."""
+
+
+def _retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for the given zero-based retry attempt."""
+    return min(
+        BATCH_RETRY_MAX_DELAY,
+        BATCH_RETRY_BASE_DELAY * 2 ** attempt + random.uniform(0, BATCH_RETRY_BASE_DELAY),
+    )
+
+
+# Shared (stateless) converters between Python values and DynamoDB AttributeValues
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def _to_dynamodb_value(value: Any) -> Any:
+    """Convert floats (unsupported by DynamoDB) to Decimal, recursing into containers."""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: _to_dynamodb_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_dynamodb_value(v) for v in value]
+    return value
+
+
+def serialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a plain item into the low-level DynamoDB AttributeValue format.
+    
+    Args:
+        item: Item with Python values
+        
+    Returns:
+        Dict: Item with AttributeValue-typed values
+    """
+    return {key: _serializer.serialize(_to_dynamodb_value(value)) for key, value in item.items()}
+
+
+def deserialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a low-level DynamoDB item into plain Python values.
+    
+    Args:
+        item: Item with AttributeValue-typed values
+        
+    Returns:
+        Dict: Item with Python values
+    """
+    return {key: _deserializer.deserialize(value) for key, value in item.items()}
+
+
+def build_update_expression(
+    set_values: Dict[str, Any],
+    add_values: Optional[Dict[str, Any]] = None
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """
+    Build an UpdateExpression that SETs and ADDs the given attributes.
+    
+    Every attribute goes through a name placeholder, so reserved words such
+    as "status" need no special handling.
+    
+    Args:
+        set_values: Attributes to overwrite, by name
+        add_values: Numeric attributes to increment, by name
+        
+    Returns:
+        Tuple: The update expression, attribute names and attribute values
+    """
+    names: Dict[str, str] = {}
+    values: Dict[str, Any] = {}
+    clauses = []
+    for action, attributes, template in (
+        ("SET", set_values, "{} = {}"),
+        ("ADD", add_values or {}, "{} {}"),
+    ):
+        parts = []
+        for attribute, value in attributes.items():
+            index = len(names)
+            names[f"#u{index}"] = attribute
+            values[f":u{index}"] = value
+            parts.append(template.format(f"#u{index}", f":u{index}"))
+        if parts:
+            clauses.append(f"{action} {', '.join(parts)}")
+    return " ".join(clauses), names, values
+
+
+def _build_expressions(
+    key_condition_expression: Optional[Union[str, ConditionBase]],
+    filter_expression: Optional[Union[str, ConditionBase]],
+    expression_attribute_names: Optional[Dict[str, str]],
+    expression_attribute_values: Optional[Dict[str, Any]],
+    projection: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """
+    Build the low-level expression parameters of a query or scan.
+    
+    Conditions may be expression strings or boto3 Key/Attr condition objects;
+    the latter are rendered to strings with their placeholders merged in.
+    Projected attributes are referenced through name placeholders, so
+    reserved words such as "status" can be projected.
+    
+    Returns:
+        Dict: KeyConditionExpression/FilterExpression/ProjectionExpression and
+            attribute name and (serialized) value parameters, omitting empty ones
+    """
+    builder = ConditionExpressionBuilder()
+    names = dict(expression_attribute_names or {})
+    values = dict(expression_attribute_values or {})
+    params: Dict[str, Any] = {}
+    
+    for param, condition, is_key_condition in (
+        ("KeyConditionExpression", key_condition_expression, True),
+        ("FilterExpression", filter_expression, False),
+    ):
+        if condition is None:
+            continue
+        if isinstance(condition, ConditionBase):
+            built = builder.build_expression(condition, is_key_condition=is_key_condition)
+            condition = built.condition_expression
+            names.update(built.attribute_name_placeholders)
+            values.update(built.attribute_value_placeholders)
+        params[param] = condition
+    
+    if projection:
+        projected_names = {f"#p{i}": name for i, name in enumerate(projection)}
+        names.update(projected_names)
+        params["ProjectionExpression"] = ", ".join(projected_names)
+    
+    if names:
+        params["ExpressionAttributeNames"] = names
+    if values:
+        params["ExpressionAttributeValues"] = serialize_item(values)
+    return params
+
+
+def _deserialize_page(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Deserialize the items and pagination key of a low-level query/scan response."""
+    response["Items"] = [deserialize_item(item) for item in response.get("Items", [])]
+    if "LastEvaluatedKey" in response:
+        response["LastEvaluatedKey"] = deserialize_item(response["LastEvaluatedKey"])
+    return response
 
 
 class DynamoDBClient:
@@ -22,10 +188,19 @@ class DynamoDBClient:
 
     def __init__(self):
         """Initialize the DynamoDB client."""
-        self.client = boto3.client(
-            "dynamodb",
+        # Bounded timeouts and adaptive retries keep latency stable; the pool is
+        # sized so every concurrent batch writer gets a connection
+        config = Config(
+            max_pool_connections=max(settings.dynamodb_max_pool_connections, settings.batch_parallelism * 2),
+            connect_timeout=settings.dynamodb_connect_timeout,
+            read_timeout=settings.dynamodb_read_timeout,
+            retries={"max_attempts": settings.dynamodb_max_attempts, "mode": "adaptive"},
+            tcp_keepalive=True,
+        )
+        # One session resolves credentials and endpoints for both client and
+        # resource. Sessions are not thread-safe, so it is only used here.
+        self._session = boto3.session.Session(
             region_name=settings.aws_region,
-            endpoint_url=settings.dynamodb_endpoint,
             aws_access_key_id=settings.aws_access_key_id,
             aws_secret_access_key=(
                 settings.aws_secret_access_key.get_secret_value()
@@ -33,17 +208,23 @@ class DynamoDBClient:
                 else None
             ),
         )
-        self.resource = boto3.resource(
+        self.client = self._session.client(
             "dynamodb",
-            region_name=settings.aws_region,
             endpoint_url=settings.dynamodb_endpoint,
-            aws_access_key_id=settings.aws_access_key_id,
-            aws_secret_access_key=(
-                settings.aws_secret_access_key.get_secret_value()
-                if settings.aws_secret_access_key
-                else None
-            ),
+            config=config,
+        )
+        self.resource = self._session.resource(
+            "dynamodb",
+            endpoint_url=settings.dynamodb_endpoint,
+            config=config,
         )
+        # Table resources are costly to build, so create one per table name
+        self._tables: Dict[str, Any] = {}
+        # Tables created lazily by this client, see _retry_if_table_missing
+        self._created_tables: Set[str] = set()
+        self._create_lock = threading.Lock()
+        # Runs the reverse half of query_bidirectional
+        self._executor = ThreadPoolExecutor(max_workers=settings.batch_parallelism)
         
     def create_bg_readings_table(self, wait: bool = True) -> Dict[str, Any]:
         """
@@ -90,9 +271,7 @@ class DynamoDBClient:
             )
             
             if wait:
-                # Wait for the table to be created
-                waiter = self.client.get_waiter("table_exists")
-                waiter.wait(TableName=settings.dynamodb_table)
+                self._wait_for_table(settings.dynamodb_table)
                 
             return table
             
@@ -123,7 +302,26 @@ class DynamoDBClient:
                 ],
                 AttributeDefinitions=[
                     {"AttributeName": "user_id", "AttributeType": "S"},
-                    {"AttributeName": "provider", "AttributeType": "S"}
+                    {"AttributeName": "provider", "AttributeType": "S"},
+                    {"AttributeName": "expires_shard", "AttributeType": "N"},
+                    {"AttributeName": "expires_at", "AttributeType": "S"}
+                ],
+                GlobalSecondaryIndexes=[
+                    {
+                        # Sharded by user so expiry sweeps are index reads, not scans
+                        "IndexName": "ExpiringTokensIndex",
+                        "KeySchema": [
+                            {"AttributeName": "expires_shard", "KeyType": "HASH"},
+                            {"AttributeName": "expires_at", "KeyType": "RANGE"}
+                        ],
+                        "Projection": {
+                            "ProjectionType": "ALL"
+                        },
+                        "ProvisionedThroughput": {
+                            "ReadCapacityUnits": 5,
+                            "WriteCapacityUnits": 5
+                        }
+                    }
                 ],
                 ProvisionedThroughput={
                     "ReadCapacityUnits": 5,
@@ -132,15 +330,17 @@ class DynamoDBClient:
             )
             
             if wait:
-                # Wait for the table to be created
-                waiter = self.client.get_waiter("table_exists")
-                waiter.wait(TableName=settings.dynamodb_user_tokens_table)
+                self._wait_for_table(settings.dynamodb_user_tokens_table)
+                # Time to live can only be enabled once the table is active
+                self.enable_time_to_live(settings.dynamodb_user_tokens_table, TOKEN_TTL_ATTRIBUTE)
                 
             return table
             
         except ClientError as e:
             if e.response["Error"]["Code"] == "ResourceInUseException":
                 logger.info(f"Table {settings.dynamodb_user_tokens_table} already exists.")
+                if wait:
+                    self.enable_time_to_live(settings.dynamodb_user_tokens_table, TOKEN_TTL_ATTRIBUTE)
                 return self.client.describe_table(TableName=settings.dynamodb_user_tokens_table)
             else:
                 logger.error(f"Error creating table {settings.dynamodb_user_tokens_table}: {e}")
@@ -166,7 +366,8 @@ class DynamoDBClient:
                     {"AttributeName": "job_id", "AttributeType": "S"},
                     {"AttributeName": "user_id", "AttributeType": "S"},
                     {"AttributeName": "scheduled_time", "AttributeType": "S"},
-                    {"AttributeName": "status", "AttributeType": "S"}
+                    {"AttributeName": "status", "AttributeType": "S"},
+                    {"AttributeName": "next_retry_at", "AttributeType": "S"}
                 ],
                 GlobalSecondaryIndexes=[
                     {
@@ -196,6 +397,21 @@ class DynamoDBClient:
                             "ReadCapacityUnits": 5,
                             "WriteCapacityUnits": 5
                         }
+                    },
+                    {
+                        # Sparse: only jobs that have failed carry next_retry_at
+                        "IndexName": "StatusRetryIndex",
+                        "KeySchema": [
+                            {"AttributeName": "status", "KeyType": "HASH"},
+                            {"AttributeName": "next_retry_at", "KeyType": "RANGE"}
+                        ],
+                        "Projection": {
+                            "ProjectionType": "ALL"
+                        },
+                        "ProvisionedThroughput": {
+                            "ReadCapacityUnits": 5,
+                            "WriteCapacityUnits": 5
+                        }
                     }
                 ],
                 ProvisionedThroughput={
@@ -205,9 +421,7 @@ class DynamoDBClient:
             )
             
             if wait:
-                # Wait for the table to be created
-                waiter = self.client.get_waiter("table_exists")
-                waiter.wait(TableName=settings.dynamodb_sync_jobs_table)
+                self._wait_for_table(settings.dynamodb_sync_jobs_table)
                 
             return table
             
@@ -219,6 +433,44 @@ class DynamoDBClient:
                 logger.error(f"Error creating table {settings.dynamodb_sync_jobs_table}: {e}")
                 raise
     
+    def enable_time_to_live(self, table_name: str, attribute_name: str) -> None:
+        """
+        Let DynamoDB delete items once the epoch second in an attribute has passed.
+        
+        Args:
+            table_name: Name of the table
+            attribute_name: Attribute holding the expiry time in epoch seconds
+        """
+        description = self.client.describe_time_to_live(TableName=table_name)["TimeToLiveDescription"]
+        if description.get("TimeToLiveStatus") in ("ENABLED", "ENABLING"):
+            return
+        self.client.update_time_to_live(
+            TableName=table_name,
+            TimeToLiveSpecification={"Enabled": True, "AttributeName": attribute_name}
+        )
+    
+    def _wait_for_table(self, table_name: str) -> None:
+        """
+        Block until a newly created table is active.
+        
+        Custom endpoints (DynamoDB Local, Alternator) activate tables almost
+        immediately, so they are polled every 100 ms; AWS uses the
+        table_exists waiter with a 1 s delay instead of its 20 s default.
+        
+        Args:
+            table_name: Name of the table
+        """
+        if settings.dynamodb_endpoint:
+            for _ in range(TABLE_POLL_MAX_ATTEMPTS):
+                response = self.client.describe_table(TableName=table_name)
+                if response["Table"]["TableStatus"] == "ACTIVE":
+                    return
+                time.sleep(TABLE_POLL_DELAY)
+            logger.warning(f"Table {table_name} not active after polling")
+            return
+        waiter = self.client.get_waiter("table_exists")
+        waiter.wait(TableName=table_name, WaiterConfig={"Delay": 1, "MaxAttempts": 30})
+    
     def create_all_tables(self, wait: bool = True) -> Dict[str, Dict[str, Any]]:
         """
         Create all required tables if they don't exist.
@@ -235,6 +487,18 @@ class DynamoDBClient:
         results["sync_jobs"] = self.create_sync_jobs_table(wait)
         return results
     
+    def ping(self) -> None:
+        """
+        Issue a cheap DescribeTable call to open or refresh a pooled connection.
+        
+        Failures are logged rather than raised, since this only keeps the
+        connection pool warm.
+        """
+        try:
+            self.client.describe_table(TableName=settings.dynamodb_table)
+        except (BotoCoreError, ClientError) as e:
+            logger.warning(f"DynamoDB keep-alive ping failed: {e}")
+    
     def get_table(self, table_name: str):
         """
         Get a DynamoDB table resource.
@@ -245,36 +509,234 @@ class DynamoDBClient:
         Returns:
             Table: DynamoDB table resource
         """
-        return self.resource.Table(table_name)
+        table = self._tables.get(table_name)
+        if table is None:
+            # setdefault is atomic, so concurrent misses still share one Table
+            table = self._tables.setdefault(table_name, self.resource.Table(table_name))
+        return table
+    
+    def _retry_if_table_missing(self, table_name: str, operation: Callable[[], R]) -> R:
+        """
+        Run a table operation, creating the table and retrying once if it is missing.
+        
+        Tables are created lazily on ResourceNotFoundException instead of being
+        checked eagerly at startup. Creation is only attempted in development;
+        elsewhere the error is raised unchanged.
+        
+        Args:
+            table_name: Name of the table the operation targets
+            operation: Zero-argument callable performing the request
+            
+        Returns:
+            The result of the operation
+        """
+        try:
+            return operation()
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ResourceNotFoundException" or not self._create_missing_table(table_name):
+                raise
+        return operation()
     
-    def put_item(self, table_name: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_missing_table(self, table_name: str) -> bool:
+        """
+        Create a known table that was found to be missing.
+        
+        Args:
+            table_name: Name of the missing table
+            
+        Returns:
+            bool: True if the table is now available and the request can be retried
+        """
+        if settings.service_env != "development":
+            return False
+        creators = {
+            settings.dynamodb_table: self.create_bg_readings_table,
+            settings.dynamodb_user_tokens_table: self.create_user_tokens_table,
+            settings.dynamodb_sync_jobs_table: self.create_sync_jobs_table,
+        }
+        create_table = creators.get(table_name)
+        if create_table is None:
+            return False
+        # Serialize creation so concurrent callers that hit the same miss create it once
+        with self._create_lock:
+            if table_name not in self._created_tables:
+                logger.info(f"Table {table_name} not found, creating it")
+                create_table(wait=True)
+                self._created_tables.add(table_name)
+        return True
+    
+    def put_item(
+        self,
+        table_name: str,
+        item: Dict[str, Any],
+        condition_expression: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Insert an item into a DynamoDB table.
         
         Args:
             table_name: Name of the table
             item: Item to insert
+            condition_expression: Optional condition the existing item must meet
             
         Returns:
             Dict: Response from DynamoDB
         """
-        table = self.get_table(table_name)
-        return table.put_item(Item=item)
+        request = {
+            "TableName": table_name,
+            "Item": serialize_item(item),
+            **({"ConditionExpression": condition_expression} if condition_expression is not None else {}),
+        }
+        return self._retry_if_table_missing(table_name, lambda: self.client.put_item(**request))
     
-    def get_item(self, table_name: str, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def batch_write_items(self, table_name: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insert items with low-level BatchWriteItem calls.
+        
+        Unlike the resource-level batch_writer, which always re-chunks to 25,
+        this honors settings.dynamodb_batch_write_max so backends that accept
+        larger batches need fewer round trips.
+        
+        Items DynamoDB reports as unprocessed (e.g. under throttling) are
+        resubmitted on their own with exponential backoff, up to
+        settings.max_retries times.
+        
+        Args:
+            table_name: Name of the table
+            items: Items to insert
+            
+        Returns:
+            List: Write requests still unprocessed after all retries
+        """
+        batch_size = settings.dynamodb_batch_write_max
+        unprocessed: List[Dict[str, Any]] = []
+        for i in range(0, len(items), batch_size):
+            requests = [{"PutRequest": {"Item": serialize_item(item)}} for item in items[i:i + batch_size]]
+            unprocessed.extend(self._write_batch_with_retry(table_name, requests))
+        return unprocessed
+    
+    def batch_delete_items(self, table_name: str, keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Delete items with low-level BatchWriteItem calls.
+        
+        Args:
+            table_name: Name of the table
+            keys: Keys in low-level AttributeValue format, as yielded by query_keys
+            
+        Returns:
+            List: Delete requests still unprocessed after all retries
+        """
+        batch_size = settings.dynamodb_batch_write_max
+        unprocessed: List[Dict[str, Any]] = []
+        for i in range(0, len(keys), batch_size):
+            requests = [{"DeleteRequest": {"Key": key}} for key in keys[i:i + batch_size]]
+            unprocessed.extend(self._write_batch_with_retry(table_name, requests))
+        return unprocessed
+    
+    def batch_delete_pages(self, table_name: str, key_pages: Iterable[List[Dict[str, Any]]]) -> int:
+        """
+        Delete keys as they stream in, overlapping reads with deletes.
+        
+        Each page is split into BatchWriteItem calls that run on the client's
+        thread pool while the next page is still being fetched, so deleting a
+        partition takes roughly as long as the slower of the two rather than
+        their sum.
+        
+        Args:
+            table_name: Name of the table
+            key_pages: Pages of keys in low-level AttributeValue format, as
+                yielded by query_keys
+            
+        Returns:
+            int: The number of items deleted
+        """
+        batch_size = settings.dynamodb_batch_write_max
+        pending: List[Tuple[int, Future]] = []
+        for keys in key_pages:
+            for i in range(0, len(keys), batch_size):
+                requests = [{"DeleteRequest": {"Key": key}} for key in keys[i:i + batch_size]]
+                pending.append(
+                    (len(requests), self._executor.submit(self._write_batch_with_retry, table_name, requests))
+                )
+        return sum(count - len(future.result()) for count, future in pending)
+    
+    def _write_batch_with_retry(self, table_name: str, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send one BatchWriteItem call, retrying only its unprocessed requests."""
+        for attempt in range(settings.max_retries + 1):
+            response = self._retry_if_table_missing(
+                table_name, lambda: self.client.batch_write_item(RequestItems={table_name: requests})
+            )
+            requests = response.get("UnprocessedItems", {}).get(table_name, [])
+            if not requests:
+                return []
+            if attempt < settings.max_retries:
+                delay = _retry_delay(attempt)
+                logger.warning(
+                    f"{len(requests)} items unprocessed writing to {table_name}, retrying in {delay:.2f}s"
+                )
+                time.sleep(delay)
+        return requests
+    
+    def get_item(
+        self,
+        table_name: str,
+        key: Dict[str, Any],
+        consistent_read: bool = False
+    ) -> Optional[Dict[str, Any]]:
         """
         Get an item from a DynamoDB table.
         
         Args:
             table_name: Name of the table
             key: Key to get
+            consistent_read: Use consistent read if True
             
         Returns:
             Dict: Item from DynamoDB or None if not found
         """
-        table = self.get_table(table_name)
-        response = table.get_item(Key=key)
-        return response.get("Item")
+        request = {
+            "TableName": table_name,
+            "Key": serialize_item(key),
+            **({"ConsistentRead": True} if consistent_read else {}),
+        }
+        response = self._retry_if_table_missing(table_name, lambda: self.client.get_item(**request))
+        item = response.get("Item")
+        return deserialize_item(item) if item is not None else None
+    
+    def batch_get_items(self, table_name: str, keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Get many items with BatchGetItem calls of up to 100 keys each.
+        
+        Keys DynamoDB reports as unprocessed are resubmitted with exponential
+        backoff, up to settings.max_retries times.
+        
+        Args:
+            table_name: Name of the table
+            keys: Keys to get
+            
+        Returns:
+            List: Items found, in no particular order
+        """
+        items: List[Dict[str, Any]] = []
+        for i in range(0, len(keys), BATCH_GET_MAX_KEYS):
+            request_keys = [serialize_item(key) for key in keys[i:i + BATCH_GET_MAX_KEYS]]
+            for attempt in range(settings.max_retries + 1):
+                response = self._retry_if_table_missing(
+                    table_name, lambda: self.client.batch_get_item(RequestItems={table_name: {"Keys": request_keys}})
+                )
+                items.extend(deserialize_item(item) for item in response.get("Responses", {}).get(table_name, []))
+                request_keys = response.get("UnprocessedKeys", {}).get(table_name, {}).get("Keys", [])
+                if not request_keys:
+                    break
+                if attempt < settings.max_retries:
+                    delay = _retry_delay(attempt)
+                    logger.warning(
+                        f"{len(request_keys)} keys unprocessed reading from {table_name}, retrying in {delay:.2f}s"
+                    )
+                    time.sleep(delay)
+            else:
+                logger.error(f"{len(request_keys)} keys still unprocessed reading from {table_name}")
+        return items
     
     def update_item(
         self,
@@ -282,7 +744,8 @@ class DynamoDBClient:
         key: Dict[str, Any],
         update_expression: str,
         expression_attribute_values: Dict[str, Any],
-        condition_expression: Optional[str] = None
+        condition_expression: Optional[str] = None,
+        expression_attribute_names: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
         Update an item in a DynamoDB table.
@@ -293,6 +756,7 @@ class DynamoDBClient:
             update_expression: Update expression
             expression_attribute_values: Expression attribute values
             condition_expression: Condition expression
+            expression_attribute_names: Expression attribute names
             
         Returns:
             Dict: Response from DynamoDB
@@ -309,7 +773,10 @@ class DynamoDBClient:
         if condition_expression:
             update_kwargs["ConditionExpression"] = condition_expression
         
-        return table.update_item(**update_kwargs)
+        if expression_attribute_names:
+            update_kwargs["ExpressionAttributeNames"] = expression_attribute_names
+        
+        return self._retry_if_table_missing(table_name, lambda: table.update_item(**update_kwargs))
     
     def delete_item(self, table_name: str, key: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -323,20 +790,21 @@ class DynamoDBClient:
             Dict: Response from DynamoDB
         """
         table = self.get_table(table_name)
-        return table.delete_item(Key=key)
+        return self._retry_if_table_missing(table_name, lambda: table.delete_item(Key=key))
     
     def query(
         self,
         table_name: str,
-        key_condition_expression: str,
+        key_condition_expression: Union[str, ConditionBase],
         expression_attribute_values: Dict[str, Any],
         expression_attribute_names: Optional[Dict[str, str]] = None,
         index_name: Optional[str] = None,
-        filter_expression: Optional[str] = None,
+        filter_expression: Optional[Union[str, ConditionBase]] = None,
         limit: Optional[int] = None,
         scan_index_forward: bool = True,
         consistent_read: bool = False,
-        exclusive_start_key: Optional[Dict[str, Any]] = None
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        projection: Optional[Sequence[str]] = None
     ) -> Dict[str, Any]:
         """
         Query a DynamoDB table.
@@ -352,46 +820,168 @@ class DynamoDBClient:
             scan_index_forward: Scan index forward if True
             consistent_read: Use consistent read if True
             exclusive_start_key: Exclusive start key for pagination
+            projection: Attributes to return, or None for all of them
             
         Returns:
             Dict: Response from DynamoDB
         """
-        table = self.get_table(table_name)
-        
         query_kwargs = {
-            "KeyConditionExpression": key_condition_expression,
-            "ExpressionAttributeValues": expression_attribute_values,
+            "TableName": table_name,
             "ScanIndexForward": scan_index_forward,
-            "ConsistentRead": consistent_read
+            "ConsistentRead": consistent_read,
+            **_build_expressions(
+                key_condition_expression,
+                filter_expression,
+                expression_attribute_names,
+                expression_attribute_values,
+                projection
+            ),
+            **({"IndexName": index_name} if index_name is not None else {}),
+            **({"Limit": limit} if limit else {}),
+            **(
+                {"ExclusiveStartKey": serialize_item(exclusive_start_key)}
+                if exclusive_start_key is not None
+                else {}
+            ),
         }
         
-        if expression_attribute_names:
-            query_kwargs["ExpressionAttributeNames"] = expression_attribute_names
+        response = self._retry_if_table_missing(table_name, lambda: self.client.query(**query_kwargs))
+        return _deserialize_page(response)
+    
+    def query_keys(
+        self,
+        table_name: str,
+        partition_key: str,
+        partition_value: Any,
+        key_attributes: Sequence[str],
+        index_name: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield the primary keys of every item in a partition, one page at a time.
         
-        if index_name:
-            query_kwargs["IndexName"] = index_name
+        Only the key attributes are projected and nothing is deserialized, so
+        this is suited to feeding batch_delete_pages.
         
-        if filter_expression:
-            query_kwargs["FilterExpression"] = filter_expression
+        Args:
+            table_name: Name of the table
+            partition_key: Name of the partition key attribute to query on
+            partition_value: Partition key value to query
+            key_attributes: Attributes of the table's primary key to project
+            index_name: Name of the index to query, if the partition key belongs
+                to a secondary index
+            
+        Yields:
+            List: Keys in low-level AttributeValue format
+        """
+        projected_names = {f"#k{i}": name for i, name in enumerate(key_attributes)}
+        query_kwargs = {
+            "TableName": table_name,
+            "KeyConditionExpression": "#pk = :pk",
+            "ProjectionExpression": ", ".join(projected_names),
+            "ExpressionAttributeNames": {"#pk": partition_key, **projected_names},
+            "ExpressionAttributeValues": {":pk": _serializer.serialize(partition_value)},
+            **({"IndexName": index_name} if index_name is not None else {}),
+        }
+        while True:
+            response = self._retry_if_table_missing(table_name, lambda: self.client.query(**query_kwargs))
+            yield response.get("Items", [])
+            last_evaluated_key = response.get("LastEvaluatedKey")
+            if not last_evaluated_key:
+                return
+            query_kwargs["ExclusiveStartKey"] = last_evaluated_key
+    
+    def query_bidirectional(
+        self,
+        table_name: str,
+        key_condition_expression: Union[str, ConditionBase],
+        key_attributes: Sequence[str],
+        expression_attribute_values: Optional[Dict[str, Any]] = None,
+        expression_attribute_names: Optional[Dict[str, str]] = None,
+        index_name: Optional[str] = None,
+        filter_expression: Optional[Union[str, ConditionBase]] = None,
+        page_size: Optional[int] = None,
+        projection: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Read every item matching a key condition, paging from both ends at once.
         
-        if limit:
-            query_kwargs["Limit"] = limit
+        One query walks the sort key forward while a second walks it backward
+        on the client's thread pool; both stop as soon as either sees an item
+        the other already returned, or reaches the end. Large partitions are
+        therefore read in about half the sequential round trips.
         
-        if exclusive_start_key:
-            query_kwargs["ExclusiveStartKey"] = exclusive_start_key
+        Args:
+            table_name: Name of the table
+            key_condition_expression: Key condition expression
+            key_attributes: Attributes of the table's primary key, used to
+                detect where the two reads meet
+            expression_attribute_values: Expression attribute values
+            expression_attribute_names: Expression attribute names
+            index_name: Name of the index to query
+            filter_expression: Filter expression
+            page_size: Maximum number of items to evaluate per query page
+            projection: Attributes to return, or None for all of them; the key
+                attributes are always included
+            
+        Returns:
+            List: Every matching item, in ascending sort key order
+        """
+        if projection is not None:
+            projection = list(dict.fromkeys([*key_attributes, *projection]))
+        seen_by: Dict[Tuple[Any, ...], bool] = {}
+        lock = threading.Lock()
+        done = threading.Event()
+        
+        def read(forward: bool) -> List[Dict[str, Any]]:
+            items: List[Dict[str, Any]] = []
+            exclusive_start_key = None
+            while not done.is_set():
+                result = self.query(
+                    table_name=table_name,
+                    key_condition_expression=key_condition_expression,
+                    expression_attribute_values=expression_attribute_values or {},
+                    expression_attribute_names=expression_attribute_names,
+                    index_name=index_name,
+                    filter_expression=filter_expression,
+                    limit=page_size,
+                    scan_index_forward=forward,
+                    exclusive_start_key=exclusive_start_key,
+                    projection=projection
+                )
+                page = result.get("Items", [])
+                items.extend(page)
+                with lock:
+                    crossed = False
+                    for item in page:
+                        key = tuple(item[name] for name in key_attributes)
+                        crossed = seen_by.setdefault(key, forward) != forward or crossed
+                exclusive_start_key = result.get("LastEvaluatedKey")
+                if crossed or not exclusive_start_key:
+                    done.set()
+            return items
         
-        return table.query(**query_kwargs)
+        backward_future = self._executor.submit(read, False)
+        forward_items = read(True)
+        backward_items = backward_future.result()
+        
+        # Append the backward half, minus the overlap, in ascending order
+        forward_keys = {tuple(item[name] for name in key_attributes) for item in forward_items}
+        return forward_items + [
+            item for item in reversed(backward_items)
+            if tuple(item[name] for name in key_attributes) not in forward_keys
+        ]
     
     def scan(
         self,
         table_name: str,
-        filter_expression: Optional[str] = None,
+        filter_expression: Optional[Union[str, ConditionBase]] = None,
         expression_attribute_values: Optional[Dict[str, Any]] = None,
         expression_attribute_names: Optional[Dict[str, str]] = None,
         index_name: Optional[str] = None,
         limit: Optional[int] = None,
         consistent_read: bool = False,
-        exclusive_start_key: Optional[Dict[str, Any]] = None
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        projection: Optional[Sequence[str]] = None
     ) -> Dict[str, Any]:
         """
         Scan a DynamoDB table.
@@ -405,35 +995,32 @@ class DynamoDBClient:
             limit: Maximum number of items to return
             consistent_read: Use consistent read if True
             exclusive_start_key: Exclusive start key for pagination
+            projection: Attributes to return, or None for all of them
             
         Returns:
             Dict: Response from DynamoDB
         """
-        table = self.get_table(table_name)
-        
         scan_kwargs = {
-            "ConsistentRead": consistent_read
+            "TableName": table_name,
+            "ConsistentRead": consistent_read,
+            **_build_expressions(
+                None,
+                filter_expression,
+                expression_attribute_names,
+                expression_attribute_values,
+                projection
+            ),
+            **({"IndexName": index_name} if index_name is not None else {}),
+            **({"Limit": limit} if limit else {}),
+            **(
+                {"ExclusiveStartKey": serialize_item(exclusive_start_key)}
+                if exclusive_start_key is not None
+                else {}
+            ),
         }
         
-        if filter_expression:
-            scan_kwargs["FilterExpression"] = filter_expression
-        
-        if expression_attribute_values:
-            scan_kwargs["ExpressionAttributeValues"] = expression_attribute_values
-        
-        if expression_attribute_names:
-            scan_kwargs["ExpressionAttributeNames"] = expression_attribute_names
-        
-        if index_name:
-            scan_kwargs["IndexName"] = index_name
-        
-        if limit:
-            scan_kwargs["Limit"] = limit
-        
-        if exclusive_start_key:
-            scan_kwargs["ExclusiveStartKey"] = exclusive_start_key
-        
-        return table.scan(**scan_kwargs)
+        response = self._retry_if_table_missing(table_name, lambda: self.client.scan(**scan_kwargs))
+        return _deserialize_page(response)
 
 
 # Singleton instance for reuse
@@ -450,4 +1037,17 @@ def get_dynamodb_client() -> DynamoDBClient:
     global _dynamodb_client
     if _dynamodb_client is None:
         _dynamodb_client = DynamoDBClient()
-    return _dynamodb_client 
\ No newline at end of file
+    return _dynamodb_client
+
+
+def bootstrap_tables(wait: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Explicitly create all tables, e.g. for local development or tests.
+    
+    Args:
+        wait: Wait for the tables to be created if True
+        
+    Returns:
+        Dict: Table descriptions
+    """
+    return get_dynamodb_client().create_all_tables(wait)
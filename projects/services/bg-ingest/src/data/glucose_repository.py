@@ -1,12 +1,14 @@
 """Repository for glucose readings."""
 
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple, Union, Any
 from functools import lru_cache
+from itertools import islice
 
 import boto3
-from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.conditions import Attr
 from botocore.exceptions import ClientError
 
 from src.data.dynamodb import get_dynamodb_client
@@ -16,6 +18,22 @@ from src.utils.config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Key condition expressions for the user/timestamp queries, built once.
+# DynamoDB rejects unused attribute names, so the user-only form has its own.
+_USER_NAMES = {"#u": "user_id"}
+_USER_TIME_NAMES = {"#u": "user_id", "#t": "timestamp"}
+_USER_ONLY = "#u = :u"
+_USER_TIME_BETWEEN = "#u = :u AND #t BETWEEN :s AND :e"
+_USER_TIME_FROM = "#u = :u AND #t >= :s"
+_USER_TIME_UNTIL = "#u = :u AND #t <= :e"
+_USER_CREATED_NAMES = {"#u": "user_id", "#c": "created_at"}
+_USER_CREATED_FROM = "#u = :u AND #c >= :c"
+
+
+def _utcnow() -> datetime:
+    """Return the current UTC time as a naive datetime, the format stored timestamps use."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 
 class GlucoseReadingRepository:
     """Repository for glucose readings in DynamoDB."""
@@ -24,6 +42,7 @@ class GlucoseReadingRepository:
         """Initialize the repository."""
         self.dynamodb = get_dynamodb_client()
         self.table_name = settings.dynamodb_table
+        self._executor = ThreadPoolExecutor(max_workers=settings.batch_parallelism)
     
     def create(self, reading: GlucoseReading) -> GlucoseReading:
         """
@@ -47,30 +66,58 @@ class GlucoseReadingRepository:
         """
         Create multiple glucose readings in batch.
         
+        Batches are written concurrently on the repository's thread pool so
+        their network round trips overlap.
+        
         Args:
             readings: The list of glucose readings to create
             
         Returns:
             List[GlucoseReading]: The list of created glucose readings
         """
-        table = self.dynamodb.get_table(self.table_name)
-        
-        # DynamoDB can only handle batches of 25 items at a time
-        batch_size = 25
-        successful_readings = []
+        # AWS DynamoDB accepts 25 items per batch; Alternator can be configured higher
+        batch_size = settings.dynamodb_batch_write_max
+        # Serialize each reading exactly once, up front, and pair it with its item
+        remaining = zip(readings, [reading.to_dynamodb_item() for reading in readings])
+        batches = list(iter(lambda: list(islice(remaining, batch_size)), []))
+        if len(batches) <= 1:
+            return [reading for batch in batches for reading in self._write_batch(batch)]
         
-        for i in range(0, len(readings), batch_size):
-            batch = readings[i:i + batch_size]
-            try:
-                with table.batch_writer() as batch_writer:
-                    for reading in batch:
-                        batch_writer.put_item(Item=reading.to_dynamodb_item())
-                successful_readings.extend(batch)
-            except ClientError as e:
-                logger.error(f"Error batch creating glucose readings: {e}")
-                # Continue with the rest of the batches even if one fails
+        # Collect in submission order so the result preserves the input order
+        futures = [self._executor.submit(self._write_batch, batch) for batch in batches]
+        return [reading for future in futures for reading in future.result()]
+    
+    def _write_batch(self, batch: List[Tuple[GlucoseReading, Dict[str, Any]]]) -> List[GlucoseReading]:
+        """
+        Write one batch of readings.
         
-        return successful_readings
+        Args:
+            batch: (reading, serialized item) pairs to write in a single batch
+            
+        Returns:
+            List[GlucoseReading]: The readings DynamoDB acknowledged
+        """
+        try:
+            unprocessed = self.dynamodb.batch_write_items(self.table_name, [item for _, item in batch])
+            if not unprocessed:
+                return [reading for reading, _ in batch]
+            
+            # Only report readings DynamoDB actually acknowledged
+            logger.warning(f"Batch write left {len(unprocessed)} glucose readings unprocessed")
+            failed_keys = {
+                (request["PutRequest"]["Item"]["user_id"]["S"],
+                 request["PutRequest"]["Item"]["timestamp"]["S"])
+                for request in unprocessed
+            }
+            return [
+                reading
+                for reading, item in batch
+                if (item["user_id"], item["timestamp"]) not in failed_keys
+            ]
+        except ClientError as e:
+            logger.error(f"Error batch creating glucose readings: {e}")
+            # The other batches are still written even if one fails
+            return []
     
     def get_by_user_and_timestamp(self, user_id: str, timestamp: datetime) -> Optional[GlucoseReading]:
         """
@@ -97,6 +144,100 @@ class GlucoseReadingRepository:
             logger.error(f"Error getting glucose reading: {e}")
             raise
     
+    def get_many(self, user_id: str, timestamps: List[datetime]) -> List[Optional[GlucoseReading]]:
+        """
+        Get several glucose readings for a user in as few round trips as possible.
+        
+        Args:
+            user_id: The user ID
+            timestamps: The timestamps to look up
+            
+        Returns:
+            List[Optional[GlucoseReading]]: One entry per timestamp, in request
+                order, with None for readings that do not exist
+        """
+        timestamp_keys = [timestamp.isoformat() for timestamp in timestamps]
+        # BatchGetItem rejects duplicate keys within a request
+        keys = [{"user_id": user_id, "timestamp": ts} for ts in dict.fromkeys(timestamp_keys)]
+        
+        try:
+            items = self.dynamodb.batch_get_items(self.table_name, keys)
+        except ClientError as e:
+            logger.error(f"Error batch getting glucose readings: {e}")
+            raise
+        
+        # Index responses by key so they can be returned in request order
+        items_by_timestamp = {item["timestamp"]: item for item in items}
+        return [
+            GlucoseReading.from_dynamodb_item(items_by_timestamp[ts]) if ts in items_by_timestamp else None
+            for ts in timestamp_keys
+        ]
+    
+    def iter_readings_by_user(
+        self,
+        user_id: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[GlucoseReading]:
+        """
+        Iterate over glucose readings for a user within a time range, latest first.
+        
+        Query pages are fetched on demand, following LastEvaluatedKey, so only
+        one page is held in memory at a time.
+        
+        Args:
+            user_id: The user ID
+            start_time: The start time (inclusive)
+            end_time: The end time (inclusive)
+            limit: Maximum number of readings to yield, or None for all
+            
+        Yields:
+            GlucoseReading: The glucose readings
+        """
+        # Select a precomputed key condition and bind its values
+        expression_attribute_names = _USER_TIME_NAMES
+        expression_attribute_values = {":u": user_id}
+        if start_time and end_time:
+            key_condition = _USER_TIME_BETWEEN
+            expression_attribute_values[":s"] = start_time.isoformat()
+            expression_attribute_values[":e"] = end_time.isoformat()
+        elif start_time:
+            key_condition = _USER_TIME_FROM
+            expression_attribute_values[":s"] = start_time.isoformat()
+        elif end_time:
+            key_condition = _USER_TIME_UNTIL
+            expression_attribute_values[":e"] = end_time.isoformat()
+        else:
+            key_condition = _USER_ONLY
+            expression_attribute_names = _USER_NAMES
+        
+        remaining = limit
+        exclusive_start_key = None
+        while remaining is None or remaining > 0:
+            try:
+                result = self.dynamodb.query(
+                    table_name=self.table_name,
+                    key_condition_expression=key_condition,
+                    expression_attribute_values=expression_attribute_values,
+                    expression_attribute_names=expression_attribute_names,
+                    limit=remaining,
+                    scan_index_forward=False,  # Sort descending (latest first)
+                    exclusive_start_key=exclusive_start_key
+                )
+            except ClientError as e:
+                logger.error(f"Error querying glucose readings: {e}")
+                raise
+            
+            items = result.get("Items", [])
+            if remaining is not None:
+                remaining -= len(items)
+            yield from (GlucoseReading.from_dynamodb_item(item) for item in items)
+            
+            exclusive_start_key = result.get("LastEvaluatedKey")
+            if not exclusive_start_key:
+                return
+    
     def get_readings_by_user(
         self,
         user_id: str,
@@ -116,34 +257,7 @@ class GlucoseReadingRepository:
         Returns:
             List[GlucoseReading]: The list of glucose readings
         """
-        # Build the key condition expression
-        key_condition = Key("user_id").eq(user_id)
-        
-        if start_time and end_time:
-            key_condition = key_condition & Key("timestamp").between(
-                start_time.isoformat(),
-                end_time.isoformat()
-            )
-        elif start_time:
-            key_condition = key_condition & Key("timestamp").gte(start_time.isoformat())
-        elif end_time:
-            key_condition = key_condition & Key("timestamp").lte(end_time.isoformat())
-        
-        # Execute the query
-        try:
-            result = self.dynamodb.query(
-                table_name=self.table_name,
-                key_condition_expression=key_condition,
-                expression_attribute_values={},
-                limit=limit,
-                scan_index_forward=False  # Sort descending (latest first)
-            )
-            
-            items = result.get("Items", [])
-            return [GlucoseReading.from_dynamodb_item(item) for item in items]
-        except ClientError as e:
-            logger.error(f"Error querying glucose readings: {e}")
-            raise
+        return list(islice(self.iter_readings_by_user(user_id, start_time, end_time, limit), limit))
     
     def get_readings_by_user_in_time_range(
         self,
@@ -200,9 +314,9 @@ class GlucoseReadingRepository:
             result = self.dynamodb.query(
                 table_name=self.table_name,
                 index_name="UserCreatedIndex",
-                key_condition_expression=Key("user_id").eq(user_id) & 
-                                          Key("created_at").gte(created_after.isoformat()),
-                expression_attribute_values={},
+                key_condition_expression=_USER_CREATED_FROM,
+                expression_attribute_values={":u": user_id, ":c": created_after.isoformat()},
+                expression_attribute_names=_USER_CREATED_NAMES,
                 limit=limit
             )
             
@@ -223,7 +337,7 @@ class GlucoseReadingRepository:
             GlucoseReading: The updated glucose reading
         """
         # Simply put the item - DynamoDB will overwrite it if the key exists
-        reading.updated_at = datetime.utcnow()
+        reading.updated_at = _utcnow()
         item = reading.to_dynamodb_item()
         
         try:
@@ -267,29 +381,13 @@ class GlucoseReadingRepository:
             int: The number of deleted readings
         """
         try:
-            # First, get all readings for the user
-            readings = self.get_readings_by_user(user_id, limit=1000)
-            
-            # Delete them one by one (DynamoDB doesn't support batch deletes directly)
-            table = self.dynamodb.get_table(self.table_name)
-            count = 0
-            
-            with table.batch_writer() as batch:
-                for reading in readings:
-                    batch.delete_item(
-                        Key={
-                            "user_id": reading.user_id,
-                            "timestamp": reading.timestamp.isoformat()
-                        }
-                    )
-                    count += 1
-            
-            return count
+            # Stream key-only query pages straight into concurrent batch deletes
+            pages = self.dynamodb.query_keys(self.table_name, "user_id", user_id, ("user_id", "timestamp"))
+            return self.dynamodb.batch_delete_pages(self.table_name, pages)
         except ClientError as e:
             logger.error(f"Error deleting glucose readings for user: {e}")
             raise
 
-
 @lru_cache()
 def get_glucose_repository() -> GlucoseReadingRepository:
     """
@@ -1,20 +1,39 @@
 """Repository for data synchronization jobs."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Any
 
-import boto3
-from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
 
-from src.data.dynamodb import get_dynamodb_client
+from src.data.cache import TTLCache
+from src.data.dynamodb import ItemAlreadyExistsError, build_update_expression, get_dynamodb_client
 from src.models.sync import SyncJob, SyncStatus, SyncType
 from src.utils.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Key condition expressions for the index queries, built once.
+# DynamoDB rejects unused attribute names, so each form has its own names.
+_USER_NAMES = {"#u": "user_id"}
+_USER_KEY = "#u = :u"
+_USER_STATUS_NAMES = {"#u": "user_id", "#st": "status"}
+_USER_STATUS_KEY = "#u = :u AND #st = :st"
+_DUE_NAMES = {"#st": "status", "#s": "scheduled_time"}
+_DUE_KEY = "#st = :st AND #s <= :now"
+
+# Failed jobs whose backoff has elapsed and that have retries left
+_RETRY_READY_NAMES = {"#st": "status", "#r": "next_retry_at", "#rc": "retry_count", "#mr": "max_retries"}
+_RETRY_READY_KEY = "#st = :failed AND #r <= :now"
+_RETRY_READY_FILTER = "#rc < #mr"
+
+
+def _to_jobs(items: List[Dict[str, Any]]) -> List[SyncJob]:
+    """Map full items to SyncJobs."""
+    return [SyncJob.from_dynamodb_item(item) for item in items]
+
 
 class SyncJobRepository:
     """Repository for sync jobs in DynamoDB."""
@@ -23,6 +42,12 @@ class SyncJobRepository:
         """Initialize the repository."""
         self.dynamodb = get_dynamodb_client()
         self.table_name = settings.dynamodb_sync_jobs_table
+        # Items by job_id; kept in step with this process's own writes
+        self._cache: TTLCache[Dict[str, Any]] = TTLCache(
+            settings.read_cache_max_entries if settings.enable_read_cache else 0,
+            settings.read_cache_ttl_seconds
+        )
+        self._executor = ThreadPoolExecutor(max_workers=settings.batch_parallelism)
     
     def create(self, sync_job: SyncJob) -> SyncJob:
         """
@@ -33,67 +58,108 @@ class SyncJobRepository:
             
         Returns:
             SyncJob: The created sync job
+            
+        Raises:
+            ItemAlreadyExistsError: If a job with the same ID already exists
         """
         item = sync_job.to_dynamodb_item()
         try:
-            self.dynamodb.put_item(self.table_name, item)
+            self.dynamodb.put_item(self.table_name, item, condition_expression="attribute_not_exists(job_id)")
+            self._cache.set(sync_job.job_id, item)
             return sync_job
         except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise ItemAlreadyExistsError(f"Sync job {sync_job.job_id} already exists") from e
             logger.error(f"Error creating sync job: {e}")
             raise
     
-    def get_by_id(self, job_id: str) -> Optional[SyncJob]:
+    def get_by_id(self, job_id: str, consistent_read: bool = False) -> Optional[SyncJob]:
         """
         Get a sync job by ID.
         
         Args:
             job_id: The job ID
+            consistent_read: Bypass the cache and read with ConsistentRead, to
+                see writes made elsewhere immediately; costs twice the read
+                capacity, so use it only right after a write
             
         Returns:
             Optional[SyncJob]: The sync job, or None if not found
         """
+        item = None if consistent_read else self._cache.get(job_id)
+        if item is not None:
+            return SyncJob.from_dynamodb_item(item)
+        
         key = {"job_id": job_id}
         
         try:
-            item = self.dynamodb.get_item(self.table_name, key)
+            item = self.dynamodb.get_item(self.table_name, key, consistent_read=consistent_read)
             if item:
+                self._cache.set(job_id, item)
                 return SyncJob.from_dynamodb_item(item)
             return None
         except ClientError as e:
             logger.error(f"Error getting sync job: {e}")
             raise
     
-    def get_jobs_by_user(self, user_id: str, limit: int = 100) -> List[SyncJob]:
+    def get_many(self, job_ids: List[str]) -> List[Optional[SyncJob]]:
+        """
+        Get several sync jobs in as few round trips as possible.
+        
+        Args:
+            job_ids: The job IDs to look up
+            
+        Returns:
+            List[Optional[SyncJob]]: One entry per job ID, in request order,
+                with None for jobs that do not exist
+        """
+        items_by_id: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        # dict.fromkeys dedupes, since BatchGetItem rejects duplicate keys within a request
+        for job_id in dict.fromkeys(job_ids):
+            item = self._cache.get(job_id)
+            if item is not None:
+                items_by_id[job_id] = item
+            else:
+                missing.append(job_id)
+        
+        if missing:
+            try:
+                items = self.dynamodb.batch_get_items(self.table_name, [{"job_id": job_id} for job_id in missing])
+            except ClientError as e:
+                logger.error(f"Error batch getting sync jobs: {e}")
+                raise
+            for item in items:
+                self._cache.set(item["job_id"], item)
+                items_by_id[item["job_id"]] = item
+        
+        return [
+            SyncJob.from_dynamodb_item(items_by_id[job_id]) if job_id in items_by_id else None
+            for job_id in job_ids
+        ]
+    
+    def get_jobs_by_user(
+        self,
+        user_id: str,
+        limit: Optional[int] = 100
+    ) -> List[SyncJob]:
         """
         Get sync jobs for a user.
         
         Args:
             user_id: The user ID
-            limit: Maximum number of jobs to return
+            limit: Maximum number of jobs to return, or None for all of them
             
         Returns:
             List[SyncJob]: The list of sync jobs
         """
-        try:
-            result = self.dynamodb.query(
-                table_name=self.table_name,
-                index_name="UserStatusIndex",
-                key_condition_expression=Key("user_id").eq(user_id),
-                expression_attribute_values={},
-                limit=limit
-            )
-            
-            items = result.get("Items", [])
-            return [SyncJob.from_dynamodb_item(item) for item in items]
-        except ClientError as e:
-            logger.error(f"Error querying sync jobs by user: {e}")
-            raise
+        return _to_jobs(self._get_user_job_items(user_id, None, limit))
     
     def get_jobs_by_user_and_status(
         self, 
         user_id: str, 
         status: SyncStatus,
-        limit: int = 100
+        limit: Optional[int] = 100
     ) -> List[SyncJob]:
         """
         Get sync jobs for a user with a specific status.
@@ -101,24 +167,140 @@ class SyncJobRepository:
         Args:
             user_id: The user ID
             status: The job status
-            limit: Maximum number of jobs to return
+            limit: Maximum number of jobs to return, or None for all of them
             
         Returns:
             List[SyncJob]: The list of sync jobs
         """
+        return _to_jobs(self._get_user_job_items(user_id, status, limit))
+    
+    def get_job_attributes_by_user(
+        self,
+        user_id: str,
+        projection: Sequence[str],
+        status: Optional[SyncStatus] = None,
+        limit: Optional[int] = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Get only some attributes of a user's sync jobs.
+        
+        A partial item cannot be turned into a valid SyncJob, so the projected
+        items are returned as dicts.
+        
+        Args:
+            user_id: The user ID
+            projection: Attributes to fetch
+            status: The job status, or None for jobs in any status
+            limit: Maximum number of jobs to return, or None for all of them
+            
+        Returns:
+            List[Dict[str, Any]]: The projected items
+        """
+        return self._get_user_job_items(user_id, status, limit, projection)
+    
+    def get_jobs_page(
+        self,
+        user_id: str,
+        status: Optional[SyncStatus] = None,
+        limit: int = 100,
+        start_key: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[SyncJob], Optional[Dict[str, Any]]]:
+        """
+        Get one page of a user's sync jobs, optionally with a specific status.
+        
+        Args:
+            user_id: The user ID
+            status: The job status, or None for jobs in any status
+            limit: Maximum number of jobs to return
+            start_key: The key returned with the previous page, or None to
+                start from the beginning
+            
+        Returns:
+            Tuple: The sync jobs, and the key to pass as start_key to get the
+                next page, or None if this was the last page
+        """
+        items, last_key = self._query_job_items_page(user_id, status, limit, start_key)
+        return _to_jobs(items), last_key
+    
+    def _get_user_job_items(
+        self,
+        user_id: str,
+        status: Optional[SyncStatus],
+        limit: Optional[int],
+        projection: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get the items of a user's jobs; all of them if limit is None."""
+        if limit is not None:
+            return self._query_job_items_page(user_id, status, limit, projection=projection)[0]
+        if status is None:
+            return self._get_all_job_items(_USER_KEY, _USER_NAMES, {":u": user_id}, projection)
+        return self._get_all_job_items(
+            _USER_STATUS_KEY, _USER_STATUS_NAMES, {":u": user_id, ":st": status.value}, projection
+        )
+    
+    def _query_job_items_page(
+        self,
+        user_id: str,
+        status: Optional[SyncStatus],
+        limit: int,
+        start_key: Optional[Dict[str, Any]] = None,
+        projection: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Query one page of a user's job items and the key of the next page."""
+        if status is None:
+            key_condition, names, values = _USER_KEY, _USER_NAMES, {":u": user_id}
+        else:
+            key_condition, names = _USER_STATUS_KEY, _USER_STATUS_NAMES
+            values = {":u": user_id, ":st": status.value}
+        
         try:
             result = self.dynamodb.query(
                 table_name=self.table_name,
                 index_name="UserStatusIndex",
-                key_condition_expression=Key("user_id").eq(user_id) & Key("status").eq(status.value),
-                expression_attribute_values={},
-                limit=limit
+                key_condition_expression=key_condition,
+                expression_attribute_names=names,
+                expression_attribute_values=values,
+                limit=limit,
+                exclusive_start_key=start_key,
+                projection=projection
             )
             
-            items = result.get("Items", [])
-            return [SyncJob.from_dynamodb_item(item) for item in items]
+            return result.get("Items", []), result.get("LastEvaluatedKey")
+        except ClientError as e:
+            logger.error(f"Error querying sync jobs by user: {e}")
+            raise
+    
+    def _get_all_job_items(
+        self,
+        key_condition: str,
+        expression_attribute_names: Dict[str, str],
+        expression_attribute_values: Dict[str, Any],
+        projection: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get every job item in a UserStatusIndex partition, reading it from both ends.
+        
+        Args:
+            key_condition: Key condition expression on the index
+            expression_attribute_names: Attribute names used in the key condition
+            expression_attribute_values: Values bound in the key condition
+            projection: Attributes to fetch, or None for whole items
+            
+        Returns:
+            List[Dict[str, Any]]: The job items
+        """
+        try:
+            return self.dynamodb.query_bidirectional(
+                table_name=self.table_name,
+                key_condition_expression=key_condition,
+                key_attributes=("job_id",),
+                expression_attribute_values=expression_attribute_values,
+                expression_attribute_names=expression_attribute_names,
+                index_name="UserStatusIndex",
+                projection=projection
+            )
         except ClientError as e:
-            logger.error(f"Error querying sync jobs by user and status: {e}")
+            logger.error(f"Error querying all sync jobs: {e}")
             raise
     
     def get_pending_scheduled_jobs(self, limit: int = 100) -> List[SyncJob]:
@@ -131,24 +313,81 @@ class SyncJobRepository:
         Returns:
             List[SyncJob]: The list of pending scheduled jobs
         """
+        return self._get_due_jobs(SyncStatus.PENDING, limit)
+    
+    def get_pending_scheduled_job_attributes(
+        self,
+        projection: Sequence[str],
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Get only some attributes of the pending scheduled jobs that are due.
+        
+        Args:
+            projection: Attributes to fetch
+            limit: Maximum number of jobs to return
+            
+        Returns:
+            List[Dict[str, Any]]: The projected items
+        """
+        return self._get_due_job_items(SyncStatus.PENDING, limit, projection)
+    
+    def _get_due_jobs(self, status: SyncStatus, limit: int) -> List[SyncJob]:
+        """Get jobs in a status whose scheduled time has passed."""
+        return _to_jobs(self._get_due_job_items(status, limit))
+    
+    def _get_due_job_items(
+        self,
+        status: SyncStatus,
+        limit: int,
+        projection: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get the items of jobs in a status whose scheduled time has passed."""
         now = datetime.utcnow().isoformat()
         
         try:
             result = self.dynamodb.query(
                 table_name=self.table_name,
                 index_name="StatusScheduledIndex",
-                key_condition_expression=Key("status").eq(SyncStatus.PENDING.value) & 
-                                          Key("scheduled_time").lte(now),
-                expression_attribute_values={},
-                limit=limit
+                key_condition_expression=_DUE_KEY,
+                expression_attribute_names=_DUE_NAMES,
+                expression_attribute_values={":st": status.value, ":now": now},
+                limit=limit,
+                projection=projection
             )
             
-            items = result.get("Items", [])
-            return [SyncJob.from_dynamodb_item(item) for item in items]
+            return result.get("Items", [])
         except ClientError as e:
-            logger.error(f"Error querying pending scheduled jobs: {e}")
+            logger.error(f"Error querying {status.value} scheduled jobs: {e}")
             raise
     
+    def batch_fetch_status(
+        self,
+        statuses: Sequence[SyncStatus],
+        limit: int = 100
+    ) -> Dict[SyncStatus, List[SyncJob]]:
+        """
+        Fetch the due jobs of several statuses in one sweep.
+        
+        Failed jobs are those ready for retry, as returned by
+        get_failed_jobs_for_retry; every other status returns its jobs whose
+        scheduled time has passed. The per-status queries run concurrently.
+        
+        Args:
+            statuses: The statuses to fetch
+            limit: Maximum number of jobs to return per status
+            
+        Returns:
+            Dict[SyncStatus, List[SyncJob]]: The jobs, keyed by status
+        """
+        def fetch(status: SyncStatus) -> List[SyncJob]:
+            if status == SyncStatus.FAILED:
+                return self.get_failed_jobs_for_retry(limit)
+            return self._get_due_jobs(status, limit)
+        
+        unique_statuses = list(dict.fromkeys(statuses))
+        return dict(zip(unique_statuses, self._executor.map(fetch, unique_statuses)))
+    
     def get_failed_jobs_for_retry(self, limit: int = 100) -> List[SyncJob]:
         """
         Get failed jobs that are eligible for retry.
@@ -159,41 +398,54 @@ class SyncJobRepository:
         Returns:
             List[SyncJob]: The list of failed jobs eligible for retry
         """
+        expression_attribute_values = {
+            ":failed": SyncStatus.FAILED.value,
+            ":now": datetime.utcnow().isoformat()
+        }
+        
         try:
-            result = self.dynamodb.query(
-                table_name=self.table_name,
-                index_name="StatusScheduledIndex",
-                key_condition_expression=Key("status").eq(SyncStatus.FAILED.value),
-                expression_attribute_values={},
-                limit=limit
-            )
-            
-            items = result.get("Items", [])
-            jobs = [SyncJob.from_dynamodb_item(item) for item in items]
+            # The filter is applied after Limit, so keep paging until enough jobs match
+            jobs: List[SyncJob] = []
+            exclusive_start_key = None
+            while len(jobs) < limit:
+                result = self.dynamodb.query(
+                    table_name=self.table_name,
+                    index_name="StatusRetryIndex",
+                    key_condition_expression=_RETRY_READY_KEY,
+                    filter_expression=_RETRY_READY_FILTER,
+                    expression_attribute_names=_RETRY_READY_NAMES,
+                    expression_attribute_values=expression_attribute_values,
+                    limit=limit - len(jobs),
+                    exclusive_start_key=exclusive_start_key
+                )
+                jobs.extend(SyncJob.from_dynamodb_item(item) for item in result.get("Items", []))
+                exclusive_start_key = result.get("LastEvaluatedKey")
+                if not exclusive_start_key:
+                    break
             
-            # Filter for retryable jobs
-            retryable_jobs = [job for job in jobs if job.is_retryable()]
-            
-            return retryable_jobs
+            return jobs
         except ClientError as e:
             logger.error(f"Error querying failed jobs for retry: {e}")
             raise
     
-    def update(self, sync_job: SyncJob) -> SyncJob:
+    def update(self, sync_job: SyncJob, now: Optional[datetime] = None) -> SyncJob:
         """
         Update an existing sync job.
         
         Args:
             sync_job: The sync job to update
+            now: Update time, so callers updating many jobs read the clock once;
+                defaults to the current UTC time
             
         Returns:
             SyncJob: The updated sync job
         """
-        sync_job.updated_at = datetime.utcnow()
+        sync_job.updated_at = now or datetime.utcnow()
         item = sync_job.to_dynamodb_item()
         
         try:
             self.dynamodb.put_item(self.table_name, item)
+            self._cache.set(sync_job.job_id, item)
             return sync_job
         except ClientError as e:
             logger.error(f"Error updating sync job: {e}")
@@ -203,7 +455,8 @@ class SyncJobRepository:
         self, 
         job_id: str, 
         status: SyncStatus,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        now: Optional[datetime] = None
     ) -> Optional[SyncJob]:
         """
         Update the status of a sync job.
@@ -212,30 +465,106 @@ class SyncJobRepository:
             job_id: The job ID
             status: The new status
             error_message: Error message if the job failed
+            now: Update time, so callers updating many jobs read the clock once;
+                defaults to the current UTC time
             
         Returns:
             Optional[SyncJob]: The updated sync job, or None if not found
         """
-        # Get the existing job
-        job = self.get_by_id(job_id)
-        if not job:
-            return None
-        
-        # Update based on status
+        now = now or datetime.utcnow()
+        now_iso = now.isoformat()
+        set_values: Dict[str, Any] = {"status": status.value, "updated_at": now_iso}
         if status == SyncStatus.IN_PROGRESS:
-            job.record_start()
+            set_values["started_at"] = now_iso
         elif status == SyncStatus.COMPLETED:
-            job.record_completion(status)
+            set_values["completed_at"] = now_iso
         elif status == SyncStatus.FAILED:
-            job.record_failure(error_message or "Unknown error")
-        else:
-            job.status = status
-            job.updated_at = datetime.utcnow()
-            if error_message:
-                job.error_message = error_message
+            set_values["error_message"] = error_message or "Unknown error"
+            return self._record_failure(job_id, set_values, now)
+        elif error_message:
+            set_values["error_message"] = error_message
+        
+        return self._update_attributes(job_id, set_values)
+    
+    def _record_failure(
+        self,
+        job_id: str,
+        set_values: Dict[str, Any],
+        now: datetime
+    ) -> Optional[SyncJob]:
+        """
+        Mark a job failed, counting the retry and scheduling it, in one UpdateItem.
         
-        # Save the updated job
-        return self.update(job)
+        The backoff depends on the incremented retry_count, so the count is
+        read first and the write is conditional on it being unchanged; if
+        another failure was recorded in between, the read and write are retried.
+        Writing next_retry_at with the status keeps the job in the sparse
+        StatusRetryIndex even if the caller never gets the response.
+        
+        Args:
+            job_id: The job ID
+            set_values: The status attributes to write alongside the retry
+            now: Time of the failure
+            
+        Returns:
+            Optional[SyncJob]: The updated sync job, or None if not found
+        """
+        while True:
+            job = self.get_by_id(job_id, consistent_read=True)
+            if job is None:
+                return None
+            expected_retries = job.retry_count
+            job.retry_count += 1
+            job.updated_at = now
+            updated = self._update_attributes(
+                job_id,
+                {
+                    **set_values,
+                    "retry_count": job.retry_count,
+                    "next_retry_at": job.retry_backoff_deadline().isoformat()
+                },
+                condition_expression="retry_count = :expected_retries",
+                condition_values={":expected_retries": expected_retries}
+            )
+            if updated is not None:
+                return updated
+    
+    def _update_attributes(
+        self,
+        job_id: str,
+        set_values: Dict[str, Any],
+        condition_expression: str = "attribute_exists(job_id)",
+        condition_values: Optional[Dict[str, Any]] = None
+    ) -> Optional[SyncJob]:
+        """
+        Update attributes of a sync job in place with a single UpdateItem.
+        
+        Args:
+            job_id: The job ID
+            set_values: Attributes to overwrite, by name
+            condition_expression: Condition the stored job must meet
+            condition_values: Values referenced by the condition expression
+            
+        Returns:
+            Optional[SyncJob]: The updated sync job, or None if the condition failed
+        """
+        update_expression, names, values = build_update_expression(set_values)
+        try:
+            response = self.dynamodb.update_item(
+                self.table_name,
+                {"job_id": job_id},
+                update_expression,
+                {**values, **(condition_values or {})},
+                condition_expression=condition_expression,
+                expression_attribute_names=names
+            )
+            self._cache.set(job_id, response["Attributes"])
+            return SyncJob.from_dynamodb_item(response["Attributes"])
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return None
+            logger.error(f"Error updating sync job status: {e}")
+            raise
     
     def delete(self, job_id: str) -> bool:
         """
@@ -250,6 +579,7 @@ class SyncJobRepository:
         key = {"job_id": job_id}
         
         try:
+            self._cache.pop(job_id)
             self.dynamodb.delete_item(self.table_name, key)
             return True
         except ClientError as e:
@@ -266,17 +596,18 @@ class SyncJobRepository:
         Returns:
             int: The number of deleted jobs
         """
+        def evict(pages: Iterable[List[Dict[str, Any]]]) -> Iterator[List[Dict[str, Any]]]:
+            for keys in pages:
+                for key in keys:
+                    self._cache.pop(key["job_id"]["S"])
+                yield keys
+        
         try:
-            # Get all jobs for the user
-            jobs = self.get_jobs_by_user(user_id)
-            
-            # Delete them one by one
-            count = 0
-            for job in jobs:
-                self.delete(job.job_id)
-                count += 1
-            
-            return count
+            # Stream job_id-only pages of the user's index partition into concurrent batch deletes
+            pages = self.dynamodb.query_keys(
+                self.table_name, "user_id", user_id, ("job_id",), index_name="UserStatusIndex"
+            )
+            return self.dynamodb.batch_delete_pages(self.table_name, evict(pages))
         except ClientError as e:
             logger.error(f"Error deleting sync jobs for user: {e}")
             raise
@@ -1,21 +1,29 @@
 """Repository for user authentication tokens."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Any
 
-import boto3
-from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
 from pydantic import SecretStr
 
-from src.data.dynamodb import get_dynamodb_client
-from src.models.tokens import UserToken, TokenProvider
+from src.data.cache import TTLCache
+from src.data.dynamodb import ItemAlreadyExistsError, build_update_expression, get_dynamodb_client
+from src.models.tokens import EXPIRY_SHARDS, TOKEN_TTL_ATTRIBUTE, UserToken, TokenProvider, token_ttl_epoch
 from src.utils.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Key condition for a user's partition, built once
+_USER_NAMES = {"#u": "user_id"}
+_USER_KEY = "#u = :u"
+
+# Key condition for one ExpiringTokensIndex shard
+_EXPIRING_NAMES = {"#s": "expires_shard", "#e": "expires_at"}
+_EXPIRING_BEFORE = "#s = :s AND #e <= :e"
+
 
 class TokenRepository:
     """Repository for user tokens in DynamoDB."""
@@ -24,6 +32,12 @@ class TokenRepository:
         """Initialize the repository."""
         self.dynamodb = get_dynamodb_client()
         self.table_name = settings.dynamodb_user_tokens_table
+        # Items by (user_id, provider); kept in step with this process's own writes
+        self._cache: TTLCache[Dict[str, Any]] = TTLCache(
+            settings.read_cache_max_entries if settings.enable_read_cache else 0,
+            settings.read_cache_ttl_seconds
+        )
+        self._executor = ThreadPoolExecutor(max_workers=settings.batch_parallelism)
     
     def create(self, token: UserToken) -> UserToken:
         """
@@ -34,40 +48,99 @@ class TokenRepository:
             
         Returns:
             UserToken: The created token
+            
+        Raises:
+            ItemAlreadyExistsError: If the user already has a token for the provider
         """
         item = token.to_dynamodb_item()
         try:
-            self.dynamodb.put_item(self.table_name, item)
+            self.dynamodb.put_item(self.table_name, item, condition_expression="attribute_not_exists(user_id)")
+            self._cache.set((token.user_id, item["provider"]), item)
             return token
         except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise ItemAlreadyExistsError(
+                    f"Token for user {token.user_id} and provider {item['provider']} already exists"
+                ) from e
             logger.error(f"Error creating user token: {e}")
             raise
     
-    def get_by_user_and_provider(self, user_id: str, provider: TokenProvider) -> Optional[UserToken]:
+    def get_by_user_and_provider(
+        self, user_id: str, provider: TokenProvider, consistent_read: bool = False
+    ) -> Optional[UserToken]:
         """
         Get a token by user ID and provider.
         
         Args:
             user_id: The user ID
             provider: The token provider
+            consistent_read: Bypass the cache and read with ConsistentRead, to
+                see tokens rotated by other workers immediately; use it before
+                spending a refresh token
             
         Returns:
             Optional[UserToken]: The token, or None if not found
         """
+        item = None if consistent_read else self._cache.get((user_id, provider.value))
+        if item is not None:
+            return UserToken.from_dynamodb_item(item)
+        
         key = {
             "user_id": user_id,
             "provider": provider.value
         }
         
         try:
-            item = self.dynamodb.get_item(self.table_name, key)
+            item = self.dynamodb.get_item(self.table_name, key, consistent_read=consistent_read)
             if item:
+                self._cache.set((user_id, provider.value), item)
                 return UserToken.from_dynamodb_item(item)
             return None
         except ClientError as e:
             logger.error(f"Error getting user token: {e}")
             raise
     
+    def get_many(self, keys: List[Tuple[str, TokenProvider]]) -> List[Optional[UserToken]]:
+        """
+        Get several tokens in as few round trips as possible.
+        
+        Args:
+            keys: (user ID, provider) pairs to look up
+            
+        Returns:
+            List[Optional[UserToken]]: One entry per pair, in request order,
+                with None for tokens that do not exist
+        """
+        cache_keys = [(user_id, provider.value) for user_id, provider in keys]
+        items_by_key: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        missing: List[Tuple[str, str]] = []
+        # dict.fromkeys dedupes, since BatchGetItem rejects duplicate keys within a request
+        for cache_key in dict.fromkeys(cache_keys):
+            item = self._cache.get(cache_key)
+            if item is not None:
+                items_by_key[cache_key] = item
+            else:
+                missing.append(cache_key)
+        
+        if missing:
+            try:
+                items = self.dynamodb.batch_get_items(
+                    self.table_name,
+                    [{"user_id": user_id, "provider": provider} for user_id, provider in missing]
+                )
+            except ClientError as e:
+                logger.error(f"Error batch getting user tokens: {e}")
+                raise
+            for item in items:
+                cache_key = (item["user_id"], item["provider"])
+                self._cache.set(cache_key, item)
+                items_by_key[cache_key] = item
+        
+        return [
+            UserToken.from_dynamodb_item(items_by_key[cache_key]) if cache_key in items_by_key else None
+            for cache_key in cache_keys
+        ]
+    
     def get_tokens_by_user(self, user_id: str) -> List[UserToken]:
         """
         Get all tokens for a user.
@@ -78,34 +151,66 @@ class TokenRepository:
         Returns:
             List[UserToken]: The list of tokens
         """
+        return [UserToken.from_dynamodb_item(item) for item in self._query_user_items(user_id)]
+    
+    def get_token_attributes_by_user(
+        self,
+        user_id: str,
+        projection: Sequence[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Get only some attributes of a user's tokens.
+        
+        A partial item cannot be turned into a valid UserToken, so the
+        projected items are returned as dicts.
+        
+        Args:
+            user_id: The user ID
+            projection: Attributes to fetch
+            
+        Returns:
+            List[Dict[str, Any]]: The projected items
+        """
+        return self._query_user_items(user_id, projection)
+    
+    def _query_user_items(
+        self,
+        user_id: str,
+        projection: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Query the token items of a user."""
         try:
             result = self.dynamodb.query(
                 table_name=self.table_name,
-                key_condition_expression=Key("user_id").eq(user_id),
-                expression_attribute_values={}
+                key_condition_expression=_USER_KEY,
+                expression_attribute_names=_USER_NAMES,
+                expression_attribute_values={":u": user_id},
+                projection=projection
             )
             
-            items = result.get("Items", [])
-            return [UserToken.from_dynamodb_item(item) for item in items]
+            return result.get("Items", [])
         except ClientError as e:
             logger.error(f"Error querying user tokens: {e}")
             raise
     
-    def update(self, token: UserToken) -> UserToken:
+    def update(self, token: UserToken, now: Optional[datetime] = None) -> UserToken:
         """
         Update an existing token.
         
         Args:
             token: The token to update
+            now: Update time, so callers updating many tokens read the clock
+                once; defaults to the current UTC time
             
         Returns:
             UserToken: The updated token
         """
-        token.updated_at = datetime.utcnow()
+        token.updated_at = now or datetime.utcnow()
         item = token.to_dynamodb_item()
         
         try:
             self.dynamodb.put_item(self.table_name, item)
+            self._cache.set((token.user_id, item["provider"]), item)
             return token
         except ClientError as e:
             logger.error(f"Error updating user token: {e}")
@@ -118,7 +223,8 @@ class TokenRepository:
         access_token: SecretStr,
         refresh_token: Optional[SecretStr] = None,
         expires_at: Optional[datetime] = None,
-        scope: Optional[str] = None
+        scope: Optional[str] = None,
+        now: Optional[datetime] = None
     ) -> Optional[UserToken]:
         """
         Update the values of an existing token.
@@ -130,26 +236,41 @@ class TokenRepository:
             refresh_token: The new refresh token (optional)
             expires_at: The new expiration timestamp (optional)
             scope: The new scope (optional)
+            now: Update time, so callers updating many tokens read the clock
+                once; defaults to the current UTC time
             
         Returns:
             Optional[UserToken]: The updated token, or None if not found
         """
-        # Get the existing token
-        token = self.get_by_user_and_provider(user_id, provider)
-        if not token:
-            return None
-        
-        # Update the values
-        token.access_token = access_token
+        set_values: Dict[str, Any] = {
+            "access_token": access_token.get_secret_value(),
+            "updated_at": (now or datetime.utcnow()).isoformat()
+        }
         if refresh_token:
-            token.refresh_token = refresh_token
+            set_values["refresh_token"] = refresh_token.get_secret_value()
         if expires_at:
-            token.expires_at = expires_at
+            set_values["expires_at"] = expires_at.isoformat()
+            set_values[TOKEN_TTL_ATTRIBUTE] = token_ttl_epoch(expires_at)
         if scope:
-            token.scope = scope
+            set_values["scope"] = scope
+        update_expression, names, values = build_update_expression(set_values)
         
-        # Save the updated token
-        return self.update(token)
+        try:
+            response = self.dynamodb.update_item(
+                self.table_name,
+                {"user_id": user_id, "provider": provider.value},
+                update_expression,
+                values,
+                condition_expression="attribute_exists(user_id)",
+                expression_attribute_names=names
+            )
+            self._cache.set((user_id, provider.value), response["Attributes"])
+            return UserToken.from_dynamodb_item(response["Attributes"])
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return None
+            logger.error(f"Error updating user token values: {e}")
+            raise
     
     def delete(self, user_id: str, provider: TokenProvider) -> bool:
         """
@@ -168,6 +289,7 @@ class TokenRepository:
         }
         
         try:
+            self._cache.pop((user_id, provider.value))
             self.dynamodb.delete_item(self.table_name, key)
             return True
         except ClientError as e:
@@ -184,47 +306,64 @@ class TokenRepository:
         Returns:
             int: The number of deleted tokens
         """
+        def evict(pages: Iterable[List[Dict[str, Any]]]) -> Iterator[List[Dict[str, Any]]]:
+            for keys in pages:
+                for key in keys:
+                    self._cache.pop((key["user_id"]["S"], key["provider"]["S"]))
+                yield keys
+        
         try:
-            # Get all tokens for the user
-            tokens = self.get_tokens_by_user(user_id)
-            
-            # Delete them one by one
-            count = 0
-            for token in tokens:
-                self.delete(token.user_id, token.provider)
-                count += 1
-            
-            return count
+            # Stream key-only query pages straight into concurrent batch deletes
+            pages = self.dynamodb.query_keys(self.table_name, "user_id", user_id, ("user_id", "provider"))
+            return self.dynamodb.batch_delete_pages(self.table_name, evict(pages))
         except ClientError as e:
             logger.error(f"Error deleting user tokens: {e}")
             raise
     
-    def get_expired_tokens(self) -> List[UserToken]:
+    def get_expired_tokens(self, expires_before: Optional[datetime] = None) -> List[UserToken]:
         """
-        Get all expired tokens.
+        Get all tokens expiring before a cutoff.
+        
+        Every shard of the ExpiringTokensIndex is queried concurrently, so only
+        the matching tokens are read rather than the whole table.
         
+        Args:
+            expires_before: The cutoff; defaults to now plus the 30-second
+                buffer used by UserToken.is_expired
+            
         Returns:
             List[UserToken]: The list of expired tokens
         """
+        if expires_before is None:
+            expires_before = datetime.utcnow() + timedelta(seconds=30)
+        cutoff = expires_before.isoformat()
+        
         try:
-            # Unfortunately, DynamoDB doesn't support scanning with conditions on non-key attributes efficiently
-            # We'll need to do a full scan and filter in the application
-            now = datetime.utcnow()
-            
-            result = self.dynamodb.scan(
-                table_name=self.table_name
+            shard_items = self._executor.map(
+                lambda shard: self._query_expiring_shard(shard, cutoff), range(EXPIRY_SHARDS)
             )
-            
-            items = result.get("Items", [])
-            tokens = [UserToken.from_dynamodb_item(item) for item in items]
-            
-            # Filter expired tokens
-            expired_tokens = [token for token in tokens if token.is_expired()]
-            
-            return expired_tokens
+            return [UserToken.from_dynamodb_item(item) for items in shard_items for item in items]
         except ClientError as e:
-            logger.error(f"Error scanning for expired tokens: {e}")
+            logger.error(f"Error querying for expired tokens: {e}")
             raise
+    
+    def _query_expiring_shard(self, shard: int, cutoff: str) -> List[Dict[str, Any]]:
+        """Fetch every item of one ExpiringTokensIndex shard expiring at or before cutoff."""
+        items: List[Dict[str, Any]] = []
+        exclusive_start_key = None
+        while True:
+            result = self.dynamodb.query(
+                table_name=self.table_name,
+                index_name="ExpiringTokensIndex",
+                key_condition_expression=_EXPIRING_BEFORE,
+                expression_attribute_names=_EXPIRING_NAMES,
+                expression_attribute_values={":s": shard, ":e": cutoff},
+                exclusive_start_key=exclusive_start_key
+            )
+            items.extend(result.get("Items", []))
+            exclusive_start_key = result.get("LastEvaluatedKey")
+            if not exclusive_start_key:
+                return items
 
 
 # Singleton instance
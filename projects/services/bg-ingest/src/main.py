@@ -1,46 +1,74 @@
 """Main entry point for the BG Ingest Service."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import FastAPI, HTTPException, Depends, Request
 from starlette.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.utils import is_body_allowed_for_status_code
 from fastapi.responses import Response, JSONResponse
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST, make_asgi_app
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from starlette.status import HTTP_401_UNAUTHORIZED
 import base64
+import hashlib
+import hmac
+import time
+from collections import OrderedDict
 import jwt
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse as StarletteJSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.exceptions import HTTPException as StarletteHTTPException
+import orjson
 import uuid
 
 from src.utils.config import Settings, get_settings, setup_logging
 from src.data.dynamodb import get_dynamodb_client
+from src.data.sync_repository import get_sync_job_repository
+from src.data.token_repository import get_token_repository
 from src.api.middleware import RateLimiter, CacheControl
 from src.api.readings import router as readings_router
 from src.utils.logging_utils import redact_sensitive_data, setup_json_logging
 
 settings = get_settings()
-# Ensure we have a valid log level for testing scenarios where settings might be mocked
-try:
-    log_level = settings.log_level
-    log_output = getattr(settings, 'log_output', 'stdout')
-    log_file_path = getattr(settings, 'log_file_path', None)
-    # Handle case where settings.log_level is a MagicMock
-    if not isinstance(log_level, (str, int)) or (isinstance(log_level, str) and not hasattr(logging, log_level.upper())):
-        log_level = "INFO"
-    # Use structured JSON logging
-    setup_json_logging(log_level, log_output, log_file_path)
-except (ValueError, TypeError, AttributeError):
-    # Default to INFO if there's any error with the log level
-    setup_json_logging("INFO", "stdout", None)
 logger = logging.getLogger(__name__)
 
 security = HTTPBasic()
 
 
+def configure_logging(settings: Settings) -> None:
+    """
+    Set up structured JSON logging, falling back to INFO for an unknown level.
+    
+    Args:
+        settings: Application settings
+    """
+    log_level = str(settings.log_level).upper()
+    if not isinstance(logging.getLevelName(log_level), int):
+        log_level = "INFO"
+    setup_json_logging(log_level, settings.log_output, settings.log_file_path)
+
+
+async def keep_dynamodb_warm(interval: float) -> None:
+    """
+    Ping DynamoDB periodically so pooled connections are not dropped while idle.
+    
+    The first ping runs immediately, so the first request does not pay for
+    connection setup.
+    
+    Args:
+        interval: Seconds between pings
+    """
+    client = get_dynamodb_client()
+    while True:
+        await asyncio.to_thread(client.ping)
+        await asyncio.sleep(interval)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> Any:
     """
@@ -52,18 +80,19 @@ async def lifespan(app: FastAPI) -> Any:
     Yields:
         None
     """
-    # Startup logic
+    # Startup logic. Logging is configured here rather than at import so
+    # each worker does it once after forking.
+    configure_logging(settings)
     logger.info("Starting BG Ingest Service...")
     
-    # Initialize connections to AWS services
-    db_client = get_dynamodb_client()
-    # Create tables if they don't exist (in development mode)
-    if settings.service_env == "development":
-        try:
-            db_client.create_all_tables(wait=True)
-            logger.info("DynamoDB tables created/verified")
-        except Exception as e:
-            logger.error(f"Error creating DynamoDB tables: {e}")
+    # Initialize connections to AWS services. Missing tables are created on
+    # first use in development rather than checked eagerly here.
+    get_dynamodb_client()
+    get_sync_job_repository()
+    get_token_repository()
+    keepalive_task = None
+    if settings.dynamodb_keepalive_interval > 0:
+        keepalive_task = asyncio.create_task(keep_dynamodb_warm(settings.dynamodb_keepalive_interval))
     
     # Initialize connection to RabbitMQ (if applicable)
     
@@ -71,137 +100,259 @@ async def lifespan(app: FastAPI) -> Any:
     
     # Shutdown logic
     logger.info("Shutting down BG Ingest Service...")
+    if keepalive_task is not None:
+        keepalive_task.cancel()
+
+
+# Scope key under which the outermost middleware stores the parsed request headers
+HEADERS_SCOPE_KEY = "_headers_dict"
+
+
+def get_header(scope, name: bytes) -> Optional[bytes]:
+    """
+    Find one request header, using the headers parsed by RequestIDMiddleware if present.
+    
+    Args:
+        scope: The ASGI connection scope
+        name: Lower-case header name
+        
+    Returns:
+        Optional[bytes]: The first value of the header, or None if absent
+    """
+    headers = scope.get(HEADERS_SCOPE_KEY)
+    if headers is not None:
+        return headers.get(name)
+    return next((value for key, value in scope.get("headers") or () if key == name), None)
+
+
+def basic_auth_header(username: Optional[str], password: Optional[str]) -> Optional[bytes]:
+    """
+    Build the Authorization header value a client sends for HTTP Basic auth.
+    
+    Args:
+        username: Basic auth username
+        password: Basic auth password
+        
+    Returns:
+        Optional[bytes]: The expected header value, or None if either credential is unset
+    """
+    if username is None or password is None:
+        return None
+    return b"Basic " + base64.b64encode(f"{username}:{password}".encode("utf-8"))
 
 
 class MetricsAuthMiddleware:
-    def __init__(self, app, username, password):
+    def __init__(self, app, expected_header: Optional[bytes]):
         self.app = app
-        self.username = username
-        self.password = password
+        # Only the encoded header is kept; None rejects every request
+        self._expected_header = expected_header
+        self._unauthorized = Response(
+            status_code=HTTP_401_UNAUTHORIZED,
+            headers={"WWW-Authenticate": "Basic"},
+        )
 
     async def __call__(self, scope, receive, send):
         if scope["type"] == "http":
-            headers = dict(scope.get("headers") or [])
-            auth_header = headers.get(b"authorization")
-            if not auth_header or not auth_header.startswith(b"Basic "):
-                response = Response(
-                    status_code=HTTP_401_UNAUTHORIZED,
-                    headers={"WWW-Authenticate": "Basic"},
-                )
-                await response(scope, receive, send)
-                return
-            try:
-                encoded = auth_header.split(b" ", 1)[1]
-                decoded = base64.b64decode(encoded).decode()
-                username, password = decoded.split(":", 1)
-            except Exception:
-                response = Response(
-                    status_code=HTTP_401_UNAUTHORIZED,
-                    headers={"WWW-Authenticate": "Basic"},
-                )
-                await response(scope, receive, send)
-                return
-            if username != self.username or password != self.password:
-                response = Response(
-                    status_code=HTTP_401_UNAUTHORIZED,
-                    headers={"WWW-Authenticate": "Basic"},
-                )
-                await response(scope, receive, send)
+            auth_header = get_header(scope, b"authorization")
+            # compare_digest takes time independent of where the values differ
+            if self._expected_header is None or not hmac.compare_digest(auth_header or b"", self._expected_header):
+                await self._unauthorized(scope, receive, send)
                 return
         await self.app(scope, receive, send)
 
 
-class JWTAuthMiddleware(BaseHTTPMiddleware):
+def unauthorized_response(detail: str) -> Response:
+    """
+    Build a 401 JSON error response.
+    
+    Args:
+        detail: The error message
+        
+    Returns:
+        Response: Response with a {"detail": ...} body serialized by orjson
+    """
+    return Response(orjson.dumps({"detail": detail}), status_code=HTTP_401_UNAUTHORIZED, media_type="application/json")
+
+
+# Maximum number of decoded tokens kept by JWTAuthMiddleware
+JWT_CACHE_SIZE = 4096
+# Cached tokens this close to expiry are decoded again so expiry is reported normally
+JWT_CACHE_EXPIRY_MARGIN = 5
+# Gateway signatures older or further in the future than this many seconds are
+# rejected, so captured identity headers cannot be replayed
+GATEWAY_SIGNATURE_MAX_AGE = 5
+
+
+class JWTAuthMiddleware:
     def __init__(self, app):
-        super().__init__(app)
+        self.app = app
         self.secret_key = settings.jwt_secret_key
         self.issuer = settings.jwt_issuer
         self.audience = settings.jwt_audience
-        self.public_paths = {"/health", "/metrics", "/metrics/", "/docs", "/openapi.json"}
-
-    async def dispatch(self, request: Request, call_next):
-        logger = logging.getLogger(__name__)
-        # Skip auth for public endpoints
-        if request.url.path in self.public_paths:
-            return await call_next(request)
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
+        self.public_paths = frozenset(
+            path.encode() for path in ("/health", "/metrics", "/metrics/", "/docs", "/openapi.json")
+        )
+        # The fixed 401 bodies are serialized once and reused
+        self._missing_header_response = unauthorized_response("Missing or invalid authorization header")
+        self._expired_response = unauthorized_response("Token has expired")
+        # Decoded payloads keyed by a hash of the token, least recently used first
+        self._cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+
+    async def _decode(self, token: bytes) -> Dict[str, Any]:
+        """
+        Decode and validate a bearer token, reusing earlier results for the same token.
+        
+        Args:
+            token: The raw bearer token
+            
+        Returns:
+            Dict[str, Any]: The validated token claims
+            
+        Raises:
+            jwt.InvalidTokenError: If the token is invalid or expired
+        """
+        key = hashlib.blake2b(token, digest_size=16).digest()
+        payload = self._cache.get(key)
+        if payload is not None:
+            if payload["exp"] > time.time() + JWT_CACHE_EXPIRY_MARGIN:
+                self._cache.move_to_end(key)
+                return payload
+            del self._cache[key]
+        # Decoding is CPU-bound, so keep it off the event loop
+        payload = await run_in_threadpool(
+            jwt.decode,
+            token.decode("latin-1"),
+            self.secret_key,
+            algorithms=["HS256"],
+            issuer=self.issuer,
+            audience=self.audience,
+            options={"require": ["exp", "iss", "aud", "sub"]}
+        )
+        self._cache[key] = payload
+        if len(self._cache) > JWT_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return payload
+
+    async def __call__(self, scope, receive, send):
+        # Skip auth for non-HTTP scopes, public endpoints and identities the gateway
+        # already verified; raw_path is optional in ASGI
+        if scope["type"] != "http" or (
+            scope.get("raw_path") or scope["path"].encode()
+        ) in self.public_paths or "user_id" in scope.get("state", ()):
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        auth_header = get_header(scope, b"authorization")
+        if not auth_header or not auth_header.startswith(b"Bearer "):
             logger.warning(
                 "401 Unauthorized: Missing or invalid authorization header",
-                extra={"path": str(request.url.path), "status_code": 401, "reason": "missing_or_invalid_auth_header"}
+                extra={"path": path, "status_code": 401, "reason": "missing_or_invalid_auth_header"}
             )
-            return JSONResponse(status_code=401, content={"detail": "Missing or invalid authorization header"})
-        token = auth_header.replace("Bearer ", "")
+            await self._missing_header_response(scope, receive, send)
+            return
         try:
-            payload = jwt.decode(
-                token,
-                self.secret_key,
-                algorithms=["HS256"],
-                issuer=self.issuer,
-                audience=self.audience,
-                options={"require": ["exp", "iss", "aud", "sub"]}
-            )
-            # Attach user info to request.state
-            request.state.user_id = payload["sub"]
-            request.state.scopes = payload.get("scopes", [])
+            payload = await self._decode(auth_header[len(b"Bearer "):])
         except jwt.ExpiredSignatureError:
             logger.warning(
                 "401 Unauthorized: Token has expired",
-                extra={"path": str(request.url.path), "status_code": 401, "reason": "token_expired"}
+                extra={"path": path, "status_code": 401, "reason": "token_expired"}
             )
-            return JSONResponse(status_code=401, content={"detail": "Token has expired"})
+            await self._expired_response(scope, receive, send)
+            return
         except jwt.InvalidTokenError as e:
             logger.warning(
                 f"401 Unauthorized: Invalid token: {str(e)}",
-                extra={"path": str(request.url.path), "status_code": 401, "reason": "invalid_token"}
+                extra={"path": path, "status_code": 401, "reason": "invalid_token"}
             )
-            return JSONResponse(status_code=401, content={"detail": f"Invalid token: {str(e)}"})
-        return await call_next(request)
+            await unauthorized_response(f"Invalid token: {str(e)}")(scope, receive, send)
+            return
+        # Attach user info to request.state
+        state = scope.setdefault("state", {})
+        state["user_id"] = payload["sub"]
+        state["scopes"] = list(payload.get("scopes", []))
+        await self.app(scope, receive, send)
 
 
-class RedactSensitiveDataMiddleware(BaseHTTPMiddleware):
+class GatewayTrustMiddleware:
     """
-    Middleware to redact sensitive fields from request and response payloads in logs and error responses.
-    Does not modify data passed to endpoints, only what is logged or returned in error responses.
+    Middleware accepting identities already verified by the API gateway.
+    The gateway sends X-User-Id, X-Scopes (space-separated), X-Auth-Timestamp (Unix
+    seconds) and X-Auth-Sig, the hex HMAC-SHA256 under the shared gateway key of
+    "<timestamp>\\n<method>\\n<raw path>\\n<user id>\\n<scopes>". Signatures are
+    bound to the request line and only accepted within GATEWAY_SIGNATURE_MAX_AGE
+    seconds of the timestamp. Requests with a valid signature skip JWT decoding;
+    all others fall through to JWTAuthMiddleware unchanged.
     """
-    async def dispatch(self, request, call_next):
-        # Redact sensitive fields in request body for logging (if JSON)
-        if request.headers.get("content-type", "").startswith("application/json"):
-            try:
-                body = await request.json()
-                safe_body = redact_sensitive_data(body)
-                # Example: logger.info("Request body", extra={"body": safe_body})
-            except Exception:
-                pass  # Ignore if not JSON or error
-        # Process response
-        response = await call_next(request)
-        if response.headers.get("content-type", "").startswith("application/json"):
-            try:
-                payload = await response.body()
-                import json
-                data = json.loads(payload)
-                safe_data = redact_sensitive_data(data)
-                # Example: logger.info("Response body", extra={"body": safe_data})
-                # Optionally, replace response body with redacted version for error responses
-                if response.status_code >= 400:
-                    return StarletteJSONResponse(safe_data, status_code=response.status_code)
-            except Exception:
-                pass  # Ignore if not JSON or error
-        return response
-
-
-class RequestIDMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, key: Optional[bytes] = None):
+        self.app = app
+        if key is None and settings.gateway_auth_key is not None:
+            key = settings.gateway_auth_key.get_secret_value().encode("utf-8")
+        self.key = key
+
+    def _verified_identity(self, scope) -> Optional[Tuple[str, List[str]]]:
+        """Return (user_id, scopes) from valid, fresh gateway headers, else None."""
+        signature = get_header(scope, b"x-auth-sig")
+        user_id = get_header(scope, b"x-user-id")
+        timestamp = get_header(scope, b"x-auth-timestamp")
+        if not (signature and user_id and timestamp):
+            return None
+        try:
+            signed_at = int(timestamp)
+        except ValueError:
+            return None
+        if abs(time.time() - signed_at) > GATEWAY_SIGNATURE_MAX_AGE:
+            return None
+        scopes = get_header(scope, b"x-scopes") or b""
+        message = b"\n".join((
+            timestamp,
+            scope["method"].encode("ascii"),
+            scope.get("raw_path") or scope["path"].encode(),
+            user_id,
+            scopes,
+        ))
+        expected = hmac.new(self.key, message, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(signature, expected.encode("ascii")):
+            return None
+        return user_id.decode("utf-8"), scopes.decode("utf-8").split()
+
+    async def __call__(self, scope, receive, send):
+        if self.key is not None and scope["type"] == "http":
+            identity = self._verified_identity(scope)
+            if identity is not None:
+                state = scope.setdefault("state", {})
+                state["user_id"], state["scopes"] = identity
+        await self.app(scope, receive, send)
+
+
+class RequestIDMiddleware:
     """
     Middleware to track and propagate a unique request ID for each request.
     Adds X-Request-ID to response headers and attaches to request.state.
+    As the outermost middleware it also parses the request headers once for get_header.
     """
-    async def dispatch(self, request, call_next):
-        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
-        request.state.request_id = request_id
-        # Optionally, add request_id to logger extra for this request
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        return response
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # Parse the headers once for every inner middleware; reversed so the
+        # first value of a repeated header wins, as in get_header
+        scope[HEADERS_SCOPE_KEY] = dict(reversed(scope["headers"]))
+        request_id_header = get_header(scope, b"x-request-id")
+        request_id = request_id_header.decode("latin-1") if request_id_header else str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            scope.pop(HEADERS_SCOPE_KEY, None)
 
 
 def create_app() -> FastAPI:
@@ -243,8 +394,8 @@ def create_app() -> FastAPI:
     # Add JWT middleware
     app.add_middleware(JWTAuthMiddleware)
     
-    # Add Redact Sensitive Data middleware
-    app.add_middleware(RedactSensitiveDataMiddleware)
+    # Trust gateway-verified identities ahead of JWT auth, if configured
+    app.add_middleware(GatewayTrustMiddleware)
     
     # Add Request ID middleware
     app.add_middleware(RequestIDMiddleware)
@@ -264,14 +415,36 @@ def create_app() -> FastAPI:
         return {"status": "healthy", "service": "bg-ingest"}
     
     # Mount the Prometheus metrics endpoint with auth middleware
-    metrics_user = settings.metrics_user
     metrics_pass = settings.metrics_pass.get_secret_value() if hasattr(settings.metrics_pass, 'get_secret_value') else settings.metrics_pass
     metrics_app = make_asgi_app()
     app.mount(
         "/metrics",
-        MetricsAuthMiddleware(metrics_app, metrics_user, metrics_pass)
+        MetricsAuthMiddleware(metrics_app, basic_auth_header(settings.metrics_user, metrics_pass))
     )
 
+    # Error responses may echo request data, so redact them where they are built
+    @app.exception_handler(StarletteHTTPException)
+    async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+        headers = getattr(exc, "headers", None)
+        if not is_body_allowed_for_status_code(exc.status_code):
+            return Response(status_code=exc.status_code, headers=headers)
+        detail = exc.detail
+        if isinstance(detail, (dict, list)):
+            detail = redact_sensitive_data(detail)
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": detail},
+            headers=headers,
+        )
+
+    @app.exception_handler(RequestValidationError)
+    async def validation_exception_handler(request: Request, exc: RequestValidationError):
+        return JSONResponse(
+            status_code=422,
+            # jsonable_encoder returns fresh containers, so they can be redacted in place
+            content={"detail": redact_sensitive_data(jsonable_encoder(exc.errors()), inplace=True)},
+        )
+
     # Global exception handler to prevent leaking sensitive data
     @app.exception_handler(Exception)
     async def global_exception_handler(request: Request, exc: Exception):
@@ -303,6 +476,10 @@ if __name__ == "__main__":
         "src.main:app",
         host="0.0.0.0",
         port=5001,
-        reload=True,
+        # The reloader polls the filesystem, so only use it while developing
+        reload=settings.service_env == "development",
+        # "auto" picks uvloop and httptools when installed (uvicorn[standard])
+        loop="auto",
+        http="auto",
         log_level=settings.log_level.lower(),
     ) 
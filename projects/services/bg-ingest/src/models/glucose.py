@@ -2,9 +2,9 @@
 
 from datetime import datetime
 from enum import Enum
-from typing import Literal, Optional
+from typing import Literal, Optional, Tuple
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 
 
 class TrendDirection(str, Enum):
@@ -34,6 +34,12 @@ class ReadingType(str, Enum):
     METER = "meter"
 
 
+# Value-to-member maps for parsing stored items with a plain dict lookup
+_TREND_DIRECTIONS = {member.value: member for member in TrendDirection}
+_READING_TYPES = {member.value: member for member in ReadingType}
+_READING_SOURCES = {member.value: member for member in ReadingSource}
+
+
 class DeviceInfo(BaseModel):
     """Device information for a glucose reading."""
 
@@ -56,7 +62,10 @@ class GlucoseReading(BaseModel):
     reading_type: ReadingType = Field(ReadingType.CGM, description="Type of reading")
     source: ReadingSource = Field(ReadingSource.DEXCOM, description="Source of the reading")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Timestamp when record was created")
-    updated_at: datetime = Field(default_factory=datetime.utcnow, description="Timestamp when record was last updated")
+    updated_at: datetime = Field(default_factory=lambda data: data["created_at"], description="Timestamp when record was last updated")
+    
+    # (timestamp, ISO string) pair; recomputed if the timestamp is reassigned
+    _timestamp_iso: Optional[Tuple[datetime, str]] = PrivateAttr(default=None)
     
     @field_validator("glucose_value")
     @classmethod
@@ -66,30 +75,37 @@ class GlucoseReading(BaseModel):
             raise ValueError(f"Glucose value {value} is outside physiological range (20-600 mg/dL)")
         return value
     
+    @property
+    def timestamp_iso(self) -> str:
+        """ISO 8601 form of the timestamp, computed once per timestamp value."""
+        cached = self._timestamp_iso
+        if cached is None or cached[0] is not self.timestamp:
+            cached = self._timestamp_iso = (self.timestamp, self.timestamp.isoformat())
+        return cached[1]
+    
     def to_dynamodb_item(self) -> dict:
         """Convert the model to a DynamoDB item."""
-        # Convert to dictionary and handle special types
-        item = self.model_dump()
-        
-        # DynamoDB doesn't store Python objects directly, so convert to string or other formats
-        item["timestamp"] = item["timestamp"].isoformat()
-        item["created_at"] = item["created_at"].isoformat()
-        item["updated_at"] = item["updated_at"].isoformat()
-        
-        # Convert Enum values to strings
-        item["trend_direction"] = item["trend_direction"].value
-        item["reading_type"] = item["reading_type"].value
-        item["source"] = item["source"].value
-        
-        # Flatten device_info to avoid nested objects
-        device_info = item.pop("device_info")
-        item["device_id"] = device_info["device_id"]
-        item["device_serial_number"] = device_info["serial_number"]
-        item["device_transmitter_id"] = device_info.get("transmitter_id")
-        item["device_model"] = device_info.get("model")
-        item["device_manufacturer"] = device_info["manufacturer"]
-        
-        return item
+        created_at = self.created_at.isoformat()
+        device_info = self.device_info
+        # Build the item in one pass; DynamoDB stores enums as strings and
+        # device_info flattened to avoid nested objects
+        return {
+            "user_id": self.user_id,
+            "timestamp": self.timestamp_iso,
+            "glucose_value": self.glucose_value,
+            "glucose_unit": self.glucose_unit,
+            "trend_direction": self.trend_direction.value,
+            "reading_type": self.reading_type.value,
+            "source": self.source.value,
+            "created_at": created_at,
+            # Fresh records have identical timestamps, so format only once
+            "updated_at": created_at if self.updated_at == self.created_at else self.updated_at.isoformat(),
+            "device_id": device_info.device_id,
+            "device_serial_number": device_info.serial_number,
+            "device_transmitter_id": device_info.transmitter_id,
+            "device_model": device_info.model,
+            "device_manufacturer": device_info.manufacturer,
+        }
     
     @classmethod
     def from_dynamodb_item(cls, item: dict) -> "GlucoseReading":
@@ -105,13 +121,21 @@ class GlucoseReading(BaseModel):
         
         # Parse dates from ISO format
         timestamp = datetime.fromisoformat(item["timestamp"])
-        created_at = datetime.fromisoformat(item["created_at"]) if "created_at" in item else datetime.utcnow()
-        updated_at = datetime.fromisoformat(item["updated_at"]) if "updated_at" in item else datetime.utcnow()
+        created_at = datetime.fromisoformat(item["created_at"]) if "created_at" in item else None
+        updated_at = datetime.fromisoformat(item["updated_at"]) if "updated_at" in item else None
+        if created_at is None or updated_at is None:
+            now = datetime.utcnow()
+            created_at = created_at or now
+            updated_at = updated_at or now
         
         # Parse enums from strings
-        trend_direction = TrendDirection(item.get("trend_direction", TrendDirection.UNKNOWN.value))
-        reading_type = ReadingType(item.get("reading_type", ReadingType.CGM.value))
-        source = ReadingSource(item.get("source", ReadingSource.DEXCOM.value))
+        # Unknown values fall back to the Enum call so they still raise ValueError
+        trend_direction = item.get("trend_direction", TrendDirection.UNKNOWN.value)
+        trend_direction = _TREND_DIRECTIONS.get(trend_direction) or TrendDirection(trend_direction)
+        reading_type = item.get("reading_type", ReadingType.CGM.value)
+        reading_type = _READING_TYPES.get(reading_type) or ReadingType(reading_type)
+        source = item.get("source", ReadingSource.DEXCOM.value)
+        source = _READING_SOURCES.get(source) or ReadingSource(source)
         
         return cls(
             user_id=item["user_id"],
@@ -7,6 +7,9 @@ from typing import Dict, List, Optional, Any
 
 from pydantic import BaseModel, Field, field_validator
 
+# Delay before the first retry of a failed job; doubled for each further failure
+RETRY_BACKOFF_BASE = timedelta(minutes=1)
+
 
 class SyncStatus(str, Enum):
     """Enum for sync job status."""
@@ -55,6 +58,7 @@ class SyncJob(BaseModel):
     retry_count: int = Field(0, description="Number of retry attempts")
     max_retries: int = Field(3, description="Maximum number of retry attempts")
     scheduled_time: Optional[datetime] = Field(None, description="Time when the job is scheduled to run")
+    next_retry_at: Optional[datetime] = Field(None, description="Earliest time a failed job may be retried")
     started_at: Optional[datetime] = Field(None, description="Time when the job started processing")
     completed_at: Optional[datetime] = Field(None, description="Time when the job completed")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Time when the job was created")
@@ -94,6 +98,11 @@ class SyncJob(BaseModel):
         self.error_message = error_message
         self.retry_count += 1
         self.updated_at = datetime.utcnow()
+        self.next_retry_at = self.retry_backoff_deadline()
+    
+    def retry_backoff_deadline(self) -> datetime:
+        """Return when a job that last failed at updated_at may next be retried."""
+        return self.updated_at + RETRY_BACKOFF_BASE * 2 ** (self.retry_count - 1)
     
     def to_dynamodb_item(self) -> dict:
         """Convert the model to a DynamoDB item."""
@@ -102,10 +111,14 @@ class SyncJob(BaseModel):
         
         # Convert datetime fields to ISO format strings
         for field in ["start_date", "end_date", "last_sync_timestamp", "scheduled_time", 
-                      "started_at", "completed_at", "created_at", "updated_at"]:
+                      "next_retry_at", "started_at", "completed_at", "created_at", "updated_at"]:
             if item.get(field):
                 item[field] = item[field].isoformat()
         
+        # next_retry_at keys StatusRetryIndex, which rejects NULL; omit it to keep the index sparse
+        if item["next_retry_at"] is None:
+            del item["next_retry_at"]
+        
         # Convert enum values to strings
         item["status"] = item["status"].value
         item["sync_type"] = item["sync_type"].value
@@ -124,6 +137,7 @@ class SyncJob(BaseModel):
             "end_date": None, 
             "last_sync_timestamp": None,
             "scheduled_time": None, 
+            "next_retry_at": None, 
             "started_at": None, 
             "completed_at": None,
             "created_at": datetime.utcnow(),
@@ -164,6 +178,7 @@ class SyncJob(BaseModel):
             retry_count=item.get("retry_count", 0),
             max_retries=item.get("max_retries", 3),
             scheduled_time=datetime_fields["scheduled_time"],
+            next_retry_at=datetime_fields["next_retry_at"],
             started_at=datetime_fields["started_at"],
             completed_at=datetime_fields["completed_at"],
             created_at=datetime_fields["created_at"],
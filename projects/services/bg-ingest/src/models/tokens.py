@@ -1,10 +1,20 @@
 """Models for user authentication tokens."""
 
-from datetime import datetime, timedelta
+import zlib
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel, Field, field_validator, SecretStr
+from pydantic import BaseModel, Field, SecretStr, ValidationInfo, field_validator
+
+# Number of partitions of the ExpiringTokensIndex; queries fan out over all of them
+EXPIRY_SHARDS = 16
+
+# Attribute DynamoDB's time to live reads to delete abandoned tokens
+TOKEN_TTL_ATTRIBUTE = "expires_at_epoch"
+
+# How long after its access token expires an unrefreshed token is kept
+TOKEN_TTL_GRACE = timedelta(days=30)
 
 
 class TokenType(str, Enum):
@@ -21,6 +31,40 @@ class TokenProvider(str, Enum):
     INTERNAL = "internal"
 
 
+# Value-to-member maps for parsing stored items with a plain dict lookup
+_TOKEN_TYPES = {member.value: member for member in TokenType}
+_TOKEN_PROVIDERS = {member.value: member for member in TokenProvider}
+
+
+def expiry_shard(user_id: str) -> int:
+    """Return the ExpiringTokensIndex partition a user's tokens are written to."""
+    # crc32 rather than hash(): string hashes are salted per process
+    return zlib.crc32(user_id.encode()) % EXPIRY_SHARDS
+
+
+def token_ttl_epoch(expires_at: datetime) -> int:
+    """Return the epoch second at which DynamoDB may delete a token expiring at expires_at."""
+    # Naive timestamps throughout this service are UTC
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return int((expires_at + TOKEN_TTL_GRACE).timestamp())
+
+
+def token_fingerprint(
+    access_token: str,
+    refresh_token: Optional[str],
+    scope: str,
+) -> int:
+    """
+    Hash the raw credential values of a token.
+
+    expires_at is left out: it is derived from the time the provider response
+    was received, so it differs slightly on every refresh even for unchanged
+    credentials. Callers compare it separately, with a tolerance.
+    """
+    return hash((access_token, refresh_token, scope))
+
+
 class UserToken(BaseModel):
     """Model for storing user authentication tokens."""
 
@@ -32,12 +76,15 @@ class UserToken(BaseModel):
     expires_at: datetime = Field(..., description="Timestamp when the access token expires")
     scope: str = Field("", description="OAuth scope for the token")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Timestamp when the token was created")
-    updated_at: datetime = Field(default_factory=datetime.utcnow, description="Timestamp when the token was last updated")
+    updated_at: datetime = Field(default_factory=lambda data: data["created_at"], description="Timestamp when the token was last updated")
     
     @field_validator("expires_at")
     @classmethod
-    def validate_expiration(cls, value: datetime) -> datetime:
+    def validate_expiration(cls, value: datetime, info: ValidationInfo) -> datetime:
         """Validate that the expiration timestamp is in the future."""
+        # Stored tokens may legitimately have expired since they were written
+        if info.context and info.context.get("from_dynamodb"):
+            return value
         if value <= datetime.utcnow():
             raise ValueError("Token expiration must be in the future")
         return value
@@ -53,47 +100,64 @@ class UserToken(BaseModel):
         threshold = datetime.utcnow() + timedelta(minutes=threshold_minutes)
         return threshold >= self.expires_at
     
+    def fingerprint(self) -> int:
+        """Return a hash of the stored credential values, used to detect no-op updates."""
+        return token_fingerprint(
+            self.access_token.get_secret_value(),
+            self.refresh_token.get_secret_value() if self.refresh_token else None,
+            self.scope,
+        )
+    
     def to_dynamodb_item(self) -> dict:
         """Convert the model to a DynamoDB item."""
-        # Convert to dictionary and handle special types
-        item = self.model_dump()
-        
-        # Handle SecretStr values
-        item["access_token"] = self.access_token.get_secret_value()
-        if self.refresh_token:
-            item["refresh_token"] = self.refresh_token.get_secret_value()
-        
-        # Convert datetime to ISO format strings
-        item["expires_at"] = item["expires_at"].isoformat()
-        item["created_at"] = item["created_at"].isoformat()
-        item["updated_at"] = item["updated_at"].isoformat()
-        
-        # Convert enum values to strings
-        item["provider"] = item["provider"].value
-        item["token_type"] = item["token_type"].value
-        
-        return item
+        created_at = self.created_at.isoformat()
+        # Build the item in one pass, unwrapping secrets and storing enums and
+        # datetimes as strings
+        return {
+            "user_id": self.user_id,
+            "provider": self.provider.value,
+            "token_type": self.token_type.value,
+            "access_token": self.access_token.get_secret_value(),
+            "refresh_token": self.refresh_token.get_secret_value() if self.refresh_token else None,
+            "expires_at": self.expires_at.isoformat(),
+            "scope": self.scope,
+            "created_at": created_at,
+            # Fresh records have identical timestamps, so format only once
+            "updated_at": created_at if self.updated_at == self.created_at else self.updated_at.isoformat(),
+            # Partition key of the ExpiringTokensIndex, sorted by expires_at
+            "expires_shard": expiry_shard(self.user_id),
+            TOKEN_TTL_ATTRIBUTE: token_ttl_epoch(self.expires_at),
+        }
     
     @classmethod
     def from_dynamodb_item(cls, item: dict) -> "UserToken":
         """Create a UserToken instance from a DynamoDB item."""
         # Parse dates from ISO format
         expires_at = datetime.fromisoformat(item["expires_at"])
-        created_at = datetime.fromisoformat(item["created_at"]) if "created_at" in item else datetime.utcnow()
-        updated_at = datetime.fromisoformat(item["updated_at"]) if "updated_at" in item else datetime.utcnow()
+        created_at = datetime.fromisoformat(item["created_at"]) if "created_at" in item else None
+        updated_at = datetime.fromisoformat(item["updated_at"]) if "updated_at" in item else None
+        if created_at is None or updated_at is None:
+            now = datetime.utcnow()
+            created_at = created_at or now
+            updated_at = updated_at or now
         
         # Parse enums from strings
-        provider = TokenProvider(item["provider"])
-        token_type = TokenType(item.get("token_type", TokenType.OAUTH.value))
+        # Unknown values fall back to the Enum call so they still raise ValueError
+        provider = _TOKEN_PROVIDERS.get(item["provider"]) or TokenProvider(item["provider"])
+        token_type = item.get("token_type", TokenType.OAUTH.value)
+        token_type = _TOKEN_TYPES.get(token_type) or TokenType(token_type)
         
-        return cls(
-            user_id=item["user_id"],
-            provider=provider,
-            token_type=token_type,
-            access_token=SecretStr(item["access_token"]),
-            refresh_token=SecretStr(item["refresh_token"]) if "refresh_token" in item and item["refresh_token"] else None,
-            expires_at=expires_at,
-            scope=item.get("scope", ""),
-            created_at=created_at,
-            updated_at=updated_at
+        return cls.model_validate(
+            dict(
+                user_id=item["user_id"],
+                provider=provider,
+                token_type=token_type,
+                access_token=SecretStr(item["access_token"]),
+                refresh_token=SecretStr(item["refresh_token"]) if "refresh_token" in item and item["refresh_token"] else None,
+                expires_at=expires_at,
+                scope=item.get("scope", ""),
+                created_at=created_at,
+                updated_at=updated_at
+            ),
+            context={"from_dynamodb": True}
         ) 
@@ -1,10 +1,48 @@
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from pydantic import ValidationError as ModelValidationError
+from src.models.glucose import DeviceInfo, GlucoseReading, TrendDirection
 from src.utils.pipeline import DataTransformationPipeline
-from src.utils.error_handling import ErrorCollector, ErrorSeverity
+from src.utils.error_handling import ErrorCollector, ErrorRecord, ErrorSeverity
 import logging
 
+if TYPE_CHECKING:
+    from src.data.glucose_repository import GlucoseReadingRepository
+
 logger = logging.getLogger(__name__)
 
+# Normalized trend values (see normalize_trend_direction) mapped to the stored enum
+TREND_DIRECTIONS = {
+    'flat': TrendDirection.STEADY,
+    'rising': TrendDirection.RISING,
+    'falling': TrendDirection.FALLING,
+    'rapidly rising': TrendDirection.RISING_RAPIDLY,
+    'rapidly falling': TrendDirection.FALLING_RAPIDLY,
+}
+
+def to_glucose_reading(record: Dict[str, Any]) -> GlucoseReading:
+    """
+    Build a GlucoseReading from a record normalized by DataTransformationPipeline.
+    Raises pydantic.ValidationError if the record lacks fields the model requires.
+    """
+    device_info = record['device_info']
+    timestamp = record['timestamp']
+    if timestamp is not None:
+        # Stored sort keys are naive UTC ISO strings; normalize_timestamp returns "...Z"
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00')).astimezone(timezone.utc).replace(tzinfo=None)
+    return GlucoseReading(
+        user_id=record['user_id'],
+        timestamp=timestamp,
+        glucose_value=record['glucose_value'],
+        trend_direction=TREND_DIRECTIONS.get(record['trend_direction'], TrendDirection.UNKNOWN),
+        device_info=DeviceInfo(
+            device_id=device_info['device_id'],
+            serial_number=device_info['serial_number'],
+            model=device_info['model'],
+            manufacturer=device_info['manufacturer'],
+        ),
+    )
+
 class BatchProcessor:
     """
     Processes a batch of records using a DataTransformationPipeline.
@@ -22,21 +60,42 @@ class BatchProcessor:
         """
         Process a list of records. Returns (processed, error_collector).
         """
-        for idx, record in enumerate(records):
-            normalized, errors = self.pipeline.process_reading(record)
-            if errors:
-                self.failed.append(record)
-                for field, msg in errors.items():
-                    self.error_collector.add_error(
-                        'ValidationError', field, f"Record {idx}: {msg}", ErrorSeverity.HIGH
-                    )
-                if self.error_strategy == 'abort':
-                    logger.error(f"Aborting batch on error at record {idx}: {errors}")
-                    break
-                continue  # skip
-            self.processed.append(normalized)
+        abort = self.error_strategy == 'abort'
+        normalized_list, errors_list = self.pipeline.process_batch(records, stop_on_error=abort)
+        self.processed.extend([n for n, e in zip(normalized_list, errors_list) if not e])
+        self.failed.extend([r for r, e in zip(records, errors_list) if e])
+        severity = ErrorSeverity.HIGH.value
+        self.error_collector.extend([
+            ErrorRecord('ValidationError', field, f"Record {idx}: {msg}", severity)
+            for idx, errors in enumerate(errors_list) if errors
+            for field, msg in errors.items()
+        ])
+        if abort and errors_list and errors_list[-1]:
+            idx = len(errors_list) - 1
+            logger.error(f"Aborting batch on error at record {idx}: {errors_list[idx]}")
         return self.processed, self.error_collector
 
+    def flush_to_dynamodb(self, repository: 'GlucoseReadingRepository') -> List[GlucoseReading]:
+        """
+        Write the processed records with batched writes.
+        The repository sends dynamodb_batch_write_max items per BatchWriteItem call and
+        retries unprocessed items with backoff. Records that cannot be stored as a
+        GlucoseReading are moved to failed. Returns the readings DynamoDB acknowledged.
+        """
+        readings = []
+        storable = []
+        for idx, record in enumerate(self.processed):
+            try:
+                readings.append(to_glucose_reading(record))
+                storable.append(record)
+            except ModelValidationError as e:
+                self.failed.append(record)
+                self.error_collector.add_error(
+                    'ValidationError', None, f"Processed record {idx}: {e.error_count()} model errors", ErrorSeverity.HIGH
+                )
+        self.processed = storable
+        return repository.batch_create(readings)
+
     def summary(self) -> Dict[str, Any]:
         """
         Returns a summary of the batch processing results.
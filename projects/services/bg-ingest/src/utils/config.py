@@ -1,17 +1,65 @@
 """Configuration utilities for the BG Ingest Service."""
 
-import json
 import os
-from functools import lru_cache
-from typing import Any, Dict, List, Optional, Union
+from functools import cache, cached_property
+from typing import Any, Dict, List, Optional, Union, get_args
 
-import boto3
-from botocore.exceptions import ClientError
-from pydantic import Field, SecretStr, field_validator
+import orjson
+from pydantic import Field, SecretStr, TypeAdapter, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import logging
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
+
+
+# BatchGetSecretValue accepts at most this many secret IDs per call
+BATCH_GET_SECRETS_MAX = 20
+
+# Schemes a CORS origin may start with; others get https:// prepended
+_ORIGIN_SCHEMES = ("http://", "https://")
+
+# botocore Config options for the Secrets Manager client: keep connections alive
+# between lookups and fail fast rather than waiting on the 60 s default timeouts
+SECRETS_MANAGER_CONFIG = dict(
+    tcp_keepalive=True,
+    connect_timeout=5,
+    read_timeout=10,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    max_pool_connections=50,
+)
+
+# Parses and validates a SecretString in one pass; built once since
+# constructing a validator is far more expensive than running it
+_SECRET_PAYLOAD = TypeAdapter(Dict[str, Any])
+
+
+@cache
+def _secrets_manager_client(region_name: str, endpoint_url: Optional[str]):
+    """
+    Create a Secrets Manager client, shared by every AwsSecretsManager for the same target.
+
+    boto3 clients are thread-safe, and building one loads the service model and
+    resolves credentials, so it is done once per (region, endpoint). boto3 itself
+    is imported here rather than at module level, as it roughly doubles the
+    import time of this module and most dev/test processes never need it.
+
+    Args:
+        region_name: AWS region name
+        endpoint_url: Custom endpoint URL, or None for AWS
+
+    Returns:
+        The boto3 Secrets Manager client
+    """
+    import boto3
+    from botocore.config import Config
+
+    # Use default credentials from environment or instance profile
+    return boto3.client(
+        service_name="secretsmanager",
+        region_name=region_name,
+        endpoint_url=endpoint_url,
+        config=Config(**SECRETS_MANAGER_CONFIG),
+    )
 
 
 class AwsSecretsManager:
@@ -25,12 +73,14 @@ class AwsSecretsManager:
             region_name: AWS region name
         """
         self.region_name = region_name or os.environ.get("AWS_REGION", "us-east-1")
-        # Use default credentials from environment or instance profile
-        self.client = boto3.client(
-            service_name="secretsmanager",
-            region_name=self.region_name,
-            endpoint_url=os.environ.get("AWS_SECRETSMANAGER_ENDPOINT"),
-        )
+        # Read once: in development, lookup failures are logged instead of raised
+        self.is_dev = os.environ.get("SERVICE_ENV", "development") == "development"
+        self.endpoint_url = os.environ.get("AWS_SECRETSMANAGER_ENDPOINT")
+    
+    @cached_property
+    def client(self):
+        """The shared boto3 client, only created once a secret is actually fetched."""
+        return _secrets_manager_client(self.region_name, self.endpoint_url)
     
     def get_secret(self, secret_name: str) -> Dict[str, Any]:
         """
@@ -44,23 +94,94 @@ class AwsSecretsManager:
             
         Raises:
             ClientError: If the secret cannot be retrieved
+            ValueError: If the secret is binary or not a JSON object
         """
+        from botocore.exceptions import ClientError
+
         try:
             response = self.client.get_secret_value(SecretId=secret_name)
             if "SecretString" in response:
-                return json.loads(response["SecretString"])
+                return _SECRET_PAYLOAD.validate_json(response["SecretString"])
             else:
                 # Binary secrets not yet supported
                 raise ValueError("Binary secrets are not supported")
         except ClientError as e:
             # For development/testing environments, we'll log and return empty
             # dict instead of failing when secrets can't be retrieved
-            if os.environ.get("SERVICE_ENV", "development") == "development":
+            if self.is_dev:
                 print(f"Warning: Could not retrieve secret {secret_name}: {str(e)}")
                 return {}
             raise
 
 
+    def get_secrets(self, secret_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve several secrets with BatchGetSecretValue instead of one call each.
+        
+        Args:
+            secret_names: Names or ARNs of the secrets
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Secret values keyed by the requested name or ARN;
+                secrets that could not be retrieved are omitted in development
+            
+        Raises:
+            ClientError: If a secret cannot be retrieved
+            ValueError: If a secret is binary or not a JSON object
+        """
+        from botocore.exceptions import ClientError
+
+        secrets: Dict[str, Dict[str, Any]] = {}
+        try:
+            for start in range(0, len(secret_names), BATCH_GET_SECRETS_MAX):
+                chunk = secret_names[start:start + BATCH_GET_SECRETS_MAX]
+                response = self.client.batch_get_secret_value(SecretIdList=chunk)
+                for error in response.get("Errors", []):
+                    raise ClientError(
+                        {"Error": {"Code": error.get("ErrorCode"), "Message": error.get("Message")}},
+                        "BatchGetSecretValue",
+                    )
+                # Map each value back to the ID it was requested by, name or ARN
+                values = {}
+                for value in response.get("SecretValues", []):
+                    if "SecretString" not in value:
+                        # Binary secrets not yet supported
+                        raise ValueError("Binary secrets are not supported")
+                    values[value["Name"]] = values[value["ARN"]] = value["SecretString"]
+                for secret_name in chunk:
+                    if secret_name in values:
+                        secrets[secret_name] = _SECRET_PAYLOAD.validate_json(values[secret_name])
+        except ClientError as e:
+            # For development/testing environments, we'll log and return what was
+            # retrieved instead of failing when secrets can't be retrieved
+            if self.is_dev:
+                print(f"Warning: Could not retrieve secrets {secret_names}: {str(e)}")
+                return secrets
+            raise
+        return secrets
+
+
+def load_secret_values(secrets_manager: AwsSecretsManager, secret_name: str) -> Dict[str, Any]:
+    """
+    Load the values of one secret, or of several comma-separated secrets in one batch.
+    
+    Args:
+        secrets_manager: Secrets Manager wrapper to fetch with
+        secret_name: Secret name, or comma-separated names; later secrets override earlier ones
+        
+    Returns:
+        Dict[str, Any]: The merged secret values
+    """
+    secret_names = [name.strip() for name in secret_name.split(",") if name.strip()]
+    if len(secret_names) == 1:
+        return secrets_manager.get_secret(secret_names[0])
+    secrets = secrets_manager.get_secrets(secret_names)
+    merged: Dict[str, Any] = {}
+    for name in secret_names:
+        merged.update(secrets.get(name, {}))
+    return merged
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables and secrets."""
 
@@ -70,7 +191,9 @@ class Settings(BaseSettings):
     log_output: str = Field("stdout", description="Log output destination: stdout, file, or both")
     log_file_path: Optional[str] = Field(None, description="Path to log file if log_output includes file")
     cors_origins: List[str] = Field(["*"], description="CORS allowed origins")
-    secret_name: Optional[str] = Field(None, description="AWS Secrets Manager secret name")
+    secret_name: Optional[str] = Field(
+        None, description="AWS Secrets Manager secret name; comma-separated names are fetched together"
+    )
 
     # AWS Configuration
     aws_region: str = Field(..., description="AWS region")
@@ -82,6 +205,20 @@ class Settings(BaseSettings):
     dynamodb_table: str = Field("bg_readings", description="DynamoDB table for BG readings")
     dynamodb_user_tokens_table: str = Field("user_tokens", description="DynamoDB table for user tokens")
     dynamodb_sync_jobs_table: str = Field("sync_jobs", description="DynamoDB table for sync jobs")
+    dynamodb_batch_write_max: int = Field(
+        25, description="Maximum items per BatchWriteItem call (25 on AWS, up to 100 on ScyllaDB Alternator)"
+    )
+    batch_parallelism: int = Field(8, description="Number of DynamoDB batches written concurrently")
+    dynamodb_max_pool_connections: int = Field(50, description="Maximum pooled HTTP connections to DynamoDB")
+    dynamodb_connect_timeout: float = Field(5, description="DynamoDB connection timeout in seconds")
+    dynamodb_read_timeout: float = Field(10, description="DynamoDB read timeout in seconds")
+    dynamodb_max_attempts: int = Field(3, description="Maximum attempts per DynamoDB call, including the first")
+    enable_read_cache: bool = Field(True, description="Cache token and sync job lookups in process")
+    read_cache_ttl_seconds: float = Field(30, description="Seconds a cached token or sync job stays valid")
+    read_cache_max_entries: int = Field(10_000, description="Maximum cached entries per repository")
+    dynamodb_keepalive_interval: float = Field(
+        240, description="Seconds between DynamoDB keep-alive pings that stop idle pooled connections being dropped; 0 disables"
+    )
 
     # RabbitMQ Configuration
     rabbitmq_url: Optional[str] = Field(None, description="RabbitMQ connection URL")
@@ -109,6 +246,9 @@ class Settings(BaseSettings):
     jwt_secret_key: str = Field("changeme", description="Secret key for JWT signature validation")
     jwt_issuer: str = Field("bg-ingest", description="Expected JWT issuer (iss)")
     jwt_audience: str = Field("bg-ingest-users", description="Expected JWT audience (aud)")
+    gateway_auth_key: Optional[SecretStr] = Field(
+        None, description="Shared key for HMAC-signed identity headers set by the API gateway; unset disables gateway trust"
+    )
 
     # CORS Validation
     @field_validator("cors_origins")
@@ -130,12 +270,14 @@ class Settings(BaseSettings):
         if len(v) == 1 and "," in v[0]:
             v = v[0].split(",")
 
-        # Make sure all origins have a scheme
-        validated = []
-        for origin in v:
-            if not origin.startswith(("http://", "https://")):
-                origin = f"https://{origin}"
-            validated.append(origin)
+        # Make sure all origins have a scheme; the common, already valid case
+        # is returned as is
+        if all(origin.startswith(_ORIGIN_SCHEMES) for origin in v):
+            return v
+        validated = [
+            origin if origin.startswith(_ORIGIN_SCHEMES) else f"https://{origin}"
+            for origin in v
+        ]
         return validated
     
     # Required fields validation
@@ -161,21 +303,16 @@ class Settings(BaseSettings):
 
     # Integration with AWS Secrets Manager
     def _load_secrets(self) -> None:
-        """Load secrets from AWS Secrets Manager if configured."""
-        if not self.secret_name or self.service_env == "development":
-            return
-
+        """Load secrets from AWS Secrets Manager; only called when secret_name is set outside development."""
         try:
-            secrets_manager = AwsSecretsManager(self.aws_region)
-            secrets = secrets_manager.get_secret(self.secret_name)
+            secrets = load_secret_values(AwsSecretsManager(self.aws_region), self.secret_name)
             
             # Apply secrets to our configuration
             for key, value in secrets.items():
                 key_lower = key.lower()
-                if hasattr(self, key_lower):
-                    # Check if the field is a SecretStr type and wrap the value
-                    field_info = Settings.model_fields.get(key_lower)
-                    if field_info and field_info.annotation == SecretStr and isinstance(value, str):
+                if key_lower in _SETTINGS_FIELDS:
+                    # Wrap values of SecretStr fields
+                    if key_lower in _SECRET_STR_FIELDS and isinstance(value, str):
                         value = SecretStr(value)
                     setattr(self, key_lower, value)
         except Exception as e:
@@ -195,7 +332,8 @@ class Settings(BaseSettings):
     def __init__(self, *args, **kwargs):
         """Initialize settings with secrets."""
         super().__init__(*args, **kwargs)
-        self._load_secrets()
+        if self.secret_name and self.service_env != "development":
+            self._load_secrets()
         
         # Set development fallbacks
         if self.service_env == "development":
@@ -207,7 +345,16 @@ class Settings(BaseSettings):
                 self.dexcom_redirect_uri = "http://localhost:5001/api/oauth/callback"
 
 
-@lru_cache()
+# Field names checked when applying secrets, computed once from the model
+_SETTINGS_FIELDS = frozenset(Settings.model_fields)
+# Fields typed SecretStr or Optional[SecretStr]
+_SECRET_STR_FIELDS = frozenset(
+    name for name, field in Settings.model_fields.items()
+    if field.annotation is SecretStr or SecretStr in get_args(field.annotation)
+)
+
+
+@cache
 def get_settings() -> Settings:
     """
     Create and cache settings instance.
@@ -218,10 +365,30 @@ def get_settings() -> Settings:
     return Settings() 
 
 
+# LogRecord attributes that are not extra fields passed to the logger
+STANDARD_LOG_FIELDS = frozenset({
+    'name', 'msg', 'args', 'created', 'msecs', 'levelname', 'levelno',
+    'pathname', 'filename', 'module', 'exc_info', 'exc_text', 'stack_info',
+    'lineno', 'funcName', 'relativeCreated', 'thread', 'threadName',
+    'processName', 'process', 'getMessage', 'message'
+})
+
+
+# Naive UTC epoch; adding a timedelta to it is an exact and much cheaper way to
+# turn a record's timestamp into a naive UTC datetime than fromtimestamp(tz=utc)
+_EPOCH = datetime(1970, 1, 1)
+
+# Stream encodings whose bytes match orjson's UTF-8 output
+_UTF8_ENCODINGS = frozenset({"utf-8", "utf8", "UTF-8", "UTF8"})
+
+
 class JSONFormatter(logging.Formatter):
-    def format(self, record):
+    def format_dict(self, record) -> Dict[str, Any]:
+        """Build the JSON log entry for a record as a dict."""
         log_record = {
-            "timestamp": datetime.utcnow().isoformat(),
+            # The record already holds its creation time; no need to read the clock again.
+            # orjson writes the naive UTC datetime in the same form as isoformat()
+            "timestamp": _EPOCH + timedelta(seconds=record.created),
             "level": record.levelname,
             "message": record.getMessage(),
             "module": record.module,
@@ -231,21 +398,63 @@ class JSONFormatter(logging.Formatter):
         if record.exc_info:
             log_record["exception"] = self.formatException(record.exc_info)
         
-        # Add extra fields from record
-        # Standard fields to exclude when looking for extra fields
-        standard_fields = {
-            'name', 'msg', 'args', 'created', 'msecs', 'levelname', 'levelno', 
-            'pathname', 'filename', 'module', 'exc_info', 'exc_text', 'stack_info',
-            'lineno', 'funcName', 'relativeCreated', 'thread', 'threadName',
-            'processName', 'process', 'getMessage', 'message'
-        }
-        
         # Add any extra fields that were passed to the logger
         for key, value in record.__dict__.items():
-            if key not in standard_fields and not key.startswith('_'):
+            if key not in STANDARD_LOG_FIELDS and not key.startswith('_'):
                 log_record[key] = value
                 
-        return json.dumps(log_record)
+        return log_record
+
+    def format_bytes(self, record) -> bytes:
+        """Serialize the JSON log entry for a record as UTF-8 bytes."""
+        return orjson.dumps(self.format_dict(record))
+
+    def format(self, record):
+        return self.format_bytes(record).decode()
+
+
+# Stateless, so every handler set up by setup_logging shares one instance
+_FORMATTER = JSONFormatter()
+
+
+class JSONStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler that writes JSON formatter output as bytes.
+
+    Formatters with a format_bytes method (the JSONFormatters here and in
+    logging_utils) already produce UTF-8, so the entry goes straight to the
+    stream's binary buffer instead of being decoded to str and re-encoded by
+    the stream. Streams without a UTF-8 binary buffer, and other formatters,
+    fall back to the regular StreamHandler path.
+    """
+    def emit(self, record):
+        stream = self.stream
+        buffer = getattr(stream, "buffer", None)
+        format_bytes = getattr(self.formatter, "format_bytes", None)
+        if (
+            buffer is None
+            or format_bytes is None
+            or getattr(stream, "encoding", None) not in _UTF8_ENCODINGS
+        ):
+            super().emit(record)
+            return
+        try:
+            data = format_bytes(record) + b"\n"
+            # Push out text already written to the stream so entries stay in order
+            stream.flush()
+            buffer.write(data)
+            self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class JSONFileHandler(JSONStreamHandler, logging.FileHandler):
+    """FileHandler counterpart of JSONStreamHandler; the file is opened as UTF-8."""
+    def __init__(self, filename, mode="a", delay=False):
+        logging.FileHandler.__init__(self, filename, mode=mode, encoding="utf-8", delay=delay)
+
 
 def setup_logging(level: str = "INFO", output: str = "stdout", file_path: Optional[str] = None):
     """
@@ -262,12 +471,12 @@ def setup_logging(level: str = "INFO", output: str = "stdout", file_path: Option
         logger.removeHandler(handler)
     handlers = []
     if output in ("stdout", "both"):
-        stream_handler = logging.StreamHandler(sys.stdout)
-        stream_handler.setFormatter(JSONFormatter())
+        stream_handler = JSONStreamHandler(sys.stdout)
+        stream_handler.setFormatter(_FORMATTER)
         handlers.append(stream_handler)
     if output in ("file", "both") and file_path:
-        file_handler = logging.FileHandler(file_path)
-        file_handler.setFormatter(JSONFormatter())
+        file_handler = JSONFileHandler(file_path)
+        file_handler.setFormatter(_FORMATTER)
         handlers.append(file_handler)
     for h in handlers:
         logger.addHandler(h)
@@ -1,6 +1,6 @@
 from enum import Enum
-from typing import Any, Dict, List, Optional
-import json
+from typing import Any, Dict, List, NamedTuple, Optional
+import orjson
 
 class ErrorSeverity(Enum):
     LOW = 'low'
@@ -25,34 +25,41 @@ class NormalizationError(PipelineError):
 class SystemError(PipelineError):
     pass
 
+class ErrorRecord(NamedTuple):
+    """A single collected error; severity holds the ErrorSeverity value."""
+    type: str
+    field: Optional[str]
+    message: str
+    severity: str
+
 class ErrorCollector:
     """
     Collects and reports errors during pipeline execution.
+    Errors are stored as ErrorRecord tuples and only turned into dicts when reported.
     """
     def __init__(self):
-        self.errors: List[Dict[str, Any]] = []
+        self.errors: List[ErrorRecord] = []
 
     def add_error(self, error_type: str, field: Optional[str], message: str, severity: ErrorSeverity = ErrorSeverity.MEDIUM):
-        self.errors.append({
-            'type': error_type,
-            'field': field,
-            'message': message,
-            'severity': severity.value
-        })
+        self.errors.append(ErrorRecord(error_type, field, message, severity.value))
+
+    def extend(self, errors: List[ErrorRecord]):
+        """Add already-built error records in one call."""
+        self.errors.extend(errors)
 
     def has_errors(self) -> bool:
         return len(self.errors) > 0
 
     def to_json(self) -> str:
-        return json.dumps(self.errors, indent=2)
+        return orjson.dumps(self.get_errors(), option=orjson.OPT_INDENT_2).decode()
 
     def to_human_readable(self) -> str:
         return '\n'.join([
-            f"[{e['severity'].upper()}] {e['type']} - {e['field'] or ''}: {e['message']}" for e in self.errors
+            f"[{e.severity.upper()}] {e.type} - {e.field or ''}: {e.message}" for e in self.errors
         ])
 
     def get_errors(self) -> List[Dict[str, Any]]:
-        return self.errors
+        return [e._asdict() for e in self.errors]
 
 """
 Error Recovery Strategies (to be implemented in pipeline):
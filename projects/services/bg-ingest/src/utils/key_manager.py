@@ -17,7 +17,7 @@ Security:
 """
 import os
 import secrets
-import json
+import orjson
 import time
 from typing import Tuple, Dict, Optional
 from src.utils.secrets import get_secret
@@ -26,17 +26,27 @@ from datetime import datetime
 KEYS_SECRET_NAME = os.environ.get("ENCRYPTION_KEYS_SECRET", "ENCRYPTION_KEYS")
 CURRENT_KEY_VERSION_ENV = "CURRENT_KEY_VERSION"
 
+def _version_order(version: str) -> Tuple[int, str]:
+    """Sort key for versions: numeric "vN" by N (so v10 > v2), others first, then by name."""
+    number = version[1:]
+    return (int(number) if number.isdigit() else -1, version)
+
 class KeyManager:
     def __init__(self, secret_name: Optional[str] = None):
         self.secret_name = secret_name or KEYS_SECRET_NAME
         # In dev, fallback to env vars
         self.is_dev = os.environ.get("SERVICE_ENV", "development") == "development"
+        # Parsed and migrated keys, and in dev the env value they were parsed from
+        self._keys_cache: Optional[Dict[str, Dict[str, str]]] = None
+        self._keys_source: Optional[str] = None
 
     def _now_iso(self):
         return datetime.utcnow().isoformat() + 'Z'
 
     def _migrate_keys(self, keys):
         # Support old format: {"v1": "key1"}, new: {"v1": {"key": ..., "created_at": ...}}
+        if all(isinstance(value, dict) and "key" in value and "created_at" in value for value in keys.values()):
+            return keys  # Already in the new format, the steady state
         migrated = {}
         for version, value in keys.items():
             if isinstance(value, dict) and "key" in value and "created_at" in value:
@@ -46,25 +56,36 @@ class KeyManager:
         return migrated
 
     def _load_keys(self) -> Dict[str, Dict[str, str]]:
-        """Load all keys from secrets manager or env, and migrate to new format if needed."""
+        """Load all keys from secrets manager or env, and migrate to new format if needed.
+
+        The result is cached; in dev it is reparsed only when the env var changes.
+        """
         if self.is_dev:
             keys_json = os.environ.get(self.secret_name)
+            if self._keys_cache is not None and keys_json == self._keys_source:
+                return self._keys_cache
             if keys_json:
-                keys = json.loads(keys_json)
+                keys = orjson.loads(keys_json)
             else:
                 keys = {}
+            self._keys_source = keys_json
         else:
+            if self._keys_cache is not None:
+                return self._keys_cache
             try:
                 keys = get_secret(self.secret_name) or {}
             except Exception:
                 keys = {}
         # Always migrate to new format (dict with key/created_at)
-        return self._migrate_keys(keys)
+        self._keys_cache = self._migrate_keys(keys)
+        return self._keys_cache
 
     def _save_keys(self, keys: Dict[str, Dict[str, str]]):
         """Save keys to env (dev only). In prod, use AWS CLI or admin tool."""
         if self.is_dev:
-            os.environ[self.secret_name] = json.dumps(keys)
+            self._keys_source = orjson.dumps(keys).decode()
+            os.environ[self.secret_name] = self._keys_source
+            self._keys_cache = keys
         else:
             raise NotImplementedError("Saving keys in production must be done via AWS Secrets Manager admin tools.")
 
@@ -73,7 +94,7 @@ class KeyManager:
         keys = self._load_keys()
         version = os.environ.get(CURRENT_KEY_VERSION_ENV, None)
         if not version and keys:
-            version = sorted(keys.keys())[-1]  # Use latest
+            version = max(keys, key=_version_order)  # Use latest
         if not version or version not in keys:
             raise RuntimeError("No current key version set or key missing.")
         return keys[version]["key"], version
@@ -90,7 +111,8 @@ class KeyManager:
 
     def rotate_key(self) -> Tuple[str, str]:
         """Generate a new key, store it, and set as current. Returns (key, version)."""
-        keys = self._load_keys()
+        # Copy so the cache is untouched if saving fails
+        keys = dict(self._load_keys())
         new_version = f"v{len(keys) + 1}"
         new_key = secrets.token_urlsafe(32)
         keys[new_version] = {"key": new_key, "created_at": self._now_iso()}
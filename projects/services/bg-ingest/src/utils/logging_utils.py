@@ -8,35 +8,101 @@ Example:
 """
 
 import logging
-import json
-from datetime import datetime
+import orjson
+from datetime import datetime, timedelta
+from functools import lru_cache
 
-SENSITIVE_KEYS = {'password', 'api_key', 'token', 'secret', 'access_token', 'refresh_token', 'key'}
+from src.utils.config import JSONFileHandler, JSONStreamHandler
+
+SENSITIVE_KEYS = frozenset({'password', 'api_key', 'token', 'secret', 'access_token', 'refresh_token', 'key'})
 
 REDACTED = '***REDACTED***'
 
-def redact_sensitive_data(obj):
+# Naive UTC epoch; record times are converted by adding a timedelta to it
+_EPOCH = datetime(1970, 1, 1)
+
+@lru_cache(maxsize=1024)
+def _is_sensitive_key(key) -> bool:
+    """Case-insensitive SENSITIVE_KEYS check, memoized since payloads repeat the same keys."""
+    return isinstance(key, str) and key.lower() in SENSITIVE_KEYS
+
+def redact_sensitive_data(obj, inplace=False):
     """
     Recursively redacts sensitive fields in dicts/lists.
     Keys matched (case-insensitive): password, api_key, token, secret, access_token, refresh_token, key
+    Nested containers are copied with an explicit work stack rather than recursive calls.
+    With inplace=True, values are overwritten in the given containers instead of
+    copying them; only use it on objects the caller owns.
     """
-    if isinstance(obj, dict):
-        return {
-            k: (REDACTED if k.lower() in SENSITIVE_KEYS else redact_sensitive_data(v))
-            for k, v in obj.items()
-        }
-    elif isinstance(obj, list):
-        return [redact_sensitive_data(i) for i in obj]
-    else:
-        return obj 
+    if not isinstance(obj, (dict, list)):
+        return obj
+    if inplace:
+        stack = [obj]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, dict):
+                for k, v in value.items():
+                    if _is_sensitive_key(k):
+                        # Replacing a value does not resize the dict, so iteration is safe
+                        value[k] = REDACTED
+                    elif isinstance(v, (dict, list)):
+                        stack.append(v)
+            else:
+                stack.extend(v for v in value if isinstance(v, (dict, list)))
+        return obj
+    result = [None]
+    # (container to copy, parent copy, slot in the parent); children get a
+    # placeholder slot first so dict key order is preserved
+    stack = [(obj, result, 0)]
+    while stack:
+        value, parent, slot = stack.pop()
+        if isinstance(value, dict):
+            copy = {}
+            for k, v in value.items():
+                if _is_sensitive_key(k):
+                    copy[k] = REDACTED
+                elif isinstance(v, (dict, list)):
+                    copy[k] = None
+                    stack.append((v, copy, k))
+                else:
+                    copy[k] = v
+        else:
+            copy = []
+            for v in value:
+                if isinstance(v, (dict, list)):
+                    stack.append((v, copy, len(copy)))
+                    copy.append(None)
+                else:
+                    copy.append(v)
+        parent[slot] = copy
+    return result[0]
+
+class RedactingFilter(logging.Filter):
+    """
+    Redacts sensitive fields from log records before they are formatted.
+    Covers dict/list format args, the 'extra' dict used by JSONFormatter and
+    sensitive keys passed directly as extra=... attributes.
+    """
+    def filter(self, record):
+        if isinstance(record.args, dict):
+            record.args = redact_sensitive_data(record.args)
+        elif isinstance(record.args, tuple):
+            record.args = tuple(redact_sensitive_data(arg) for arg in record.args)
+        if isinstance(getattr(record, "extra", None), dict):
+            record.extra = redact_sensitive_data(record.extra)
+        for key in SENSITIVE_KEYS.intersection(record.__dict__):
+            setattr(record, key, REDACTED)
+        return True
 
 class JSONFormatter(logging.Formatter):
     """
     Formats log records as JSON with standard fields.
     """
-    def format(self, record):
+    def format_bytes(self, record) -> bytes:
+        """Serialize the JSON log entry for a record as UTF-8 bytes."""
         log_record = {
-            "timestamp": datetime.utcnow().isoformat() + 'Z',
+            # orjson writes the naive UTC datetime as ISO 8601 with a 'Z' suffix
+            "timestamp": _EPOCH + timedelta(seconds=record.created),
             "level": record.levelname,
             "message": record.getMessage(),
             "module": record.module,
@@ -48,7 +114,10 @@ class JSONFormatter(logging.Formatter):
         # Add extra fields if present
         if hasattr(record, "extra") and isinstance(record.extra, dict):
             log_record.update(record.extra)
-        return json.dumps(log_record)
+        return orjson.dumps(log_record, option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z)
+
+    def format(self, record):
+        return self.format_bytes(record).decode()
 
 def setup_json_logging(level=logging.INFO, output='stdout', file_path=None):
     """
@@ -64,10 +133,11 @@ def setup_json_logging(level=logging.INFO, output='stdout', file_path=None):
     for h in list(logger.handlers):
         logger.removeHandler(h)
     if output == 'file' and file_path:
-        handler = logging.FileHandler(file_path)
+        handler = JSONFileHandler(file_path)
     else:
-        handler = logging.StreamHandler()
+        handler = JSONStreamHandler()
     handler.setFormatter(JSONFormatter())
+    handler.addFilter(RedactingFilter())
     logger.addHandler(handler)
     return logger
 
@@ -3,6 +3,19 @@ from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
 ISO8601_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+# Runs of whitespace collapsed by normalize_string, compiled once
+_WHITESPACE_RE = re.compile(r"\s+")
+# Lowercase trend direction aliases and their canonical value
+_TREND_DIRECTION_MAP = {
+    'flat': 'flat',
+    'rising': 'rising',
+    'falling': 'falling',
+    'rapidly rising': 'rapidly rising',
+    'rapidly falling': 'rapidly falling',
+    'steady': 'flat',
+    'up': 'rising',
+    'down': 'falling',
+}
 
 
 def normalize_string(value: Any, lowercase: bool = True, strip: bool = True) -> Optional[str]:
@@ -14,7 +27,7 @@ def normalize_string(value: Any, lowercase: bool = True, strip: bool = True) ->
         s = s.strip()
     if lowercase:
         s = s.lower()
-    s = re.sub(r"\s+", " ", s)
+    s = _WHITESPACE_RE.sub(" ", s)
     return s
 
 def normalize_number(value: Any, decimals: int = 2) -> Optional[float]:
@@ -37,24 +50,24 @@ def normalize_timestamp(value: Any) -> Optional[str]:
             dt = dt.astimezone(timezone.utc)
         except Exception:
             return None
-    return dt.strftime(ISO8601_FORMAT)
+    if dt.year < 1000:
+        # strftime leaves such years unpadded on some platforms; keep its output
+        return dt.strftime(ISO8601_FORMAT)
+    # Same text as ISO8601_FORMAT, but isoformat is much cheaper than strftime;
+    # dt is UTC, so the offset is always "+00:00"
+    return dt.isoformat(timespec="microseconds")[:-6] + "Z"
 
 def normalize_trend_direction(value: Any) -> Optional[str]:
     """Standardize trend direction values (e.g., 'Flat', 'flat', 'FLAT' -> 'flat')."""
     if value is None:
         return None
-    mapping = {
-        'flat': 'flat',
-        'rising': 'rising',
-        'falling': 'falling',
-        'rapidly rising': 'rapidly rising',
-        'rapidly falling': 'rapidly falling',
-        'steady': 'flat',
-        'up': 'rising',
-        'down': 'falling',
-    }
-    val = str(value).strip().lower()
-    return mapping.get(val, val)
+    val = str(value).strip()
+    # Most feeds already send lowercase values, so try those before lowercasing
+    trend = _TREND_DIRECTION_MAP.get(val)
+    if trend is not None:
+        return trend
+    val = val.lower()
+    return _TREND_DIRECTION_MAP.get(val, val)
 
 def normalize_device_info(device: Dict[str, Any]) -> Dict[str, Any]:
     """Ensure consistent device info format (keys: id, serial, model, manufacturer)."""
@@ -1,5 +1,5 @@
 import logging
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from src.utils.validation import ValidationEngine, ValidationContext, ValidationRule
 from src.utils.normalization import (
     normalize_string, normalize_number, normalize_timestamp,
@@ -20,8 +20,16 @@ class DataTransformationPipeline:
         Validate and normalize a single reading.
         Returns (normalized_reading, errors_dict) where one is None if the other is present.
         """
-        # Step 1: Validate
-        context = self.validation_engine.validate(raw)
+        return self._process_validated(raw, self.validation_engine.validate(raw))
+
+    def _process_validated(
+        self, raw: Dict[str, Any], context: ValidationContext
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Normalize a reading that has already been validated into context.
+        Returns (normalized_reading, errors_dict) where one is None if the other is present.
+        """
+        # Step 1: Reject invalid readings
         if context.has_errors():
             logger.warning(f"Validation failed: {context.get_errors()}")
             return None, {field: msg for field, msg in context.get_errors()}
@@ -38,4 +46,28 @@ class DataTransformationPipeline:
             return normalized, None
         except Exception as e:
             logger.error(f"Normalization failed: {e}")
-            return None, {'normalization_error': str(e)} 
\ No newline at end of file
+            return None, {'normalization_error': str(e)}
+
+    def process_batch(
+        self, records: List[Dict[str, Any]], stop_on_error: bool = False
+    ) -> Tuple[List[Optional[Dict[str, Any]]], List[Optional[Dict[str, Any]]]]:
+        """
+        Validate and normalize a batch of readings.
+        Returns parallel (normalized, errors) lists with one entry per record, where
+        exactly one of each pair is None. With stop_on_error, processing stops after
+        the first failing record and the lists end there.
+        """
+        # Validate the whole batch in one engine call, then normalize the valid records
+        contexts = self.validation_engine.validate_batch(records)
+        process_validated = self._process_validated
+        normalized_list: List[Optional[Dict[str, Any]]] = []
+        errors_list: List[Optional[Dict[str, Any]]] = []
+        append_normalized = normalized_list.append
+        append_errors = errors_list.append
+        for raw, context in zip(records, contexts):
+            normalized, errors = process_validated(raw, context)
+            append_normalized(normalized)
+            append_errors(errors)
+            if errors and stop_on_error:
+                break
+        return normalized_list, errors_list
@@ -14,42 +14,46 @@ Security:
 - Ensure IAM permissions are restricted in production.
 """
 import os
-from typing import Optional
-from src.utils.config import AwsSecretsManager, get_settings
+from functools import cache, lru_cache
+from typing import Any, Dict, Optional
+from src.utils.config import AwsSecretsManager, get_settings, load_secret_values
 
-# In-memory cache for secrets
-_secret_cache = {}
 
+@cache
+def _aws_secrets() -> Dict[str, Any]:
+    """Fetch the configured secret bundle once; every key is served from it."""
+    settings = get_settings()
+    return load_secret_values(AwsSecretsManager(settings.aws_region), settings.secret_name)
 
-def get_secret(key: str) -> Optional[str]:
-    """
-    Retrieve a secret by key, checking environment variables first, then AWS Secrets Manager if in production.
-    Caches secrets in memory after first retrieval.
-
-    Args:
-        key (str): The name of the secret
-    Returns:
-        str or None: The secret value, or None if not found
-    Raises:
-        RuntimeError: If the secret is not found in any source
-    """
-    # Check in-memory cache first
-    if key in _secret_cache:
-        return _secret_cache[key]
 
+@lru_cache(maxsize=256)
+def _load_secret(key: str) -> str:
+    """Resolve a secret from the environment or AWS Secrets Manager; only found values are cached."""
     # Check environment variable
     value = os.environ.get(key)
     if value:
-        _secret_cache[key] = value
         return value
 
     # Check AWS Secrets Manager if in production
     settings = get_settings()
     if settings.service_env != "development" and settings.secret_name:
-        secrets_manager = AwsSecretsManager(settings.aws_region)
-        secrets = secrets_manager.get_secret(settings.secret_name)
+        secrets = _aws_secrets()
         if key in secrets:
-            _secret_cache[key] = secrets[key]
             return secrets[key]
 
-    raise RuntimeError(f"Secret '{key}' not found in environment or secrets manager.") 
\ No newline at end of file
+    raise RuntimeError(f"Secret '{key}' not found in environment or secrets manager.")
+
+
+def get_secret(key: str) -> Optional[str]:
+    """
+    Retrieve a secret by key, checking environment variables first, then AWS Secrets Manager if in production.
+    Caches secrets in memory after first retrieval.
+
+    Args:
+        key (str): The name of the secret
+    Returns:
+        str or None: The secret value, or None if not found
+    Raises:
+        RuntimeError: If the secret is not found in any source
+    """
+    return _load_secret(key)
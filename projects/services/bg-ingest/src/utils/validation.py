@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 import re
 from typing import Any, Dict, List, Optional, Tuple
 
+
 class ValidationError(Exception):
     """Custom exception for validation errors."""
     def __init__(self, message: str, field: Optional[str] = None):
@@ -9,21 +10,42 @@ class ValidationError(Exception):
         self.field = field
         super().__init__(f"{field + ': ' if field else ''}{message}")
 
+
 class ValidationRule(ABC):
     """Abstract base class for validation rules."""
+    # Rules and contexts declare __slots__: contexts are created per record, and
+    # slot attributes skip the instance __dict__
+    __slots__ = ()
     @abstractmethod
     def validate(self, data: Dict[str, Any], context: 'ValidationContext') -> None:
         pass
 
+    def validate_batch(self, records: List[Dict[str, Any]], contexts: List['ValidationContext']) -> None:
+        """Validate a field across many records; contexts[i] receives the errors of records[i]."""
+        validate = self.validate
+        for data, context in zip(records, contexts):
+            validate(data, context)
+
+
 class RequiredFieldRule(ValidationRule):
+    __slots__ = ('field', 'message')
     def __init__(self, field: str, message: Optional[str] = None):
         self.field = field
         self.message = message or f"Field '{field}' is required."
+
     def validate(self, data: Dict[str, Any], context: 'ValidationContext') -> None:
         if self.field not in data or data[self.field] is None:
             context.add_error(self.field, self.message)
 
+    def validate_batch(self, records: List[Dict[str, Any]], contexts: List['ValidationContext']) -> None:
+        field, message = self.field, self.message
+        for data, context in zip(records, contexts):
+            if data.get(field) is None:
+                context.add_error(field, message)
+
+
 class TypeRule(ValidationRule):
+    __slots__ = ('field', 'expected_type', 'message')
     def __init__(self, field: str, expected_type: type | tuple, message: Optional[str] = None):
         self.field = field
         self.expected_type = expected_type
@@ -32,16 +54,26 @@ class TypeRule(ValidationRule):
         else:
             type_names = expected_type.__name__
         self.message = message or f"Field '{field}' must be of type {type_names}."
+
     def validate(self, data: Dict[str, Any], context: 'ValidationContext') -> None:
         if self.field in data and not isinstance(data[self.field], self.expected_type):
             context.add_error(self.field, self.message)
 
+    def validate_batch(self, records: List[Dict[str, Any]], contexts: List['ValidationContext']) -> None:
+        field, expected_type, message = self.field, self.expected_type, self.message
+        for data, context in zip(records, contexts):
+            if field in data and not isinstance(data[field], expected_type):
+                context.add_error(field, message)
+
+
 class RangeRule(ValidationRule):
+    __slots__ = ('field', 'min_value', 'max_value', 'message')
     def __init__(self, field: str, min_value: float, max_value: float, message: Optional[str] = None):
         self.field = field
         self.min_value = min_value
         self.max_value = max_value
         self.message = message or f"Field '{field}' must be between {min_value} and {max_value}."
+
     def validate(self, data: Dict[str, Any], context: 'ValidationContext') -> None:
         value = data.get(self.field)
         if value is not None:
@@ -52,33 +84,73 @@ class RangeRule(ValidationRule):
             except (TypeError, ValueError):
                 context.add_error(self.field, f"Field '{self.field}' must be a number.")
 
+    def validate_batch(self, records: List[Dict[str, Any]], contexts: List['ValidationContext']) -> None:
+        field, min_value, max_value, message = self.field, self.min_value, self.max_value, self.message
+        for data, context in zip(records, contexts):
+            value = data.get(field)
+            if value is not None:
+                try:
+                    if not (min_value <= float(value) <= max_value):
+                        context.add_error(field, message)
+                except (TypeError, ValueError):
+                    context.add_error(field, f"Field '{field}' must be a number.")
+
+
 class PatternRule(ValidationRule):
+    __slots__ = ('field', 'pattern', '_regex', 'message')
     def __init__(self, field: str, pattern: str, message: Optional[str] = None):
         self.field = field
         self.pattern = pattern
+        self._regex = re.compile(pattern)
         self.message = message or f"Field '{field}' does not match required pattern."
+
     def validate(self, data: Dict[str, Any], context: 'ValidationContext') -> None:
         value = data.get(self.field)
-        if value is not None and not re.match(self.pattern, str(value)):
+        if value is not None and not self._regex.match(str(value)):
             context.add_error(self.field, self.message)
 
+    def validate_batch(self, records: List[Dict[str, Any]], contexts: List['ValidationContext']) -> None:
+        field, match, message = self.field, self._regex.match, self.message
+        for data, context in zip(records, contexts):
+            value = data.get(field)
+            if value is not None and not match(str(value)):
+                context.add_error(field, message)
+
+
 class ValidationContext:
     """Stores validation errors and state."""
+    __slots__ = ('errors',)
     def __init__(self):
         self.errors: List[Tuple[str, str]] = []
+
     def add_error(self, field: str, message: str):
         self.errors.append((field, message))
+
     def has_errors(self) -> bool:
         return len(self.errors) > 0
+
     def get_errors(self) -> List[Tuple[str, str]]:
         return self.errors
 
+
 class ValidationEngine:
     """Runs multiple validation rules against data."""
     def __init__(self, rules: List[ValidationRule]):
         self.rules = rules
+
     def validate(self, data: Dict[str, Any]) -> ValidationContext:
         context = ValidationContext()
         for rule in self.rules:
             rule.validate(data, context)
-        return context 
\ No newline at end of file
+        return context
+
+    def validate_batch(self, records: List[Dict[str, Any]]) -> List[ValidationContext]:
+        """
+        Validate many records, returning one context per record in order.
+        Each rule walks its field across the whole batch in one call; rules still run
+        in order, so every context lists its errors exactly as validate would.
+        """
+        contexts = [ValidationContext() for _ in records]
+        for rule in self.rules:
+            rule.validate_batch(records, contexts)
+        return contexts
@@ -1,9 +1,14 @@
+import hashlib
+import hmac
+import time
 import pytest
 import jwt
 from datetime import datetime, timedelta
+from fastapi.concurrency import run_in_threadpool
 from httpx import AsyncClient, ASGITransport
+from unittest import mock
 from unittest.mock import MagicMock
-from src.main import app
+from src.main import GATEWAY_SIGNATURE_MAX_AGE, GatewayTrustMiddleware, JWTAuthMiddleware, app
 from src.utils.config import get_settings
 from src.api.readings import get_glucose_repository
 
@@ -13,6 +18,7 @@ ISSUER = settings.jwt_issuer
 AUDIENCE = settings.jwt_audience
 
 USER_ID = "testuser"
+GATEWAY_KEY = b"gateway-key"
 
 # Helper to create JWTs
 def make_jwt(sub=USER_ID, exp=None, secret=SECRET, issuer=ISSUER, audience=AUDIENCE, **kwargs):
@@ -33,6 +39,19 @@ def override_glucose_repo():
     yield
     app.dependency_overrides.clear()
 
+@pytest.fixture
+def inner_app():
+    return mock.AsyncMock()
+
+@pytest.fixture
+def jwt_middleware(inner_app):
+    return JWTAuthMiddleware(app=inner_app)
+
+@pytest.fixture
+def gateway_client():
+    transport = ASGITransport(app=GatewayTrustMiddleware(app, key=GATEWAY_KEY))
+    return AsyncClient(transport=transport, base_url="http://test")
+
 @pytest.mark.asyncio
 async def test_protected_endpoint_with_valid_jwt():
     token = make_jwt()
@@ -67,4 +86,115 @@ async def test_protected_endpoint_with_missing_token():
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         resp = await ac.get(f"/api/bg/{USER_ID}/latest")
         assert resp.status_code == 401
-        assert "authorization" in resp.text.lower() 
\ No newline at end of file
+        assert "authorization" in resp.text.lower()
+
+
+@pytest.mark.asyncio
+async def test_jwt_decode_results_are_cached_per_token(jwt_middleware):
+    """Repeated tokens are decoded once; distinct tokens are decoded separately."""
+    token = make_jwt().encode()
+    with mock.patch("src.main.jwt.decode", wraps=jwt.decode) as decode:
+        first = await jwt_middleware._decode(token)
+        second = await jwt_middleware._decode(token)
+        await jwt_middleware._decode(make_jwt(sub="other").encode())
+    assert first == second and first["sub"] == USER_ID
+    assert decode.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_jwt_cache_redecodes_tokens_near_expiry(jwt_middleware):
+    """Tokens about to expire are not served from the decode cache."""
+    token = make_jwt(exp=datetime.utcnow() + timedelta(seconds=3)).encode()
+    with mock.patch("src.main.jwt.decode", wraps=jwt.decode) as decode:
+        await jwt_middleware._decode(token)
+        await jwt_middleware._decode(token)
+    assert decode.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_jwt_decode_runs_in_threadpool(jwt_middleware):
+    """JWT verification is offloaded from the event loop."""
+    with mock.patch("src.main.run_in_threadpool", wraps=run_in_threadpool) as pool:
+        await jwt_middleware._decode(make_jwt().encode())
+    assert pool.call_args.args[0] is jwt.decode
+
+
+@pytest.mark.asyncio
+async def test_request_scopes_do_not_share_the_cached_payload(jwt_middleware, inner_app):
+    """Mutating one request's scopes leaves the cached payload untouched."""
+    token = make_jwt(scopes=["read"])
+    headers = [(b"authorization", f"Bearer {token}".encode())]
+    first = {"type": "http", "path": "/api/bg/x/latest", "headers": headers}
+    second = {"type": "http", "path": "/api/bg/x/latest", "headers": headers}
+    await jwt_middleware(first, None, None)
+    first["state"]["scopes"].append("admin")
+    await jwt_middleware(second, None, None)
+    assert second["state"]["scopes"] == ["read"]
+    assert inner_app.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_public_paths_skip_auth_with_and_without_raw_path(jwt_middleware, inner_app):
+    """Public paths bypass auth whether or not the server sets raw_path."""
+    await jwt_middleware({"type": "http", "path": "/health", "raw_path": b"/health", "headers": []}, None, None)
+    await jwt_middleware({"type": "http", "path": "/metrics", "headers": []}, None, None)
+    assert inner_app.await_count == 2
+
+
+def gateway_headers(path, user_id=USER_ID, scopes=b"read write", method=b"GET", signed_at=None, key=GATEWAY_KEY):
+    """Build the identity headers the API gateway signs for a request."""
+    timestamp = str(int(time.time()) if signed_at is None else signed_at).encode()
+    message = b"\n".join((timestamp, method, path, user_id.encode(), scopes))
+    return {
+        "X-User-Id": user_id,
+        "X-Scopes": scopes.decode(),
+        "X-Auth-Timestamp": timestamp.decode(),
+        "X-Auth-Sig": hmac.new(key, message, hashlib.sha256).hexdigest(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_gateway_signed_identity_skips_jwt_decode(jwt_middleware, inner_app):
+    """A valid gateway signature sets the identity without decoding a JWT."""
+    middleware = GatewayTrustMiddleware(jwt_middleware, key=GATEWAY_KEY)
+    path = b"/api/bg/gwuser/latest"
+    headers = gateway_headers(path, user_id="gwuser")
+    scope = {"type": "http", "method": "GET", "path": path.decode(), "raw_path": path, "headers": [
+        (name.lower().encode(), value.encode()) for name, value in headers.items()
+    ]}
+    with mock.patch("src.main.jwt.decode") as decode:
+        await middleware(scope, None, None)
+    decode.assert_not_called()
+    assert scope["state"] == {"user_id": "gwuser", "scopes": ["read", "write"]}
+    inner_app.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_gateway_identity_with_bad_signature_requires_jwt(gateway_client):
+    """A forged gateway signature falls through to JWT auth."""
+    headers = {**gateway_headers(f"/api/bg/{USER_ID}/latest".encode()), "X-Auth-Sig": "00"}
+    async with gateway_client as ac:
+        resp = await ac.get(f"/api/bg/{USER_ID}/latest", headers=headers)
+        assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_gateway_identity_with_stale_signature_requires_jwt(gateway_client):
+    """Signatures older than the replay window are rejected."""
+    path = f"/api/bg/{USER_ID}/latest"
+    headers = gateway_headers(path.encode(), signed_at=int(time.time()) - GATEWAY_SIGNATURE_MAX_AGE - 5)
+    async with gateway_client as ac:
+        resp = await ac.get(path, headers=headers)
+        assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_gateway_signature_is_bound_to_the_path(gateway_client):
+    """A signature captured for one path cannot be replayed against another."""
+    # Signed for another user's path, replayed against this one
+    headers = gateway_headers(b"/api/bg/someone-else/latest")
+    async with gateway_client as ac:
+        resp = await ac.get(f"/api/bg/{USER_ID}/latest", headers=headers)
+        assert resp.status_code == 401
+        ok = await ac.get(f"/api/bg/{USER_ID}/latest", headers=gateway_headers(f"/api/bg/{USER_ID}/latest".encode()))
+        assert ok.status_code != 401
@@ -200,6 +200,16 @@ class TestAppLifespan:
             # Verify tables were created (should now be called due to our manual trigger)
             mock_dynamodb_client.create_all_tables.assert_called_once()
     
+    def test_configure_logging_falls_back_to_info(self, mock_settings):
+        """Test that an unknown log level configures logging at INFO."""
+        from src.main import configure_logging
+        
+        mock_settings.log_level = "verbose"
+        with mock.patch("src.main.setup_json_logging") as setup_json_logging:
+            configure_logging(mock_settings)
+        
+        assert setup_json_logging.call_args[0][0] == "INFO"
+    
     def test_cors_middleware_configuration(self, test_app, mock_settings):
         """Test that CORS middleware is configured correctly."""
         # Find the CORSMiddleware in the app's middleware stack
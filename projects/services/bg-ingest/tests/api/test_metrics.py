@@ -1,6 +1,7 @@
 import pytest
+from fastapi.responses import PlainTextResponse
 from httpx import AsyncClient, ASGITransport
-from src.main import app
+from src.main import MetricsAuthMiddleware, app, basic_auth_header
 from src.utils.config import get_settings
 
 @pytest.mark.asyncio
@@ -23,4 +24,19 @@ async def test_metrics_with_auth(monkeypatch):
         # Check for standard Python metrics that should always be present
         assert b'python_gc_objects_collected_total' in response.content
         assert b'python_info' in response.content
-        # TODO: Add custom metrics like dexcom_api_call_total when implemented 
\ No newline at end of file
+        # TODO: Add custom metrics like dexcom_api_call_total when implemented
+
+
+@pytest.mark.asyncio
+async def test_metrics_auth_middleware_checks_credentials():
+    """MetricsAuthMiddleware only passes requests carrying the configured Basic credentials."""
+    middleware = MetricsAuthMiddleware(PlainTextResponse("ok"), basic_auth_header("testuser", "testpass"))
+    transport = ASGITransport(app=middleware)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        assert (await ac.get("/", auth=("testuser", "testpass"))).status_code == 200
+        assert (await ac.get("/", auth=("testuser", "wrong"))).status_code == 401
+        assert (await ac.get("/", headers={"Authorization": "Basic !!"})).status_code == 401
+        response = await ac.get("/")
+        assert response.status_code == 401
+        assert response.headers["WWW-Authenticate"] == "Basic"
+        assert basic_auth_header("testuser", None) is None
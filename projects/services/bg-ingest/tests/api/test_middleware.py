@@ -1,8 +1,6 @@
 """Tests for API middleware components."""
 
-import time
 from unittest import mock
-import json
 
 import pytest
 from fastapi import FastAPI, Request, Response
@@ -103,51 +101,32 @@ class TestRateLimiter:
     def test_rate_limit_exceeded(self):
         """Test that requests are limited when they exceed the rate limit."""
         app = SimpleEndpointApp()
+        app.add_middleware(
+            RateLimiter,
+            default_rate_limit_per_minute=10,
+            default_rate_limit_burst=1,
+            include_paths=["/api/"],
+        )
+        client = TestClient(app)
         
-        # Use monkeypatch to override the RateLimiter dispatch method for this test
-        async def mock_dispatch(self, request, call_next):
-            # If client is from test-client, send a rate limit response
-            if request.headers.get("X-Forwarded-For") == "test-client":
-                response = Response(
-                    status_code=429,
-                    content=json.dumps({"status": "error", "error": {"message": "Rate limit exceeded"}}),
-                    media_type="application/json"
-                )
-                response.headers["Retry-After"] = "30"
-                response.headers["X-RateLimit-Limit"] = "10"
-                response.headers["X-RateLimit-Remaining"] = "0"
-                response.headers["X-RateLimit-Reset"] = str(int(time.time() + 30))
-                return response
-            return await call_next(request)
+        # The first request uses up the burst capacity
+        assert client.get("/api/test").status_code == 200
         
-        # Create middleware instance with mocked dispatch
-        with mock.patch.object(RateLimiter, "dispatch", mock_dispatch):
-            rate_limiter = RateLimiter(
-                app=app,
-                default_rate_limit_per_minute=10,
-                default_rate_limit_burst=5,
-                include_paths=["/api/"],
-            )
-            
-            # Add our middleware to the app
-            app.add_middleware(lambda app: rate_limiter)
-            client = TestClient(app)
-            
-            # Make a request that should be rate limited
-            response = client.get("/api/test", headers={"X-Forwarded-For": "test-client"})
-            
-            # Verify the response
-            assert response.status_code == 429
-            response_json = response.json()
-            assert "error" in response_json
-            assert "Rate limit exceeded" in response_json["error"]["message"]
-            
-            # Verify headers are present
-            assert "Retry-After" in response.headers
-            assert "X-RateLimit-Limit" in response.headers
-            assert "X-RateLimit-Remaining" in response.headers
-            assert response.headers["X-RateLimit-Remaining"] == "0"
-            assert "X-RateLimit-Reset" in response.headers
+        # Make a request that should be rate limited
+        response = client.get("/api/test")
+        
+        # Verify the response
+        assert response.status_code == 429
+        response_json = response.json()
+        assert "error" in response_json
+        assert "Rate limit exceeded" in response_json["error"]["message"]
+        
+        # Verify headers are present
+        assert "Retry-After" in response.headers
+        assert "X-RateLimit-Limit" in response.headers
+        assert "X-RateLimit-Remaining" in response.headers
+        assert response.headers["X-RateLimit-Remaining"] == "0"
+        assert "X-RateLimit-Reset" in response.headers
     
     def test_burst_capacity(self):
         """Test that burst capacity concept works for rate limiting."""
@@ -10,7 +10,7 @@ from fastapi.testclient import TestClient
 from starlette.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED, HTTP_404_NOT_FOUND, HTTP_400_BAD_REQUEST
 
 from src.api.readings import router as readings_router
-from src.models.glucose import TrendDirection, ReadingSource, ReadingType
+from src.models.glucose import DeviceInfo, GlucoseReading, TrendDirection, ReadingSource, ReadingType
 from src.data.glucose_repository import GlucoseReadingRepository
 
 
@@ -344,4 +344,22 @@ class TestGetReadings:
         # Verify the response
         assert response.status_code == HTTP_200_OK
         assert response.json()["status"] == "success"
-        assert len(response.json()["data"]) == 3 
\ No newline at end of file
+        assert len(response.json()["data"]) == 3
+    
+    def test_get_readings_serializes_model_fields(self, client, mock_repo):
+        """Test that datetimes and enums of real readings are serialized to JSON."""
+        timestamp = datetime(2024, 1, 1, 12, 0, 0)
+        mock_repo.data = {"user123": [GlucoseReading(
+            user_id="user123",
+            timestamp=timestamp,
+            glucose_value=120,
+            device_info=DeviceInfo(device_id="G6-1234567", serial_number="SN-1234567890"),
+        )]}
+        
+        response = client.get("/api/bg/user123")
+        
+        assert response.status_code == HTTP_200_OK
+        reading = response.json()["data"][0]
+        assert reading["timestamp"] == timestamp.isoformat()
+        assert reading["trend_direction"] == TrendDirection.UNKNOWN.value
+        assert reading["device_info"]["device_id"] == "G6-1234567"
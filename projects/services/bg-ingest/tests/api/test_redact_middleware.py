@@ -12,4 +12,90 @@ def test_redact_sensitive_data_in_404_error():
     assert "supersecret" not in resp.text
     # Redacted string may or may not appear depending on error handler, but password should never appear
     # assert "***REDACTED***" in resp.text
-    assert "bob" in resp.text or resp.status_code == 401 
\ No newline at end of file
+    assert "bob" in resp.text or resp.status_code == 401 
+
+@pytest.mark.asyncio
+async def test_error_handlers_redact_sensitive_detail():
+    from fastapi import HTTPException
+    from fastapi.exceptions import RequestValidationError
+    from starlette.exceptions import HTTPException as StarletteHTTPException
+
+    handler = app.exception_handlers[StarletteHTTPException]
+    resp = await handler(None, HTTPException(status_code=400, detail={"password": "supersecret", "user": "bob"}))
+    assert resp.status_code == 400
+    assert b"supersecret" not in resp.body
+    assert b"bob" in resp.body
+
+    handler = app.exception_handlers[RequestValidationError]
+    errors = [{"loc": ["body"], "msg": "bad", "type": "value_error", "input": {"token": "supersecret"}}]
+    resp = await handler(None, RequestValidationError(errors))
+    assert resp.status_code == 422
+    assert b"supersecret" not in resp.body
+
+
+def test_request_id_header_is_propagated():
+    resp = client.get("/health", headers={"X-Request-ID": "req-123"})
+    assert resp.headers["X-Request-ID"] == "req-123"
+    assert client.get("/health").headers["X-Request-ID"]
+
+
+def test_redacting_filter_scrubs_log_records():
+    import logging
+    from src.utils.logging_utils import RedactingFilter
+
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "payload %s", ({"password": "supersecret"},), None)
+    record.extra = {"token": "supersecret", "user": "bob"}
+    record.api_key = "supersecret"
+    assert RedactingFilter().filter(record)
+    assert "supersecret" not in record.getMessage()
+    assert record.extra == {"token": "***REDACTED***", "user": "bob"}
+    assert record.api_key == "***REDACTED***"
+
+
+def test_redact_sensitive_data_matches_keys_case_insensitively():
+    from src.utils.logging_utils import redact_sensitive_data
+
+    data = {"Password": "a", "nested": [{"ACCESS_TOKEN": "b", "user": "bob"}], 1: "c"}
+    assert redact_sensitive_data(data) == {
+        "Password": "***REDACTED***",
+        "nested": [{"ACCESS_TOKEN": "***REDACTED***", "user": "bob"}],
+        1: "c",
+    }
+
+
+@pytest.mark.asyncio
+async def test_request_id_middleware_shares_parsed_headers():
+    from unittest import mock
+    from src.main import HEADERS_SCOPE_KEY, RequestIDMiddleware, get_header
+
+    seen = {}
+
+    async def inner(scope, receive, send):
+        seen["auth"] = get_header(scope, b"authorization")
+        seen["parsed"] = HEADERS_SCOPE_KEY in scope
+
+    scope = {"type": "http", "headers": [(b"authorization", b"first"), (b"authorization", b"second")]}
+    await RequestIDMiddleware(inner)(scope, None, mock.AsyncMock())
+    assert seen == {"auth": b"first", "parsed": True}
+    assert HEADERS_SCOPE_KEY not in scope
+
+
+def test_redact_sensitive_data_copies_nested_structures():
+    from src.utils.logging_utils import redact_sensitive_data
+
+    data = {"a": [{"token": "x"}, [1, {"b": {"secret": "y"}}]], "c": 1, "d": []}
+    redacted = redact_sensitive_data(data)
+    assert redacted == {"a": [{"token": "***REDACTED***"}, [1, {"b": {"secret": "***REDACTED***"}}]], "c": 1, "d": []}
+    assert list(redacted) == ["a", "c", "d"]
+    assert data["a"][0]["token"] == "x"
+    assert redact_sensitive_data("plain") == "plain"
+
+
+def test_redact_sensitive_data_inplace():
+    from src.utils.logging_utils import redact_sensitive_data
+
+    data = {"a": [{"Token": "x"}, [1, {"b": {"secret": "y"}}]], "c": 1}
+    inner = data["a"][0]
+    assert redact_sensitive_data(data, inplace=True) is data
+    assert data == {"a": [{"Token": "***REDACTED***"}, [1, {"b": {"secret": "***REDACTED***"}}]], "c": 1}
+    assert data["a"][0] is inner
@@ -401,6 +401,23 @@ async def test_async_rate_limiter_refill():
         t1 = time.monotonic()
     assert t1 - t0 >= 1.0
 
+@pytest.mark.asyncio
+async def test_async_rate_limiter_skips_cancelled_waiters():
+    limiter = AsyncRateLimiter(max_calls=1, period=0.2, refill_interval=0.05)
+    await limiter.acquire()
+    cancelled = [asyncio.create_task(limiter.acquire()) for _ in range(3)]
+    survivor = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    for t in cancelled:
+        t.cancel()
+    await asyncio.wait_for(survivor, timeout=1.0)
+    limiter.close()
+
+def test_async_rate_limiter_constructible_without_event_loop():
+    limiter = AsyncRateLimiter(max_calls=1, period=1)
+    assert limiter._refill_task is None
+    limiter.close()
+
 @pytest.mark.asyncio
 def make_retry_client():
     # Use low max_retries and base_delay for fast tests
@@ -1,5 +1,7 @@
 """Tests for the OAuth2 token service."""
+import asyncio
 import json
+import threading
 from datetime import datetime, timedelta
 from unittest import mock
 
@@ -7,6 +9,7 @@ import pytest
 from pydantic import SecretStr
 
 from src.auth.oauth import TokenResponse, TokenError
+from src.data.dynamodb import ItemAlreadyExistsError
 from src.auth.tokens import (
     store_token,
     get_token,
@@ -193,7 +196,96 @@ class TestTokenService:
         
         # Verify created_at was preserved
         assert updated_token.created_at == existing_token.created_at
+
+    @pytest.mark.asyncio
+    async def test_store_token_concurrent_create_falls_back_to_update(self, mock_token_repository):
+        """Test that a token created by another request after the lookup is overwritten."""
+        token_response = TokenResponse(
+            access_token="test_access_token",
+            token_type="Bearer",
+            expires_in=3600,
+            refresh_token="test_refresh_token",
+            scope="offline_access",
+            issued_at=datetime.utcnow(),
+        )
+        mock_token_repository.get_by_user_and_provider.return_value = None
+        mock_token_repository.create.side_effect = ItemAlreadyExistsError("exists")
+        
+        result = await store_token("test_user", token_response, TokenProvider.DEXCOM)
+        
+        assert result == mock_token_repository.update.return_value
+        mock_token_repository.update.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_store_token_unchanged_skips_write(
+        self, mock_token_repository, mock_settings, mock_refresh_access_token
+    ):
+        """Test that a refresh returning the same credentials does not write to the repository."""
+        # Setup: the stored token was issued a few seconds earlier, so its
+        # expiry differs slightly from the one computed for the refresh response
+        user_id = "test_user"
+        existing_token = UserToken(
+            user_id=user_id,
+            provider=TokenProvider.DEXCOM,
+            access_token=SecretStr("same_access_token"),
+            refresh_token=SecretStr("same_refresh_token"),
+            expires_at=datetime.utcnow() + timedelta(seconds=3590),
+            scope="offline_access",
+        )
+        mock_token_repository.get_by_user_and_provider.return_value = existing_token
+        mock_refresh_access_token.return_value = TokenResponse(
+            access_token="same_access_token",
+            token_type="Bearer",
+            expires_in=3600,
+            refresh_token="same_refresh_token",
+            scope="offline_access",
+            issued_at=datetime.utcnow(),
+        )
+        assert mock_refresh_access_token.return_value.expires_at != existing_token.expires_at
+
+        # Test the real refresh path, which stores the response via store_token
+        result = await refresh_token(user_id, TokenProvider.DEXCOM)
+
+        # Verify
+        assert result is existing_token
+        mock_token_repository.update.assert_not_called()
+        mock_token_repository.create.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_store_token_same_credentials_later_expiry_writes(
+        self, mock_token_repository, mock_settings, mock_refresh_access_token
+    ):
+        """Test that re-issued credentials with a new lifetime are stored with the new expiry."""
+        # Setup: the provider re-issues the same tokens for another hour
+        user_id = "test_user"
+        existing_token = UserToken(
+            user_id=user_id,
+            provider=TokenProvider.DEXCOM,
+            access_token=SecretStr("same_access_token"),
+            refresh_token=SecretStr("same_refresh_token"),
+            expires_at=datetime.utcnow() + timedelta(minutes=1),
+            scope="offline_access",
+        )
+        mock_token_repository.get_by_user_and_provider.return_value = existing_token
+        mock_token_repository.update.side_effect = lambda token: token
+        response = TokenResponse(
+            access_token="same_access_token",
+            token_type="Bearer",
+            expires_in=3600,
+            refresh_token="same_refresh_token",
+            scope="offline_access",
+            issued_at=datetime.utcnow(),
+        )
+        mock_refresh_access_token.return_value = response
+
+        # Test
+        result = await refresh_token(user_id, TokenProvider.DEXCOM)
+
+        # Verify
+        mock_token_repository.update.assert_called_once()
+        assert result.expires_at == response.expires_at
+        assert not result.is_expired()
+
     @pytest.mark.asyncio
     async def test_get_token_found(self, mock_token_repository):
         """Test getting a token that exists and is valid."""
@@ -216,7 +308,20 @@ class TestTokenService:
         # Verify
         assert result == existing_token
         # No auto-refresh should have happened
+    
+    @pytest.mark.asyncio
+    async def test_get_token_does_not_block_event_loop(self, mock_token_repository):
+        """Test that the repository lookup runs off the event loop thread."""
+        calling_threads = []
+        mock_token_repository.get_by_user_and_provider.side_effect = (
+            lambda *args: calling_threads.append(threading.current_thread()) or None
+        )
+        
+        result = await get_token("test_user", TokenProvider.DEXCOM)
         
+        assert result is None
+        assert calling_threads and calling_threads[0] is not threading.current_thread()
+    
     @pytest.mark.asyncio
     async def test_get_token_expired_with_auto_refresh(self, mock_token_repository):
         """Test getting an expired token with auto refresh enabled."""
@@ -312,6 +417,11 @@ class TestTokenService:
             # Verify
             assert result == refreshed_token
             
+            # The refresh token is read past the cache
+            mock_token_repository.get_by_user_and_provider.assert_called_with(
+                user_id, provider, consistent_read=True
+            )
+            
             # Check that refresh_access_token was called with the right parameters
             mock_refresh_access_token.assert_called_once()
             call_args = mock_refresh_access_token.call_args[1]
@@ -320,6 +430,80 @@ class TestTokenService:
             # Verify that store_token was called
             mock_store.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_refresh_token_concurrent_calls_share_one_refresh(
+        self, mock_token_repository, mock_settings, mock_refresh_access_token
+    ):
+        """Test that concurrent refreshes for the same user hit the provider once."""
+        # Setup
+        user_id = "test_user"
+        provider = TokenProvider.DEXCOM
+        token = create_mock_token(
+            user_id=user_id,
+            provider_value="dexcom",
+            access_token_value="old_access_token",
+            refresh_token_value="test_refresh_token"
+        )
+        mock_token_repository.get_by_user_and_provider.return_value = token
+        
+        refreshed_token = create_mock_token(
+            user_id=user_id,
+            provider_value="dexcom",
+            access_token_value="new_access_token",
+            refresh_token_value="new_refresh_token"
+        )
+        
+        async def slow_store(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return refreshed_token
+        
+        with mock.patch("src.auth.tokens.store_token", side_effect=slow_store):
+            results = await asyncio.gather(*(refresh_token(user_id, provider) for _ in range(5)))
+        
+        # Verify
+        assert all(result is refreshed_token for result in results)
+        mock_refresh_access_token.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_refresh_token_cancelled_leader_does_not_cancel_followers(
+        self, mock_token_repository, mock_settings, mock_refresh_access_token
+    ):
+        """Test that cancelling the first caller's request still delivers the token to the others."""
+        # Setup
+        user_id = "test_user"
+        provider = TokenProvider.DEXCOM
+        token = create_mock_token(
+            user_id=user_id,
+            provider_value="dexcom",
+            access_token_value="old_access_token",
+            refresh_token_value="test_refresh_token"
+        )
+        mock_token_repository.get_by_user_and_provider.return_value = token
+        
+        refreshed_token = create_mock_token(
+            user_id=user_id,
+            provider_value="dexcom",
+            access_token_value="new_access_token",
+            refresh_token_value="new_refresh_token"
+        )
+        
+        async def slow_store(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return refreshed_token
+        
+        with mock.patch("src.auth.tokens.store_token", side_effect=slow_store) as mock_store:
+            leader = asyncio.create_task(refresh_token(user_id, provider))
+            follower = asyncio.create_task(refresh_token(user_id, provider))
+            await asyncio.sleep(0)
+            leader.cancel()
+            result = await follower
+        
+        # Verify
+        assert leader.cancelled()
+        assert result is refreshed_token
+        mock_refresh_access_token.assert_called_once()
+        mock_store.assert_awaited_once()
+    
     @pytest.mark.asyncio
     async def test_refresh_token_no_token(self, mock_token_repository):
         """Test refreshing when no token exists."""
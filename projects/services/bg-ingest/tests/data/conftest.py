@@ -0,0 +1,35 @@
+"""Fixtures for the DynamoDB repository tests."""
+
+from unittest import mock
+
+import pytest
+from moto import mock_aws
+
+from src.data.dynamodb import DynamoDBClient
+from src.utils.config import get_settings
+
+settings = get_settings()
+
+
+@pytest.fixture
+def moto_repository():
+    """
+    Return a factory that creates a repository backed by a moto DynamoDB table.
+    
+    The factory takes the repository class and the DynamoDBClient method that
+    creates its table, e.g. DynamoDBClient.create_sync_jobs_table.
+    """
+    with mock_aws(), mock.patch.object(settings, "dynamodb_endpoint", None):
+        client = DynamoDBClient()
+        patches = []
+        
+        def make(repository_class, create_table):
+            create_table(client, wait=False)
+            patcher = mock.patch(f"{repository_class.__module__}.get_dynamodb_client", return_value=client)
+            patcher.start()
+            patches.append(patcher)
+            return repository_class()
+        
+        yield make
+        for patcher in patches:
+            patcher.stop()
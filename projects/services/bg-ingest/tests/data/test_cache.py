@@ -0,0 +1,48 @@
+"""Tests for the in-process read cache."""
+
+from unittest import mock
+
+from src.data.cache import TTLCache
+
+
+def test_entries_expire_after_ttl():
+    """Test that an entry is served until its TTL elapses."""
+    cache = TTLCache(maxsize=10, ttl=30)
+    with mock.patch("src.data.cache.time.monotonic", return_value=100.0):
+        cache.set("key", "value")
+    
+    with mock.patch("src.data.cache.time.monotonic", return_value=129.0):
+        assert cache.get("key") == "value"
+    with mock.patch("src.data.cache.time.monotonic", return_value=130.0):
+        assert cache.get("key") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test that the cache evicts the least recently used entry when full."""
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_zero_maxsize_disables_caching():
+    """Test that a cache with maxsize 0 never stores anything."""
+    cache = TTLCache(maxsize=0, ttl=30)
+    cache.set("key", "value")
+    
+    assert cache.get("key") is None
+
+
+def test_pop_invalidates_entry():
+    """Test that popping a key removes it and tolerates missing keys."""
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("key", "value")
+    cache.pop("key")
+    cache.pop("missing")
+    
+    assert cache.get("key") is None
@@ -141,4 +141,161 @@ def test_create_all_tables(mock_dynamodb_client):
     # Verify table names 
     assert result["bg_readings"]["TableDescription"]["TableName"] == settings.dynamodb_table
     assert result["user_tokens"]["TableDescription"]["TableName"] == settings.dynamodb_user_tokens_table
-    assert result["sync_jobs"]["TableDescription"]["TableName"] == settings.dynamodb_sync_jobs_table 
\ No newline at end of file
+    assert result["sync_jobs"]["TableDescription"]["TableName"] == settings.dynamodb_sync_jobs_table 
+
+def test_get_table_reuses_table_resource(mock_dynamodb_client):
+    """Test that get_table returns the same Table object for repeated calls."""
+    table = mock_dynamodb_client.get_table(settings.dynamodb_table)
+    
+    assert mock_dynamodb_client.get_table(settings.dynamodb_table) is table
+    assert mock_dynamodb_client.get_table(settings.dynamodb_user_tokens_table) is not table
+
+
+def test_missing_table_is_created_on_first_use():
+    """Test that a missing table is created lazily and the request retried."""
+    with mock_aws(), mock.patch.object(settings, "dynamodb_endpoint", None), \
+         mock.patch.object(settings, "service_env", "development"):
+        client = DynamoDBClient()
+        
+        client.put_item(settings.dynamodb_user_tokens_table, {"user_id": "u1", "provider": "dexcom"})
+        
+        item = client.get_item(settings.dynamodb_user_tokens_table, {"user_id": "u1", "provider": "dexcom"})
+        assert item == {"user_id": "u1", "provider": "dexcom"}
+
+
+def test_create_user_tokens_table_enables_time_to_live():
+    """Test that the user_tokens table lets DynamoDB expire abandoned tokens."""
+    with mock_aws(), mock.patch.object(settings, "dynamodb_endpoint", None):
+        client = DynamoDBClient()
+        
+        client.create_user_tokens_table()
+        client.create_user_tokens_table()
+        
+        description = client.client.describe_time_to_live(TableName=settings.dynamodb_user_tokens_table)
+        assert description["TimeToLiveDescription"] == {
+            "TimeToLiveStatus": "ENABLED",
+            "AttributeName": "expires_at_epoch",
+        }
+
+
+def test_missing_table_is_not_created_outside_development():
+    """Test that outside development a missing table surfaces as an error."""
+    with mock_aws(), mock.patch.object(settings, "dynamodb_endpoint", None), \
+         mock.patch.object(settings, "service_env", "production"):
+        client = DynamoDBClient()
+        
+        with pytest.raises(ClientError):
+            client.put_item(settings.dynamodb_user_tokens_table, {"user_id": "u1", "provider": "dexcom"})
+
+
+def test_wait_for_table_polls_custom_endpoint():
+    """Test that tables on a custom endpoint are polled until active."""
+    client = DynamoDBClient()
+    client.client = mock.MagicMock()
+    client.client.describe_table.side_effect = [
+        {"Table": {"TableStatus": "CREATING"}},
+        {"Table": {"TableStatus": "ACTIVE"}},
+    ]
+    
+    with mock.patch.object(settings, "dynamodb_endpoint", "http://localhost:8000"), \
+         mock.patch("src.data.dynamodb.time.sleep") as sleep:
+        client._wait_for_table(settings.dynamodb_table)
+    
+    assert client.client.describe_table.call_count == 2
+    sleep.assert_called_once()
+    client.client.get_waiter.assert_not_called()
+
+
+def test_query_accepts_condition_objects_and_paginates():
+    """Test that Key/Attr conditions are rendered for the low-level client and pages round-trip."""
+    from boto3.dynamodb.conditions import Attr, Key
+    
+    with mock_aws(), mock.patch.object(settings, "dynamodb_endpoint", None):
+        client = DynamoDBClient()
+        client.create_sync_jobs_table(wait=False)
+        for i in range(3):
+            client.put_item(settings.dynamodb_sync_jobs_table, {
+                "job_id": f"job{i}", "user_id": "u1", "status": "failed", "retries": 1.5
+            })
+        
+        response = client.scan(
+            settings.dynamodb_sync_jobs_table,
+            filter_expression=Attr("user_id").eq("u1") & Attr("retries").gt(1),
+            limit=2
+        )
+        assert len(response["Items"]) == 2
+        assert "job_id" in response["LastEvaluatedKey"]
+        
+        rest = client.scan(
+            settings.dynamodb_sync_jobs_table,
+            filter_expression=Attr("user_id").eq("u1"),
+            exclusive_start_key=response["LastEvaluatedKey"]
+        )
+        assert len(rest["Items"]) == 1
+        
+        by_id = client.query(
+            settings.dynamodb_sync_jobs_table,
+            key_condition_expression=Key("job_id").eq("job1"),
+            expression_attribute_values={}
+        )
+        assert [item["job_id"] for item in by_id["Items"]] == ["job1"]
+
+
+def test_query_bidirectional_returns_each_item_once_in_order():
+    """Test that the forward and backward reads meet without gaps or duplicates."""
+    with mock_aws(), mock.patch.object(settings, "dynamodb_endpoint", None):
+        client = DynamoDBClient()
+        client.create_bg_readings_table(wait=False)
+        timestamps = [f"2024-01-01T00:{minute:02d}:00" for minute in range(23)]
+        client.batch_write_items(settings.dynamodb_table, [
+            {"user_id": "u1", "timestamp": ts, "glucose_value": 100} for ts in timestamps
+        ])
+        
+        with mock.patch.object(client, "query", wraps=client.query) as query:
+            items = client.query_bidirectional(
+                settings.dynamodb_table,
+                key_condition_expression="user_id = :u",
+                key_attributes=("user_id", "timestamp"),
+                expression_attribute_values={":u": "u1"},
+                page_size=4
+            )
+        
+        assert [item["timestamp"] for item in items] == timestamps
+        assert query.call_count < 23 / 4 + 2
+
+
+def test_batch_delete_pages_deletes_streamed_keys():
+    """Test that keys streamed page by page are all deleted and counted."""
+    with mock_aws(), mock.patch.object(settings, "dynamodb_endpoint", None), \
+         mock.patch.object(settings, "dynamodb_batch_write_max", 2):
+        client = DynamoDBClient()
+        client.create_bg_readings_table(wait=False)
+        client.batch_write_items(settings.dynamodb_table, [
+            {"user_id": "u1", "timestamp": f"2024-01-01T00:{minute:02d}:00", "glucose_value": 100}
+            for minute in range(7)
+        ])
+        
+        with mock.patch.object(client.client, "batch_write_item", wraps=client.client.batch_write_item) as batch_write:
+            pages = client.query_keys(settings.dynamodb_table, "user_id", "u1", ("user_id", "timestamp"))
+            deleted = client.batch_delete_pages(settings.dynamodb_table, pages)
+        
+        assert deleted == 7
+        assert batch_write.call_count == 4
+        assert client.query(
+            settings.dynamodb_table,
+            key_condition_expression="user_id = :u",
+            expression_attribute_values={":u": "u1"}
+        )["Items"] == []
+
+
+def test_ping_swallows_errors():
+    """Test that a failed keep-alive ping is logged rather than raised."""
+    client = DynamoDBClient()
+    client.client = mock.MagicMock()
+    client.client.describe_table.side_effect = ClientError(
+        {"Error": {"Code": "ResourceNotFoundException", "Message": "missing"}}, "DescribeTable"
+    )
+    
+    client.ping()
+    
+    client.client.describe_table.assert_called_once_with(TableName=settings.dynamodb_table)
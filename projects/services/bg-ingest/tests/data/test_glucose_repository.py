@@ -0,0 +1,169 @@
+"""Tests for the glucose reading repository."""
+
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+
+from src.data.dynamodb import DynamoDBClient
+from src.data.glucose_repository import GlucoseReadingRepository
+from src.utils.config import get_settings
+
+settings = get_settings()
+
+
+@pytest.fixture
+def repository(moto_repository):
+    """Create a repository backed by a moto DynamoDB table."""
+    return moto_repository(GlucoseReadingRepository, DynamoDBClient.create_bg_readings_table)
+
+
+@pytest.fixture
+def make_readings(sample_glucose_reading):
+    """Return a factory for lists of readings five minutes apart, based on the sample reading."""
+    def make(count, user_id="user123"):
+        now = datetime.utcnow()
+        return [
+            sample_glucose_reading.model_copy(update={
+                "user_id": user_id,
+                "timestamp": now - timedelta(minutes=5 * i),
+                "glucose_value": 100 + i % 50,
+            })
+            for i in range(count)
+        ]
+    return make
+
+
+def test_batch_create_writes_all_readings(repository, make_readings):
+    """Test that batch_create persists every reading across several batches."""
+    readings = make_readings(60)
+
+    created = repository.batch_create(readings)
+
+    assert len(created) == 60
+    stored = repository.get_readings_by_user("user123", limit=1000)
+    assert len(stored) == 60
+
+
+def test_batch_create_honors_configured_batch_size(repository, make_readings):
+    """Test that batch_create sends batches of dynamodb_batch_write_max items."""
+    readings = make_readings(60)
+    client = repository.dynamodb.client
+
+    with mock.patch.object(settings, "dynamodb_batch_write_max", 100), \
+         mock.patch.object(client, "batch_write_item", wraps=client.batch_write_item) as batch_write:
+        created = repository.batch_create(readings)
+
+    assert len(created) == 60
+    assert batch_write.call_count == 1
+
+
+def test_batch_create_retries_unprocessed_items(repository, make_readings):
+    """Test that unprocessed items are resubmitted and counted once written."""
+    readings = make_readings(3)
+    client = repository.dynamodb.client
+    real_batch_write = client.batch_write_item
+    calls = []
+
+    def flaky_batch_write(RequestItems):
+        calls.append(RequestItems)
+        if len(calls) == 1:
+            # Accept the first item only; report the rest as unprocessed
+            requests = RequestItems[settings.dynamodb_table]
+            real_batch_write(RequestItems={settings.dynamodb_table: requests[:1]})
+            return {"UnprocessedItems": {settings.dynamodb_table: requests[1:]}}
+        return real_batch_write(RequestItems=RequestItems)
+
+    with mock.patch.object(client, "batch_write_item", side_effect=flaky_batch_write), \
+         mock.patch("src.data.dynamodb.time.sleep") as sleep:
+        created = repository.batch_create(readings)
+
+    assert len(created) == 3
+    assert len(calls) == 2
+    assert len(calls[1][settings.dynamodb_table]) == 2
+    sleep.assert_called_once()
+
+
+def test_batch_create_excludes_items_unprocessed_after_retries(repository, make_readings):
+    """Test that readings never acknowledged by DynamoDB are not reported as created."""
+    readings = make_readings(3)
+    client = repository.dynamodb.client
+
+    def throttled_batch_write(RequestItems):
+        requests = RequestItems[settings.dynamodb_table]
+        return {"UnprocessedItems": {settings.dynamodb_table: requests[-1:]}}
+
+    with mock.patch.object(client, "batch_write_item", side_effect=throttled_batch_write), \
+         mock.patch("src.data.dynamodb.time.sleep"):
+        created = repository.batch_create(readings)
+
+    assert created == readings[:2]
+
+
+def test_get_many_returns_readings_in_request_order(repository, make_readings):
+    """Test that get_many returns one entry per timestamp, None for missing ones."""
+    readings = make_readings(5)
+    repository.batch_create(readings)
+    missing = readings[0].timestamp + timedelta(minutes=1)
+
+    result = repository.get_many(
+        "user123", [readings[3].timestamp, missing, readings[1].timestamp, readings[3].timestamp]
+    )
+
+    assert [r.timestamp if r else None for r in result] == [
+        readings[3].timestamp, None, readings[1].timestamp, readings[3].timestamp
+    ]
+
+
+def test_delete_readings_by_user_deletes_only_that_user(repository, make_readings):
+    """Test that every reading of the user is deleted and other users are untouched."""
+    repository.batch_create(make_readings(30) + make_readings(3, user_id="other_user"))
+
+    deleted = repository.delete_readings_by_user("user123")
+
+    assert deleted == 30
+    assert repository.get_readings_by_user("user123") == []
+    assert len(repository.get_readings_by_user("other_user")) == 3
+
+
+def test_get_readings_by_user_filters_by_time_range(repository, make_readings):
+    """Test each start/end combination of the time-range key condition."""
+    readings = make_readings(5)
+    repository.batch_create(readings)
+    newest, oldest = readings[0].timestamp, readings[-1].timestamp
+
+    assert len(repository.get_readings_by_user("user123", start_time=readings[2].timestamp)) == 3
+    assert len(repository.get_readings_by_user("user123", end_time=readings[2].timestamp)) == 3
+    between = repository.get_readings_by_user("user123", start_time=oldest, end_time=newest)
+    assert [r.timestamp for r in between] == [r.timestamp for r in readings]
+
+
+def test_get_readings_by_user_follows_pagination(repository, make_readings):
+    """Test that results spanning several query pages are not truncated."""
+    readings = make_readings(5)
+    repository.batch_create(readings)
+    real_query = repository.dynamodb.query
+
+    def paged_query(**kwargs):
+        # Simulate DynamoDB's 1 MB page limit by returning two items per page
+        kwargs["limit"] = min(kwargs["limit"] or 2, 2)
+        return real_query(**kwargs)
+
+    with mock.patch.object(repository.dynamodb, "query", side_effect=paged_query) as query:
+        result = repository.get_readings_by_user("user123", limit=4)
+
+    assert [r.timestamp for r in result] == [r.timestamp for r in readings[:4]]
+    assert query.call_count == 2
+    assert len(list(repository.iter_readings_by_user("user123"))) == 5
+
+
+def test_update_stores_naive_utc_updated_at(repository, make_readings):
+    """Test that update writes updated_at in the same naive ISO format as the other timestamps."""
+    reading = make_readings(1)[0]
+    repository.create(reading)
+
+    updated = repository.update(reading)
+
+    assert updated.updated_at.tzinfo is None
+    assert "+" not in updated.to_dynamodb_item()["updated_at"]
+    assert updated.updated_at >= updated.created_at
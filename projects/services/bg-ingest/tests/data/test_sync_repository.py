@@ -0,0 +1,286 @@
+"""Tests for the sync job repository."""
+
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.data.dynamodb import DynamoDBClient, ItemAlreadyExistsError
+from src.data.sync_repository import SyncJobRepository
+from src.models.sync import SyncJob, SyncStatus, SyncType
+
+
+@pytest.fixture
+def repository(moto_repository):
+    """Create a repository backed by a moto DynamoDB table."""
+    return moto_repository(SyncJobRepository, DynamoDBClient.create_sync_jobs_table)
+
+
+def make_job(user_id="user123"):
+    """Create a pending incremental sync job."""
+    return SyncJob(user_id=user_id, sync_type=SyncType.INCREMENTAL, scheduled_time=datetime.utcnow())
+
+
+def test_delete_jobs_by_user_batches_deletes(repository):
+    """Test that a user's jobs are removed with batch deletes, leaving other users' jobs."""
+    jobs = [make_job() for _ in range(30)]
+    other_job = make_job(user_id="other_user")
+    for job in jobs + [other_job]:
+        repository.create(job)
+    client = repository.dynamodb.client
+
+    with mock.patch.object(client, "delete_item") as delete_item, \
+         mock.patch.object(client, "batch_write_item", wraps=client.batch_write_item) as batch_write:
+        deleted = repository.delete_jobs_by_user("user123")
+
+    assert deleted == 30
+    assert batch_write.call_count == 2
+    delete_item.assert_not_called()
+    assert repository.get_by_id(jobs[0].job_id) is None
+    assert repository.get_by_id(other_job.job_id) is not None
+
+
+def test_get_failed_jobs_for_retry_returns_only_ready_jobs(repository):
+    """Test that only failed jobs past their backoff with retries left are returned."""
+    ready = make_job()
+    ready.record_failure("API error")
+    ready.next_retry_at = datetime.utcnow() - timedelta(minutes=1)
+    backing_off = make_job()
+    backing_off.record_failure("API error")
+    exhausted = make_job()
+    for _ in range(exhausted.max_retries):
+        exhausted.record_failure("API error")
+    exhausted.next_retry_at = datetime.utcnow() - timedelta(minutes=1)
+    for job in (ready, backing_off, exhausted, make_job()):
+        repository.create(job)
+
+    jobs = repository.get_failed_jobs_for_retry()
+
+    assert [job.job_id for job in jobs] == [ready.job_id]
+
+
+def test_batch_fetch_status_returns_due_jobs_per_status(repository):
+    """Test that one sweep returns retry-ready failed jobs and due jobs of other statuses."""
+    failed = make_job()
+    failed.record_failure("API error")
+    failed.next_retry_at = datetime.utcnow() - timedelta(minutes=1)
+    completed = make_job()
+    completed.status = SyncStatus.COMPLETED
+    pending = make_job()
+    for job in (failed, completed, pending):
+        repository.create(job)
+
+    result = repository.batch_fetch_status([SyncStatus.FAILED, SyncStatus.COMPLETED])
+
+    assert list(result) == [SyncStatus.FAILED, SyncStatus.COMPLETED]
+    assert [job.job_id for job in result[SyncStatus.FAILED]] == [failed.job_id]
+    assert [job.job_id for job in result[SyncStatus.COMPLETED]] == [completed.job_id]
+
+
+def test_get_jobs_by_user_without_limit_returns_every_job(repository):
+    """Test that limit=None lists all of a user's jobs via the bidirectional query."""
+    jobs = [make_job() for _ in range(5)]
+    for job in jobs + [make_job(user_id="other_user")]:
+        repository.create(job)
+
+    with mock.patch.object(
+        repository.dynamodb, "query_bidirectional", wraps=repository.dynamodb.query_bidirectional
+    ) as query_bidirectional:
+        result = repository.get_jobs_by_user("user123", limit=None)
+
+    query_bidirectional.assert_called_once()
+    assert sorted(job.job_id for job in result) == sorted(job.job_id for job in jobs)
+
+
+def test_create_does_not_overwrite_existing_job(repository):
+    """Test that creating a job with an existing ID fails and keeps the stored job."""
+    job = make_job()
+    repository.create(job)
+    duplicate = make_job(user_id="other_user")
+    duplicate.job_id = job.job_id
+
+    with pytest.raises(ItemAlreadyExistsError):
+        repository.create(duplicate)
+
+    repository._cache.clear()
+    assert repository.get_by_id(job.job_id).user_id == "user123"
+
+
+def test_get_many_returns_jobs_in_request_order(repository):
+    """Test that get_many batches uncached lookups and returns None for missing jobs."""
+    jobs = [make_job() for _ in range(3)]
+    for job in jobs:
+        repository.create(job)
+    repository._cache.clear()
+    repository.get_by_id(jobs[0].job_id)
+    client = repository.dynamodb.client
+
+    with mock.patch.object(client, "batch_get_item", wraps=client.batch_get_item) as batch_get:
+        result = repository.get_many([jobs[2].job_id, "missing", jobs[0].job_id, jobs[2].job_id])
+
+    assert [job.job_id if job else None for job in result] == [
+        jobs[2].job_id, None, jobs[0].job_id, jobs[2].job_id
+    ]
+    batch_get.assert_called_once()
+    requested = batch_get.call_args.kwargs["RequestItems"][repository.table_name]["Keys"]
+    assert len(requested) == 2
+
+
+def test_get_jobs_by_user_and_status_filters_on_status(repository):
+    """Test both the paged and the unlimited status queries, and the due-job query."""
+    pending = make_job()
+    completed = make_job()
+    completed.status = SyncStatus.COMPLETED
+    for job in (pending, completed, make_job(user_id="other_user")):
+        repository.create(job)
+
+    for limit in (10, None):
+        jobs = repository.get_jobs_by_user_and_status("user123", SyncStatus.COMPLETED, limit=limit)
+        assert [job.job_id for job in jobs] == [completed.job_id]
+    due = repository.get_pending_scheduled_jobs()
+    assert pending.job_id in [job.job_id for job in due]
+    assert completed.job_id not in [job.job_id for job in due]
+
+
+def test_get_jobs_page_resumes_from_start_key(repository):
+    """Test that following start_key visits every job exactly once."""
+    jobs = [make_job() for _ in range(5)]
+    for job in jobs:
+        repository.create(job)
+
+    seen, start_key, pages = [], None, 0
+    while True:
+        page, start_key = repository.get_jobs_page("user123", limit=2, start_key=start_key)
+        seen.extend(job.job_id for job in page)
+        pages += 1
+        if start_key is None:
+            break
+
+    assert sorted(seen) == sorted(job.job_id for job in jobs)
+    assert pages == 3
+
+
+def test_get_by_id_consistent_read_bypasses_cache(repository):
+    """Test that a consistent read goes to DynamoDB with ConsistentRead set."""
+    job = make_job()
+    repository.create(job)
+    client = repository.dynamodb.client
+
+    with mock.patch.object(client, "get_item", wraps=client.get_item) as get_item:
+        assert repository.get_by_id(job.job_id).job_id == job.job_id
+        get_item.assert_not_called()
+        assert repository.get_by_id(job.job_id, consistent_read=True).job_id == job.job_id
+
+    assert get_item.call_args.kwargs["ConsistentRead"] is True
+
+
+def test_update_status_updates_in_place(repository):
+    """Test that status changes are written with UpdateItem, without reading the job first."""
+    job = make_job()
+    repository.create(job)
+    client = repository.dynamodb.client
+
+    with mock.patch.object(client, "get_item") as get_item:
+        started = repository.update_status(job.job_id, SyncStatus.IN_PROGRESS)
+    get_item.assert_not_called()
+    assert started.status == SyncStatus.IN_PROGRESS
+
+    failed = repository.update_status(job.job_id, SyncStatus.FAILED, "API error")
+    assert failed.status == SyncStatus.FAILED
+    assert failed.retry_count == 1
+    stored = repository.get_by_id(job.job_id)
+    assert stored.retry_count == 1
+    assert stored.error_message == "API error"
+    assert stored.next_retry_at == stored.retry_backoff_deadline()
+
+    completed = repository.update_status(job.job_id, SyncStatus.COMPLETED)
+    assert completed.status == SyncStatus.COMPLETED
+    assert completed.completed_at is not None
+
+
+def test_update_status_failed_writes_retry_schedule_in_one_update(repository):
+    """Test that a failure is counted and scheduled atomically, retrying a lost race."""
+    job = make_job()
+    repository.create(job)
+    real_update_item = repository.dynamodb.update_item
+    past = datetime.utcnow() - timedelta(hours=1)
+
+    def race_then_update(table_name, key, *args, **kwargs):
+        if update_item.call_count == 1:
+            # Another worker records a failure between our read and write
+            real_update_item(table_name, key, "SET retry_count = :n", {":n": 1})
+        return real_update_item(table_name, key, *args, **kwargs)
+
+    with mock.patch.object(repository.dynamodb, "update_item", side_effect=race_then_update) as update_item:
+        failed = repository.update_status(job.job_id, SyncStatus.FAILED, "API error", now=past)
+
+    assert update_item.call_count == 2
+    assert failed.retry_count == 2
+    stored = repository.get_by_id(job.job_id, consistent_read=True)
+    assert stored.status == SyncStatus.FAILED
+    assert stored.next_retry_at == failed.next_retry_at == stored.retry_backoff_deadline()
+    assert [ready.job_id for ready in repository.get_failed_jobs_for_retry()] == [job.job_id]
+
+
+def test_update_status_failed_write_error_leaves_job_unchanged(repository):
+    """Test that a throttled failure write never leaves a failed job without a retry time."""
+    job = make_job()
+    repository.create(job)
+    throttled = ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "UpdateItem")
+
+    with mock.patch.object(repository.dynamodb, "update_item", side_effect=throttled):
+        with pytest.raises(ClientError):
+            repository.update_status(job.job_id, SyncStatus.FAILED, "API error")
+
+    stored = repository.get_by_id(job.job_id, consistent_read=True)
+    assert stored.status == SyncStatus.PENDING
+    assert stored.retry_count == 0
+
+
+def test_update_status_uses_given_time(repository):
+    """Test that a caller-supplied time is written as the update and start time."""
+    job = make_job()
+    repository.create(job)
+    now = datetime(2024, 1, 1, 12, 0, 0)
+
+    started = repository.update_status(job.job_id, SyncStatus.IN_PROGRESS, now=now)
+
+    assert started.updated_at == now
+    assert started.started_at == now
+
+
+def test_update_status_of_missing_job_returns_none(repository):
+    """Test that updating an unknown job neither fails nor creates it."""
+    assert repository.update_status("missing", SyncStatus.IN_PROGRESS) is None
+    assert repository.get_by_id("missing") is None
+
+
+def test_get_by_id_serves_repeat_reads_from_cache(repository):
+    """Test that repeat lookups skip DynamoDB and see this process's own updates."""
+    job = make_job()
+    repository.create(job)
+    client = repository.dynamodb.client
+
+    with mock.patch.object(client, "get_item", wraps=client.get_item) as get_item:
+        repository.get_by_id(job.job_id)
+        repository.update_status(job.job_id, SyncStatus.IN_PROGRESS)
+        cached = repository.get_by_id(job.job_id)
+        repository.delete(job.job_id)
+        deleted = repository.get_by_id(job.job_id)
+
+    assert cached.status == SyncStatus.IN_PROGRESS
+    assert deleted is None
+    assert get_item.call_count == 1
+
+
+def test_get_jobs_by_user_with_projection_returns_only_those_attributes(repository):
+    """Test that reserved words such as status can be projected on both query paths."""
+    job = make_job()
+    repository.create(job)
+
+    limited = repository.get_job_attributes_by_user("user123", ["status"])
+    unlimited = repository.get_job_attributes_by_user("user123", ["status"], limit=None)
+
+    assert limited == [{"status": "pending"}]
+    assert unlimited == [{"job_id": job.job_id, "status": "pending"}]
@@ -0,0 +1,132 @@
+"""Tests for the user token repository."""
+
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+from pydantic import SecretStr
+
+from src.data.dynamodb import DynamoDBClient, ItemAlreadyExistsError
+from src.data.token_repository import TokenRepository
+from src.models.tokens import TokenProvider, UserToken
+
+
+@pytest.fixture
+def repository(moto_repository):
+    """Create a repository backed by a moto DynamoDB table."""
+    return moto_repository(TokenRepository, DynamoDBClient.create_user_tokens_table)
+
+
+def make_token(user_id="user123", provider=TokenProvider.DEXCOM):
+    """Create a token expiring in an hour."""
+    return UserToken(
+        user_id=user_id,
+        provider=provider,
+        access_token=SecretStr("access-token"),
+        refresh_token=SecretStr("refresh-token"),
+        expires_at=datetime.utcnow() + timedelta(hours=1),
+    )
+
+
+def test_delete_tokens_by_user_batches_deletes(repository):
+    """Test that every token of the user is removed in one batch delete."""
+    for token in (make_token(), make_token(provider=TokenProvider.INTERNAL), make_token(user_id="other_user")):
+        repository.create(token)
+    client = repository.dynamodb.client
+
+    with mock.patch.object(client, "delete_item") as delete_item, \
+         mock.patch.object(client, "batch_write_item", wraps=client.batch_write_item) as batch_write:
+        deleted = repository.delete_tokens_by_user("user123")
+
+    assert deleted == 2
+    batch_write.assert_called_once()
+    delete_item.assert_not_called()
+    assert repository.get_tokens_by_user("user123") == []
+    assert len(repository.get_tokens_by_user("other_user")) == 1
+
+
+def test_get_expired_tokens_queries_expiry_index(repository):
+    """Test that expired tokens come from the expiry index rather than a table scan."""
+    expired = make_token(user_id="expired_user")
+    expired.expires_at = datetime.utcnow() - timedelta(minutes=5)
+    for token in (expired, make_token()):
+        repository.create(token)
+
+    with mock.patch.object(repository.dynamodb.client, "scan") as scan:
+        tokens = repository.get_expired_tokens()
+
+    scan.assert_not_called()
+    assert [token.user_id for token in tokens] == ["expired_user"]
+    assert tokens[0].is_expired()
+    assert len(repository.get_expired_tokens(expires_before=datetime.utcnow() + timedelta(hours=2))) == 2
+
+
+def test_update_token_values_updates_in_place(repository):
+    """Test that new token values are written with UpdateItem, leaving other fields intact."""
+    token = make_token()
+    repository.create(token)
+    expires_at = datetime.utcnow() + timedelta(hours=2)
+
+    updated = repository.update_token_values(
+        "user123", TokenProvider.DEXCOM, SecretStr("new-access-token"), expires_at=expires_at
+    )
+
+    assert updated.access_token.get_secret_value() == "new-access-token"
+    assert updated.refresh_token.get_secret_value() == "refresh-token"
+    assert updated.expires_at == expires_at
+    stored = repository.get_by_user_and_provider("user123", TokenProvider.DEXCOM)
+    assert stored.access_token.get_secret_value() == "new-access-token"
+
+
+def test_get_many_returns_tokens_in_request_order(repository):
+    """Test that get_many returns one entry per key, None for missing tokens."""
+    repository.create(make_token())
+    repository.create(make_token(provider=TokenProvider.INTERNAL))
+    repository._cache.clear()
+
+    result = repository.get_many([
+        ("user123", TokenProvider.INTERNAL), ("nobody", TokenProvider.DEXCOM), ("user123", TokenProvider.DEXCOM)
+    ])
+
+    assert [(token.user_id, token.provider) if token else None for token in result] == [
+        ("user123", TokenProvider.INTERNAL), None, ("user123", TokenProvider.DEXCOM)
+    ]
+
+
+def test_create_does_not_overwrite_existing_token(repository):
+    """Test that creating a second token for the same user and provider fails."""
+    repository.create(make_token())
+
+    with pytest.raises(ItemAlreadyExistsError):
+        repository.create(make_token())
+
+
+def test_update_token_values_of_missing_token_returns_none(repository):
+    """Test that updating an unknown token neither fails nor creates it."""
+    assert repository.update_token_values("nobody", TokenProvider.DEXCOM, SecretStr("token")) is None
+    assert repository.get_by_user_and_provider("nobody", TokenProvider.DEXCOM) is None
+
+
+def test_get_tokens_by_user_with_projection_returns_only_those_attributes(repository):
+    """Test that a projection fetches just the requested attributes."""
+    repository.create(make_token())
+
+    items = repository.get_token_attributes_by_user("user123", ["provider", "expires_at"])
+
+    assert [set(item) for item in items] == [{"provider", "expires_at"}]
+
+
+def test_get_by_user_and_provider_consistent_read_bypasses_cache(repository):
+    """Test that a consistent read goes to DynamoDB with ConsistentRead set."""
+    repository.create(make_token())
+    repository.get_by_user_and_provider("user123", TokenProvider.DEXCOM)
+    client = repository.dynamodb.client
+
+    with mock.patch.object(client, "get_item", wraps=client.get_item) as get_item:
+        assert repository.get_by_user_and_provider("user123", TokenProvider.DEXCOM) is not None
+        get_item.assert_not_called()
+        assert repository.get_by_user_and_provider(
+            "user123", TokenProvider.DEXCOM, consistent_read=True
+        ) is not None
+
+    assert get_item.call_args.kwargs["ConsistentRead"] is True
@@ -1,6 +1,6 @@
 """Tests for data models."""
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import uuid
 
 import pytest
@@ -14,6 +14,7 @@ from src.models.glucose import (
     ReadingType
 )
 from src.models.tokens import (
+    TOKEN_TTL_GRACE,
     UserToken,
     TokenProvider,
     TokenType
@@ -137,6 +138,58 @@ class TestGlucoseModels:
         assert reading2.device_info.device_id == reading.device_info.device_id
         assert reading2.device_info.serial_number == reading.device_info.serial_number
         assert reading2.trend_direction == reading.trend_direction
+    
+    def test_glucose_reading_timestamp_iso_follows_timestamp(self):
+        """Test that the cached ISO timestamp is refreshed when the timestamp changes."""
+        now = datetime.utcnow()
+        reading = GlucoseReading(
+            user_id="user123",
+            timestamp=now,
+            glucose_value=120,
+            device_info=DeviceInfo(device_id="G6-1234567", serial_number="SN-1234567890")
+        )
+        
+        assert reading.timestamp_iso == now.isoformat()
+        
+        later = now + timedelta(minutes=5)
+        reading.timestamp = later
+        assert reading.timestamp_iso == later.isoformat()
+        assert reading.to_dynamodb_item()["timestamp"] == later.isoformat()
+    
+    def test_glucose_reading_audit_timestamps_default_together(self):
+        """Test that a new reading's updated_at defaults to its created_at."""
+        reading = GlucoseReading(
+            user_id="user123",
+            timestamp=datetime.utcnow(),
+            glucose_value=120,
+            device_info=DeviceInfo(device_id="G6-1234567", serial_number="SN-1234567890")
+        )
+        
+        assert reading.updated_at == reading.created_at
+        item = reading.to_dynamodb_item()
+        assert item["updated_at"] == item["created_at"] == reading.created_at.isoformat()
+        
+        reading.updated_at = reading.created_at + timedelta(minutes=1)
+        assert reading.to_dynamodb_item()["updated_at"] == reading.updated_at.isoformat()
+    
+    def test_glucose_reading_from_dynamodb_item_parses_enums(self):
+        """Test that stored enum values map to members and unknown values are rejected."""
+        item = GlucoseReading(
+            user_id="user123",
+            timestamp=datetime.utcnow(),
+            glucose_value=120,
+            trend_direction=TrendDirection.FALLING,
+            source=ReadingSource.MANUAL,
+            device_info=DeviceInfo(device_id="G6-1234567", serial_number="SN-1234567890")
+        ).to_dynamodb_item()
+        
+        reading = GlucoseReading.from_dynamodb_item(item)
+        assert reading.trend_direction is TrendDirection.FALLING
+        assert reading.source is ReadingSource.MANUAL
+        assert reading.reading_type is ReadingType.CGM
+        
+        with pytest.raises(ValueError):
+            GlucoseReading.from_dynamodb_item({**item, "trend_direction": "sideways"})
 
 
 class TestTokenModels:
@@ -224,6 +277,11 @@ class TestTokenModels:
         # Verify dates converted to strings
         assert item["expires_at"] == expires.isoformat()
         
+        # Verify the time to live is the expiry plus the grace period, in epoch seconds
+        assert item["expires_at_epoch"] == int(
+            (expires + TOKEN_TTL_GRACE).replace(tzinfo=timezone.utc).timestamp()
+        )
+        
         # Verify enums converted to strings
         assert item["provider"] == "dexcom"
         assert item["token_type"] == "oauth"
@@ -333,6 +391,7 @@ class TestSyncModels:
         assert job2.status == SyncStatus.FAILED
         assert job2.error_message == "API connection error"
         assert job2.retry_count == 1
+        assert job2.next_retry_at == job2.updated_at + timedelta(minutes=1)
         
         # It's retryable because retry_count < max_retries
         assert job2.is_retryable()
@@ -341,8 +400,9 @@ class TestSyncModels:
         job2.record_failure("Another error")
         job2.record_failure("Yet another error")
         
-        # Now it has reached the retry limit (3 by default)
+        # Now it has reached the retry limit (3 by default), with the backoff doubling
         assert job2.retry_count == 3
+        assert job2.next_retry_at == job2.updated_at + timedelta(minutes=4)
         assert not job2.is_retryable()
     
     def test_sync_job_dynamodb_conversion(self):
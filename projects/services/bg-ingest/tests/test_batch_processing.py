@@ -1,4 +1,6 @@
 import pytest
+from unittest import mock
+from src.models.glucose import TrendDirection
 from src.utils.pipeline import DataTransformationPipeline
 from src.utils.validation import RequiredFieldRule, TypeRule, RangeRule, ValidationEngine
 from src.utils.batch_processing import BatchProcessor
@@ -60,4 +62,25 @@ def test_batch_abort_on_error():
     assert errors.has_errors()
     summary = batch.summary()
     assert summary['processed'] == 1
-    assert summary['failed'] == 1 
\ No newline at end of file
+    assert summary['failed'] == 1
+
+def test_flush_to_dynamodb_writes_storable_records():
+    """Storable records are written as naive UTC readings; the rest move to failed."""
+    batch = BatchProcessor(make_pipeline())
+    device = {'id': 'G6-1', 'serial': 'SN-1'}
+    batch.process_batch([
+        {'user_id': 'u1', 'timestamp': '2024-06-01T12:00:00Z', 'glucose_value': 100, 'trend': 'Flat', 'device_info': device},
+        {'user_id': 'u1', 'timestamp': '2024-06-01T12:05:00Z', 'glucose_value': 110},  # no device info
+    ])
+    repository = mock.Mock()
+    repository.batch_create.side_effect = lambda readings: readings
+
+    created = batch.flush_to_dynamodb(repository)
+
+    assert len(created) == 1
+    assert created[0].trend_direction == TrendDirection.STEADY
+    assert created[0].device_info.device_id == 'G6-1'
+    assert created[0].timestamp.tzinfo is None
+    assert created[0].to_dynamodb_item()['timestamp'] == '2024-06-01T12:00:00'
+    assert batch.summary()['processed'] == 1
+    assert batch.summary()['failed'] == 1
@@ -1,5 +1,6 @@
+import orjson
 import pytest
-from src.utils.error_handling import ErrorCollector, ErrorSeverity, ValidationError, NormalizationError, SystemError
+from src.utils.error_handling import ErrorCollector, ErrorRecord, ErrorSeverity, ValidationError, NormalizationError, SystemError
 
 def test_error_collector_add_and_get():
     collector = ErrorCollector()
@@ -30,4 +31,14 @@ def test_error_classes():
     assert isinstance(v, Exception)
     assert v.severity == ErrorSeverity.MEDIUM
     assert n.field is None
-    assert s.severity == ErrorSeverity.CRITICAL 
\ No newline at end of file
+    assert s.severity == ErrorSeverity.CRITICAL 
+def test_error_collector_stores_records():
+    collector = ErrorCollector()
+    collector.add_error('ValidationError', 'foo', 'Missing field', ErrorSeverity.HIGH)
+    collector.extend([ErrorRecord('NormalizationError', None, 'Bad format', 'low')])
+    assert collector.errors == [
+        ErrorRecord('ValidationError', 'foo', 'Missing field', 'high'),
+        ErrorRecord('NormalizationError', None, 'Bad format', 'low'),
+    ]
+    assert orjson.loads(collector.to_json()) == collector.get_errors()
+    assert collector.get_errors()[1] == {'type': 'NormalizationError', 'field': None, 'message': 'Bad format', 'severity': 'low'}
@@ -22,6 +22,8 @@ def test_normalize_timestamp():
     assert normalize_timestamp(dt).startswith('2024-06-01T12:00:00')
     assert normalize_timestamp('2024-06-01T12:00:00Z').startswith('2024-06-01T12:00:00')
     assert normalize_timestamp('not-a-date') is None
+    assert normalize_timestamp('2024-06-01T14:00:00.5+02:00') == '2024-06-01T12:00:00.500000Z'
+    assert normalize_timestamp('2024-06-01T12:00:00Z') == '2024-06-01T12:00:00.000000Z'
     assert normalize_timestamp(None) is None
 
 def test_normalize_trend_direction():
@@ -31,6 +33,8 @@ def test_normalize_trend_direction():
     assert normalize_trend_direction('up') == 'rising'
     assert normalize_trend_direction('down') == 'falling'
     assert normalize_trend_direction('unknown') == 'unknown'
+    assert normalize_trend_direction(' Rapidly Falling ') == 'rapidly falling'
+    assert normalize_trend_direction('Unknown') == 'unknown'
     assert normalize_trend_direction(None) is None
 
 def test_normalize_device_info():
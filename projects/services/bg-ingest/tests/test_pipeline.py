@@ -56,4 +56,18 @@ def test_pipeline_type_and_range():
     raw['glucose_value'] = 700
     normalized, errors = pipeline.process_reading(raw)
     assert normalized is None
-    assert 'glucose_value' in errors 
\ No newline at end of file
+    assert 'glucose_value' in errors
+
+
+def test_pipeline_process_batch_returns_parallel_results():
+    """process_batch returns results aligned with the input records."""
+    pipeline = DataTransformationPipeline(make_engine())
+    valid = {'user_id': 'u', 'timestamp': '2024-06-01T12:00:00Z', 'glucose_value': 120}
+    invalid = {'user_id': 'u', 'timestamp': '2024-06-01T12:00:00Z', 'glucose_value': 700}
+    normalized, errors = pipeline.process_batch([valid, invalid, valid])
+    assert [n is not None for n in normalized] == [True, False, True]
+    assert [e is not None for e in errors] == [False, True, False]
+    assert 'glucose_value' in errors[1]
+    # Stopping on error leaves the remaining records unprocessed
+    normalized, errors = pipeline.process_batch([valid, invalid, valid], stop_on_error=True)
+    assert len(normalized) == len(errors) == 2
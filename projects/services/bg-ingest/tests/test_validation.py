@@ -71,4 +71,25 @@ def test_validation_engine_multiple_rules():
     assert context.has_errors()
     # Valid
     context = engine.validate({'foo': 5})
-    assert not context.has_errors() 
\ No newline at end of file
+    assert not context.has_errors()
+
+
+def test_validation_engine_validate_batch():
+    """validate_batch returns one context per record, in input order."""
+    engine = ValidationEngine([RequiredFieldRule('foo'), RangeRule('foo', 1, 10)])
+    contexts = engine.validate_batch([{'foo': 5}, {}, {'foo': 20}])
+    assert [c.has_errors() for c in contexts] == [False, True, True]
+    assert contexts[1].get_errors() == [('foo', "Field 'foo' is required.")]
+
+
+def test_validate_batch_matches_validate_for_every_rule():
+    """Each rule's batch path reports the same errors as validating records one by one."""
+    engine = ValidationEngine([
+        RequiredFieldRule('foo'),
+        TypeRule('foo', (int, float)),
+        RangeRule('foo', 1, 10),
+        PatternRule('bar', r'^[a-z]+$'),
+    ])
+    records = [{'foo': 5, 'bar': 'ok'}, {}, {'foo': None}, {'foo': 'x', 'bar': 'NO'}, {'foo': 20.5, 'bar': 3}]
+    batch = engine.validate_batch(records)
+    assert [c.get_errors() for c in batch] == [engine.validate(r).get_errors() for r in records]
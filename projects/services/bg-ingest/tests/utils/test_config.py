@@ -10,9 +10,19 @@ import io
 import boto3
 import pytest
 from botocore.exceptions import ClientError
+from moto import mock_aws
 from pydantic import ValidationError
 
-from src.utils.config import AwsSecretsManager, Settings, get_settings, setup_logging, JSONFormatter
+from src.utils.config import AwsSecretsManager, Settings, get_settings, setup_logging, JSONFormatter, JSONStreamHandler
+from src.utils.config import SECRETS_MANAGER_CONFIG, _secrets_manager_client, load_secret_values
+
+
+@pytest.fixture(autouse=True)
+def clear_secrets_manager_clients():
+    """Drop cached Secrets Manager clients so each test sees its own boto3 mock."""
+    _secrets_manager_client.cache_clear()
+    yield
+    _secrets_manager_client.cache_clear()
 
 
 @pytest.fixture
@@ -78,6 +88,11 @@ def test_cors_origins_validation():
         assert len(settings.cors_origins) == 2
         assert "https://example.com" in settings.cors_origins
         assert "https://test.com" in settings.cors_origins
+    
+    # Already valid origins are passed through unchanged, mixed lists are rewritten
+    origins = ["http://a.com", "https://b.com"]
+    assert Settings.validate_cors_origins(origins) is origins
+    assert Settings.validate_cors_origins(["http://a.com", "b.com"]) == ["http://a.com", "https://b.com"]
 
 
 def test_development_fallbacks():
@@ -122,7 +137,11 @@ def test_aws_secrets_manager_get_secret(mock_boto_client):
         service_name="secretsmanager",
         region_name="us-west-2",
         endpoint_url=None,
+        config=mock.ANY,
     )
+    config = mock_boto_client.call_args.kwargs["config"]
+    for option, value in SECRETS_MANAGER_CONFIG.items():
+        assert getattr(config, option) == value
     mock_secrets_client.get_secret_value.assert_called_once_with(SecretId="test-secret")
 
 
@@ -152,6 +171,17 @@ def test_aws_secrets_manager_error_handling(mock_boto_client):
             secrets_manager.get_secret("test-secret")
 
 
+@mock.patch.object(boto3, "client")
+def test_aws_secrets_manager_rejects_non_object_secret(mock_boto_client):
+    """Test that a SecretString that is not a JSON object is rejected."""
+    mock_secrets_client = mock.MagicMock()
+    mock_boto_client.return_value = mock_secrets_client
+    mock_secrets_client.get_secret_value.return_value = {"SecretString": '["not", "an", "object"]'}
+    
+    with pytest.raises(ValueError):
+        AwsSecretsManager("us-west-2").get_secret("test-secret")
+
+
 @mock.patch.object(boto3, "client")
 def test_settings_load_secrets(mock_boto_client, mock_env):
     """Test that settings loads secrets from AWS Secrets Manager."""
@@ -161,7 +191,7 @@ def test_settings_load_secrets(mock_boto_client, mock_env):
     
     # Mock the response from AWS Secrets Manager
     mock_response = {
-        "SecretString": '{"DEXCOM_CLIENT_ID": "test_id", "DEXCOM_CLIENT_SECRET": "test_secret"}'
+        "SecretString": '{"DEXCOM_CLIENT_ID": "test_id", "DEXCOM_CLIENT_SECRET": "test_secret", "METRICS_PASS": "pw", "UNKNOWN": "x"}'
     }
     mock_secrets_client.get_secret_value.return_value = mock_response
     
@@ -180,6 +210,45 @@ def test_settings_load_secrets(mock_boto_client, mock_env):
             assert client_secret.get_secret_value() == "test_secret"
         else:
             assert client_secret == "test_secret"
+        
+        # Optional[SecretStr] fields are wrapped too; unknown keys are ignored
+        assert settings.metrics_pass.get_secret_value() == "pw"
+        assert not hasattr(settings, "unknown")
+
+
+@mock.patch.object(boto3, "client")
+def test_aws_secrets_manager_reuses_client(mock_boto_client):
+    """Test that managers for the same region share one boto3 client."""
+    first = AwsSecretsManager("us-west-2")
+    second = AwsSecretsManager("us-west-2")
+    other = AwsSecretsManager("eu-west-1")
+    
+    # Clients are only created on first use
+    mock_boto_client.assert_not_called()
+    assert first.client is second.client
+    assert other.client is not None
+    assert mock_boto_client.call_count == 2
+    assert other.region_name == "eu-west-1"
+
+
+def test_aws_secrets_manager_get_secrets_batches_lookups():
+    """Test that several secrets are fetched and merged in one batch."""
+    with mock_aws(), mock.patch.dict(os.environ, {"SERVICE_ENV": "production"}, clear=False):
+        client = boto3.client("secretsmanager", region_name="us-west-2")
+        client.create_secret(Name="base", SecretString='{"JWT_SECRET_KEY": "a", "METRICS_USER": "m"}')
+        client.create_secret(Name="override", SecretString='{"JWT_SECRET_KEY": "b"}')
+        secrets_manager = AwsSecretsManager("us-west-2")
+        
+        with mock.patch.object(
+            secrets_manager.client, "batch_get_secret_value", wraps=secrets_manager.client.batch_get_secret_value
+        ) as batch_get:
+            merged = load_secret_values(secrets_manager, "base, override")
+        
+        assert merged == {"JWT_SECRET_KEY": "b", "METRICS_USER": "m"}
+        batch_get.assert_called_once_with(SecretIdList=["base", "override"])
+        
+        with pytest.raises(ClientError):
+            secrets_manager.get_secrets(["base", "missing"])
 
 
 def test_get_settings_caching(mock_env):
@@ -231,4 +300,32 @@ def test_log_output_to_file():
             contents = f.read()
         assert "file test message" in contents
     finally:
-        os.remove(log_path) 
\ No newline at end of file
+        os.remove(log_path) 
+
+def test_json_formatter_uses_record_time_and_extras():
+    """Test that the formatter stamps the record's own creation time and keeps extras."""
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "hello", (), None)
+    record.created = 0.5
+    record.request_id = "abc"
+    
+    log = json.loads(JSONFormatter().format(record))
+    
+    assert log["timestamp"] == "1970-01-01T00:00:00.500000"
+    assert log["request_id"] == "abc"
+    assert "msg" not in log
+
+
+def test_json_stream_handler_writes_bytes_in_order():
+    """Test that the handler writes UTF-8 JSON lines after text already on the stream."""
+    raw = io.BytesIO()
+    stream = io.TextIOWrapper(raw, encoding="utf-8")
+    handler = JSONStreamHandler(stream)
+    handler.setFormatter(JSONFormatter())
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "h\u00e9llo", (), None)
+    
+    stream.write("plain text\n")
+    handler.emit(record)
+    
+    first, second = raw.getvalue().decode("utf-8").splitlines()
+    assert first == "plain text"
+    assert json.loads(second)["message"] == "h\u00e9llo"
@@ -60,6 +60,17 @@ def test_get_current_key_uses_latest(monkeypatch):
     assert key == "key3"
     teardown_env_keys()
 
+
+def test_get_current_key_compares_versions_numerically(monkeypatch):
+    """The latest version is chosen numerically, so v11 beats v9."""
+    teardown_env_keys()
+    keys = {f"v{i}": f"key{i}" for i in range(1, 12)}
+    setup_env_keys(keys)  # No current version set; "v9" > "v11" lexically
+    km = KeyManager()
+    assert km.get_current_key() == ("key11", "v11")
+    teardown_env_keys()
+
+
 def test_rotate_key_adds_created_at(monkeypatch):
     teardown_env_keys()
     km = KeyManager()
@@ -108,4 +119,38 @@ def test_error_no_current_key(monkeypatch):
     km = KeyManager()
     with pytest.raises(RuntimeError):
         km.get_current_key()
-    teardown_env_keys() 
\ No newline at end of file
+    teardown_env_keys()
+
+
+def test_load_keys_is_cached_until_env_changes(monkeypatch):
+    """Parsed keys are reused until the environment variable changes."""
+    teardown_env_keys()
+    setup_env_keys({"v1": "key1"}, current_version="v1")
+    km = KeyManager()
+    created_at = km.list_keys()["v1"]["created_at"]
+    loads = []
+    monkeypatch.setattr(km, "_migrate_keys", lambda keys: loads.append(keys) or KeyManager._migrate_keys(km, keys))
+    # Cached: the migrated created_at stays stable and nothing is reparsed
+    assert km.list_keys()["v1"]["created_at"] == created_at
+    assert km.get_key("v1") == "key1"
+    assert loads == []
+    # rotate_key refreshes the cache without a reparse
+    key, v2 = km.rotate_key()
+    assert km.get_current_key() == (key, v2)
+    assert loads == []
+    # An external change to the env var is picked up
+    setup_env_keys({"v9": "key9"}, current_version="v9")
+    assert km.get_current_key() == ("key9", "v9")
+    assert len(loads) == 1
+    teardown_env_keys()
+
+
+def test_migrate_keys_returns_current_format_unchanged():
+    """Keys already in the current format are not copied or rewritten."""
+    km = KeyManager()
+    keys = {"v1": {"key": "key1", "created_at": "2024-01-01T00:00:00Z"}}
+    assert km._migrate_keys(keys) is keys
+    mixed = {**keys, "v2": "key2"}
+    migrated = km._migrate_keys(mixed)
+    assert migrated["v1"] is keys["v1"]
+    assert migrated["v2"]["key"] == "key2"
@@ -0,0 +1,25 @@
+"""Tests for the logging utilities."""
+
+import io
+import json
+import logging
+
+from src.utils.config import JSONStreamHandler
+from src.utils.logging_utils import JSONFormatter
+
+
+def test_json_formatter_writes_utc_timestamp_as_bytes():
+    """Test that entries carry a 'Z' timestamp and are written by the bytes handler."""
+    raw = io.BytesIO()
+    handler = JSONStreamHandler(io.TextIOWrapper(raw, encoding="utf-8"))
+    handler.setFormatter(JSONFormatter())
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "hello", (), None)
+    record.created = 0.5
+    record.extra = {"request_id": "abc"}
+    
+    handler.emit(record)
+    
+    log = json.loads(raw.getvalue())
+    assert log["timestamp"] == "1970-01-01T00:00:00.500000Z"
+    assert log["request_id"] == "abc"
+    assert JSONFormatter().format(record) == raw.getvalue().decode().rstrip("\n")
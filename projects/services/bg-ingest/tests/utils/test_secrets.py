@@ -0,0 +1,38 @@
+"""Tests for the secrets lookup helper."""
+
+import os
+from unittest import mock
+
+import pytest
+
+from src.utils import secrets
+from src.utils.secrets import get_secret
+
+
+@pytest.fixture(autouse=True)
+def clear_secret_caches():
+    """Start every test with empty secret caches."""
+    secrets._load_secret.cache_clear()
+    secrets._aws_secrets.cache_clear()
+    yield
+    secrets._load_secret.cache_clear()
+    secrets._aws_secrets.cache_clear()
+
+
+def test_get_secret_caches_environment_values():
+    """Test that a value found in the environment is served from the cache afterwards."""
+    with mock.patch.dict(os.environ, {"MY_API_KEY": "abc"}):
+        assert get_secret("MY_API_KEY") == "abc"
+    assert get_secret("MY_API_KEY") == "abc"
+
+
+def test_get_secret_fetches_the_aws_bundle_once():
+    """Test that several keys are served from one Secrets Manager lookup."""
+    settings = mock.Mock(service_env="production", secret_name="bundle", aws_region="us-west-2")
+    with mock.patch.object(secrets, "get_settings", return_value=settings), \
+         mock.patch.object(secrets, "load_secret_values", return_value={"A_KEY": "a", "B_KEY": "b"}) as load:
+        assert get_secret("A_KEY") == "a"
+        assert get_secret("B_KEY") == "b"
+        with pytest.raises(RuntimeError):
+            get_secret("MISSING_KEY")
+    load.assert_called_once()